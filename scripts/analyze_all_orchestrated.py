@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 """
 모든 Orchestrated MIDI 파일 분석 및 track_data.dart 업데이트 가이드 생성
+
+사용법:
+    python scripts/analyze_all_orchestrated.py                 # 전체 재분석
+    python scripts/analyze_all_orchestrated.py --incremental   # 변경된 폴더만 재분석 후 병합
+    python scripts/analyze_all_orchestrated.py --watch         # 새 Orchestrated.mid 감시
 """
 
 from pathlib import Path
-from mido import MidiFile
+from typing import Dict, List, Optional
 import json
+import time
+
+from catalog import TRACK_MAPPING, CatalogIndex, load_catalog_index
+from midi_analysis import file_sha1, tempo_to_bpm
+from midi_scan import scan_midi_meta
 
 GM_INSTRUMENTS = {
     # Piano (0-7)
@@ -61,141 +71,123 @@ GM_INSTRUMENTS = {
     124: "Telephone Ring", 125: "Helicopter", 126: "Applause", 127: "Gunshot"
 }
 
-# 트랙 번호 -> 트랙 ID 매핑 (제목 재구성 완료)
-TRACK_MAPPING = {
-    # 강아지 트랙 (1-5)
-    '1_1': ('sleep_01', '온화한 밤'),
-    '1_2': ('sleep_02', '따뜻한 오후'),
-    '1_3': ('sleep_03', '깊은 안정'),
-    '1_4': ('sleep_04', '부드러운 포옹'),
-    '1_5': ('sleep_05', '깊은 울림'),
-    '1_6': ('sleep_06', '포근한 선율'),
-    '1_7': ('sleep_07', '맑은 아침'),
-    '1_8': ('sleep_08', '맑은 울림'),
-    '2_1': ('separation_01', '묵직한 위로'),
-    '2_2': ('separation_02', '따뜻한 공명'),
-    '2_3': ('separation_03', '평온한 균형'),
-    '2_4': ('separation_04', '포근한 쉼'),
-    '2_5': ('separation_05', '산뜻한 안정'),
-    '2_6': ('separation_06', '밝은 위로'),
-    '2_7': ('separation_07', '평온한 오후'),
-    '2_8': ('separation_08', '평화로운 쉼터'),
-    '3_1': ('noise_01', '부드러운 장막'),
-    '3_2': ('noise_02', '깊은 방패'),
-    '3_3': ('noise_03', '일상의 평온'),
-    '3_4': ('noise_04', '든든한 보호'),
-    '3_5': ('noise_05', '산뜻한 보호막'),
-    '3_6': ('noise_06', '포근한 담요'),
-    '3_7': ('noise_07', '고요한 공간'),
-    '3_8': ('noise_08', '깊은 고요'),
-    '4_1': ('energy_01', '리드미컬 산책'),
-    '4_2': ('energy_02', '활기찬 움직임'),
-    '4_3': ('energy_03', '경쾌한 발걸음'),
-    '4_4': ('energy_04', '신나는 놀이'),
-    '4_5': ('energy_05', '가벼운 발걸음'),
-    '4_6': ('energy_06', '신나는 질주'),
-    '4_7': ('energy_07', '밝은 나들이'),
-    '4_8': ('energy_08', '리드미컬한 박자'),
-    '5_1': ('senior_01', '치유의 선율'),
-    '5_2': ('senior_02', '깊은 안정'),
-    '5_3': ('senior_03', '부드러운 공명'),
-    '5_4': ('senior_04', '편안한 휴식'),
-    '5_5': ('senior_05', '포근한 온기'),
-    '5_6': ('senior_06', '산뜻한 평온'),
-    '5_7': ('senior_07', '깊은 안식'),
-    '5_8': ('senior_08', '평온한 품'),
-    
-    # 고양이 트랙 (6-10)
-    '6_1': ('cat_sleep_01', '편안한 리듬'),
-    '6_2': ('cat_sleep_02', '맑은 별빛'),
-    '6_3': ('cat_sleep_03', '깊은 휴식'),
-    '6_4': ('cat_sleep_04', '고요한 밤'),
-    '6_5': ('cat_sleep_05', '은은한 달빛'),
-    '6_6': ('cat_sleep_06', '포근한 꿈'),
-    '6_7': ('cat_sleep_07', '따뜻한 쉼터'),
-    '6_8': ('cat_sleep_08', '부드러운 울림'),
-    '7_1': ('cat_separation_01', '안전한 공간'),
-    '7_2': ('cat_separation_02', '맑은 오후'),
-    '7_3': ('cat_separation_03', '평온한 안식처'),
-    '7_4': ('cat_separation_04', '부드러운 바람'),
-    '7_5': ('cat_separation_05', '따뜻한 동행'),
-    '7_6': ('cat_separation_06', '따스한 시간'),
-    '7_7': ('cat_separation_07', '편안한 일상'),
-    '7_8': ('cat_separation_08', '고요한 순간'),
-    '8_1': ('cat_noise_01', '부드러운 차단'),
-    '8_2': ('cat_noise_02', '자연의 속삭임'),
-    '8_3': ('cat_noise_03', '따뜻한 보호막'),
-    '8_4': ('cat_noise_04', '깊은 평온'),
-    '8_5': ('cat_noise_05', '평화로운 정원'),
-    '8_6': ('cat_noise_06', '흐르는 평온'),
-    '8_7': ('cat_noise_07', '고요한 방어막'),
-    '8_8': ('cat_noise_08', '부드러운 배경'),
-    '9_1': ('cat_energy_01', '경쾌한 질주'),
-    '9_2': ('cat_energy_02', '신나는 추격'),
-    '9_3': ('cat_energy_03', '가벼운 도약'),
-    '9_4': ('cat_energy_04', '활기찬 움직임'),
-    '9_5': ('cat_energy_05', '모험의 시작'),
-    '9_6': ('cat_energy_06', '즐거운 놀이'),
-    '9_7': ('cat_energy_07', '신나는 파티'),
-    '9_8': ('cat_energy_08', '리드미컬한 춤'),
-    '10_1': ('cat_senior_01', '치유의 선율'),
-    '10_2': ('cat_senior_02', '따뜻한 위로'),
-    '10_3': ('cat_senior_03', '평온한 오후'),
-    '10_4': ('cat_senior_04', '추억의 여운'),
-    '10_5': ('cat_senior_05', '깊은 공명'),
-    '10_6': ('cat_senior_06', '따스한 심박'),
-    '10_7': ('cat_senior_07', '고요한 쉼터'),
-    '10_8': ('cat_senior_08', '편안한 호흡'),
-}
-
 def extract_instruments_and_tempo(filepath: Path):
-    """MIDI에서 악기와 템포 추출"""
-    midi = MidiFile(filepath)
+    """MIDI에서 악기와 템포 추출 (메타 스캐너 사용, 노트는 디코딩하지 않음)"""
+    meta = scan_midi_meta(filepath)
     
     instruments = []
-    tempo = None
+    for pc in meta['program_changes']:
+        inst_name = GM_INSTRUMENTS.get(pc['program'], f"Program{pc['program']}")
+        if inst_name not in instruments:
+            instruments.append(inst_name)
     
-    for track in midi.tracks:
-        track_name = track.name if hasattr(track, 'name') else None
-        
-        for msg in track:
-            if msg.type == 'program_change':
-                inst_name = GM_INSTRUMENTS.get(msg.program, f"Program{msg.program}")
-                if inst_name not in instruments:
-                    instruments.append(inst_name)
-            
-            if msg.type == 'set_tempo' and tempo is None:
-                tempo = round(60_000_000 / msg.tempo, 1)
+    tempo = None
+    if meta['tempo_changes']:
+        tempo = tempo_to_bpm(meta['tempo_changes'][0]['tempo'])
     
     return {
         'instruments': instruments,
         'tempo': tempo
     }
 
-def main():
-    project_root = Path(__file__).parent.parent
-    sound_dir = project_root / 'assets' / 'sound'
+PROJECT_ROOT = Path(__file__).parent.parent
+SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
+OUTPUT_FILE = PROJECT_ROOT / 'midi_analysis_full.json'
+
+# 소스 MIDI 변경 감지용 매니페스트 (track_id -> 경로, mtime, 크기, 해시)
+MANIFEST_FILE = PROJECT_ROOT / '.cache' / 'orchestrated_manifest.json'
+
+WATCH_INTERVAL = 0.5  # 초
+
+
+def find_orchestrated_midi(index: CatalogIndex, track_key: str, verbose: bool = True) -> Optional[Path]:
+    """카탈로그 인덱스에서 트랙의 Orchestrated MIDI 찾기"""
+    entry = index.get(track_key)
     
-    results = {}
+    if not entry or not entry['folder']:
+        if verbose:
+            print(f"⚠️  {track_key} 폴더 없음")
+        return None
     
-    print("🎵 Orchestrated MIDI 분석 중...\n")
+    if not entry['orchestrated']:
+        if verbose:
+            print(f"⚠️  {track_key}: Orchestrated.mid 없음")
+        return None
+    
+    return entry['orchestrated']
+
+
+def _load_json(path: Path) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_json(path: Path, data: Dict, indent: Optional[int] = 2):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
+def _is_unchanged(midi_path: Path, entry: Optional[Dict]) -> bool:
+    """매니페스트 기록과 비교하여 소스 MIDI 변경 여부 판단
+
+    경로/mtime/크기가 같으면 변경 없음, mtime 만 바뀐 경우에는 내용 해시로 확인합니다.
+    """
+    if not entry or entry.get('path') != str(midi_path):
+        return False
+    
+    st = midi_path.stat()
+    if entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+        return True
+    
+    if entry.get('size') == st.st_size and entry.get('sha1') == file_sha1(midi_path):
+        entry['mtime_ns'] = st.st_mtime_ns
+        return True
+    
+    return False
+
+
+def update_analysis(sound_dir: Path, output_file: Path, incremental: bool = True,
+                    verbose: bool = True) -> List[str]:
+    """Orchestrated MIDI 분석 후 결과 JSON 갱신, 다시 분석한 track_id 목록 반환
+
+    incremental=True 이면 매니페스트와 비교해 변경된 폴더만 다시 분석하고
+    기존 JSON 에 병합합니다.
+    """
+    index = load_catalog_index(sound_dir)
+    manifest = _load_json(MANIFEST_FILE) if incremental else {}
+    previous = _load_json(output_file) if incremental else {}
+    
+    results = {}
+    updated = []
+    manifest_dirty = False
     
     for track_key, (track_id, track_title) in TRACK_MAPPING.items():
-        # 폴더명 패턴 찾기
-        track_folders = list(sound_dir.glob(f"{track_key}_*"))
+        midi_path = find_orchestrated_midi(index, track_key, verbose)
         
-        if not track_folders:
-            print(f"⚠️  {track_key} 폴더 없음")
+        if midi_path is None:
+            if track_id in previous:
+                results[track_id] = previous[track_id]
             continue
         
-        track_folder = track_folders[0]
-        orch_files = list(track_folder.glob('*Orchestrated.mid'))
-        
-        if not orch_files:
-            print(f"⚠️  {track_key}: Orchestrated.mid 없음")
+        entry = manifest.get(track_id)
+        recorded_mtime = entry.get('mtime_ns') if entry else None
+        if track_id in previous and _is_unchanged(midi_path, entry):
+            results[track_id] = previous[track_id]
+            manifest_dirty |= entry['mtime_ns'] != recorded_mtime
             continue
         
-        data = extract_instruments_and_tempo(orch_files[0])
+        try:
+            data = extract_instruments_and_tempo(midi_path)
+        except (OSError, ValueError) as e:
+            # 아직 쓰는 중인 파일 등은 다음 실행(감시 주기)에 다시 시도
+            print(f"❌ {track_key}: {midi_path.name} 분석 실패 ({e})")
+            if track_id in previous:
+                results[track_id] = previous[track_id]
+            continue
         
         results[track_id] = {
             'title': track_title,
@@ -203,28 +195,99 @@ def main():
             'instruments': data['instruments']
         }
         
+        st = midi_path.stat()
+        manifest[track_id] = {
+            'path': str(midi_path),
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha1': file_sha1(midi_path),
+        }
+        manifest_dirty = True
+        updated.append(track_id)
+        
         # 간소화된 악기 이름
         inst_str = ' / '.join(data['instruments'][:3])  # 최대 3개만
         
         print(f"✓ {track_key:5s} {track_title:20s} {data['tempo']:5.1f} BPM  [{inst_str}]")
     
-    # JSON 저장
-    output_file = project_root / 'midi_analysis_full.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    # 매핑에 없는 기존 항목은 뒤에 그대로 유지
+    for track_id, data in previous.items():
+        results.setdefault(track_id, data)
     
-    print(f"\n✅ 분석 완료! 결과 저장: {output_file}")
+    # JSON 저장 (증분 모드에서는 변경이 있을 때만)
+    if not incremental or updated or list(results) != list(previous):
+        _save_json(output_file, results)
     
-    # track_data.dart 업데이트 가이드
+    if manifest_dirty:
+        _save_json(MANIFEST_FILE, manifest, indent=None)
+    
+    return updated
+
+
+def print_instruments_guide(results: Dict, track_ids: Optional[List[str]] = None):
+    """track_data.dart Instruments 업데이트 가이드 출력"""
     print(f"\n{'='*100}")
     print("📝 track_data.dart Instruments 업데이트")
     print(f"{'='*100}\n")
     
     for track_id, data in results.items():
+        if track_ids is not None and track_id not in track_ids:
+            continue
         inst_str = ' / '.join(data['instruments'])
         print(f"// {data['title']}")
         print(f"'Instruments': '{inst_str}',")
         print()
 
+
+def watch(sound_dir: Path, output_file: Path, interval: float = WATCH_INTERVAL):
+    """새 Orchestrated MIDI 가 들어오면 결과 JSON 을 즉시 갱신 (Ctrl+C 로 종료)"""
+    print(f"👀 {sound_dir} 감시 중... ({interval}초 간격, Ctrl+C 종료)\n")
+    
+    update_analysis(sound_dir, output_file, incremental=True, verbose=False)
+    
+    try:
+        while True:
+            time.sleep(interval)
+            updated = update_analysis(sound_dir, output_file, incremental=True, verbose=False)
+            if updated:
+                print(f"💾 {len(updated)}곡 갱신 → {output_file.name}")
+                print_instruments_guide(_load_json(output_file), updated)
+    except KeyboardInterrupt:
+        print("\n감시 종료")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Orchestrated MIDI 전체 분석')
+    parser.add_argument('--incremental', '-i', action='store_true',
+                        help='변경된 폴더만 다시 분석하여 기존 JSON 에 병합')
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='새 Orchestrated.mid 를 감시하며 JSON 자동 갱신')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                        help=f'감시 주기 (초, 기본 {WATCH_INTERVAL})')
+    
+    args = parser.parse_args()
+    
+    if args.watch:
+        watch(SOUND_DIR, OUTPUT_FILE, args.interval)
+        return
+    
+    print("🎵 Orchestrated MIDI 분석 중...\n")
+    
+    updated = update_analysis(SOUND_DIR, OUTPUT_FILE, incremental=args.incremental)
+    results = _load_json(OUTPUT_FILE)
+    
+    if args.incremental:
+        print(f"\n✅ 증분 분석 완료! {len(updated)}곡 갱신, 결과: {OUTPUT_FILE}")
+        if updated:
+            print_instruments_guide(results, updated)
+        return
+    
+    print(f"\n✅ 분석 완료! 결과 저장: {OUTPUT_FILE}")
+    
+    # track_data.dart 업데이트 가이드
+    print_instruments_guide(results)
+
 if __name__ == '__main__':
     main()
@@ -6,18 +6,25 @@ MIDI 파일에서 사용된 악기 정보 추출 스크립트
     python scripts/analyze_midi_instruments.py
     python scripts/analyze_midi_instruments.py --file assets/sound/1_1.mid
     python scripts/analyze_midi_instruments.py --all
+    python scripts/analyze_midi_instruments.py --all --jobs 8
 """
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 
 try:
-    from mido import MidiFile, MidiTrack
-except ImportError:
-    print("❌ mido 라이브러리가 설치되지 않았습니다.")
-    print("다음 명령어로 설치하세요: pip install mido")
+    from midi_analysis import analyze_midi
+    from tempo_map import TempoMap
+except ImportError as e:
+    # midi_analysis / tempo_map 이 의존하는 mido, numpy 중 실제로 없는 모듈을 안내
+    print(f"❌ {e.name} 모듈을 불러올 수 없습니다.")
+    if e.name in ('midi_analysis', 'tempo_map'):
+        print("scripts/ 디렉토리의 모듈입니다. 저장소의 scripts/ 에서 실행하세요.")
+    else:
+        print(f"다음 명령어로 설치하세요: pip install {e.name}")
     sys.exit(1)
 
 
@@ -95,42 +102,34 @@ GM_INSTRUMENTS = {
 def analyze_midi_file(filepath: Path) -> Dict:
     """MIDI 파일 분석하여 악기 및 템포 정보 추출"""
     try:
-        midi = MidiFile(filepath)
+        facets = analyze_midi(filepath)
+        tempo_map = TempoMap.from_facets(facets)
         
         instruments: Set[int] = set()
         track_info: List[Dict] = []
-        tempo_changes: List[Dict] = []
         
-        # 템포 정보 추출
-        for i, track in enumerate(midi.tracks):
-            track_instruments: Set[int] = set()
-            current_time = 0
-            
-            for msg in track:
-                current_time += msg.time
-                
-                # Program Change 메시지에서 악기 정보 추출
-                if msg.type == 'program_change':
-                    instruments.add(msg.program)
-                    track_instruments.add(msg.program)
-                
-                # Set Tempo 메타 메시지에서 템포 정보 추출
-                elif msg.type == 'set_tempo':
-                    # microseconds per beat -> BPM 변환
-                    bpm = 60_000_000 / msg.tempo
-                    tempo_changes.append({
-                        'tick': current_time,
-                        'microseconds_per_beat': msg.tempo,
-                        'bpm': round(bpm, 2)
-                    })
+        for track in facets['tracks']:
+            instruments.update(track['programs'])
             
-            if track_instruments:
+            if track['programs']:
                 track_info.append({
-                    'track_number': i,
-                    'track_name': track.name if hasattr(track, 'name') else f'Track {i}',
-                    'instruments': sorted(list(track_instruments))
+                    'track_number': track['index'],
+                    'track_name': track['name'],
+                    'instruments': track['programs']
                 })
         
+        # 템포 정보 (microseconds per beat -> BPM 변환, 템포 맵 기준 실제 시각)
+        change_times_ms = tempo_map.ticks_to_ms([c['tick'] for c in facets['tempo_changes']]).tolist()
+        tempo_changes: List[Dict] = [
+            {
+                'tick': change['tick'],
+                'time_ms': time_ms,
+                'microseconds_per_beat': change['tempo'],
+                'bpm': round(60_000_000 / change['tempo'], 2)
+            }
+            for change, time_ms in zip(facets['tempo_changes'], change_times_ms)
+        ]
+        
         # 평균 템포 계산 (가장 많이 사용된 템포)
         avg_tempo = None
         if tempo_changes:
@@ -141,10 +140,11 @@ def analyze_midi_file(filepath: Path) -> Dict:
             'filename': filepath.name,
             'all_instruments': sorted(list(instruments)),
             'tracks': track_info,
-            'ticks_per_beat': midi.ticks_per_beat if hasattr(midi, 'ticks_per_beat') else None,
+            'ticks_per_beat': facets['ticks_per_beat'],
             'tempo_changes': tempo_changes,
             'bpm': avg_tempo,
-            'num_tracks': len(midi.tracks)
+            'duration_ms': tempo_map.tick_to_ms(facets['length_ticks']),
+            'num_tracks': facets['num_tracks']
         }
     
     except Exception as e:
@@ -167,6 +167,9 @@ def print_analysis(result: Dict):
     
     print(f"📊 트랙 수: {result['num_tracks']}")
     
+    duration_s = result['duration_ms'] // 1000
+    print(f"⏱️  길이: {duration_s // 60}:{duration_s % 60:02d}")
+    
     # 템포 정보 출력
     if result.get('bpm'):
         print(f"🎵 템포: {result['bpm']} BPM")
@@ -176,7 +179,7 @@ def print_analysis(result: Dict):
             if len(tempo_changes) > 1:
                 print(f"   ⚠️  템포 변경 {len(tempo_changes)}회 발견:")
                 for i, change in enumerate(tempo_changes, 1):
-                    print(f"      #{i}: {change['bpm']} BPM (Tick: {change['tick']})")
+                    print(f"      #{i}: {change['bpm']} BPM (Tick: {change['tick']}, {change['time_ms'] / 1000:.1f}s)")
             else:
                 print(f"   ✓ 고정 템포 (변경 없음)")
     else:
@@ -199,7 +202,42 @@ def print_analysis(result: Dict):
                 print(f"      - [{program:3d}] {instrument_name}")
 
 
-def analyze_all_midi_files(sound_dir: Path):
+def _analyze_chunk(midi_files: List[Path]) -> Tuple[List[Dict], Dict[int, int]]:
+    """파일 묶음 분석 후 결과와 부분 악기 사용 통계 반환 (워커 프로세스용)"""
+    results: List[Dict] = []
+    instrument_usage: Dict[int, int] = {}
+    
+    for midi_file in midi_files:
+        result = analyze_midi_file(midi_file)
+        results.append(result)
+        
+        if 'all_instruments' in result:
+            for program in result['all_instruments']:
+                instrument_usage[program] = instrument_usage.get(program, 0) + 1
+    
+    return results, instrument_usage
+
+
+def _iter_chunk_results(midi_files: List[Path], jobs: int):
+    """파일 순서를 유지하며 (결과 목록, 부분 통계)를 순회
+
+    jobs > 1 이면 연속된 파일 묶음을 프로세스 풀에 분배하고,
+    완료 순서와 관계없이 원래 순서대로 돌려줍니다.
+    """
+    if jobs <= 1:
+        for midi_file in midi_files:
+            yield _analyze_chunk([midi_file])
+        return
+    
+    # 워커당 여러 묶음을 주어 파일별 분석 시간 편차를 흡수
+    chunk_size = max(1, len(midi_files) // (jobs * 4))
+    chunks = [midi_files[i:i + chunk_size] for i in range(0, len(midi_files), chunk_size)]
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_analyze_chunk, chunks)
+
+
+def analyze_all_midi_files(sound_dir: Path, jobs: int = 1):
     """모든 MIDI 파일 분석"""
     midi_files = sorted(sound_dir.glob('*.mid'))
     
@@ -209,17 +247,15 @@ def analyze_all_midi_files(sound_dir: Path):
     
     print(f"\n🔍 총 {len(midi_files)}개의 MIDI 파일을 분석합니다...\n")
     
-    # 악기별 사용 횟수 통계
+    # 악기별 사용 횟수 통계 (워커별 부분 통계를 병합)
     instrument_usage: Dict[int, int] = {}
     
-    for midi_file in midi_files:
-        result = analyze_midi_file(midi_file)
-        print_analysis(result)
+    for results, partial_usage in _iter_chunk_results(midi_files, jobs):
+        for result in results:
+            print_analysis(result)
         
-        # 통계 수집
-        if 'all_instruments' in result:
-            for program in result['all_instruments']:
-                instrument_usage[program] = instrument_usage.get(program, 0) + 1
+        for program, count in partial_usage.items():
+            instrument_usage[program] = instrument_usage.get(program, 0) + count
     
     # 통계 출력
     print(f"\n{'='*80}")
@@ -240,6 +276,8 @@ def main():
     parser = argparse.ArgumentParser(description='MIDI 파일 악기 정보 분석 도구')
     parser.add_argument('--file', '-f', type=str, help='분석할 MIDI 파일 경로')
     parser.add_argument('--all', '-a', action='store_true', help='모든 MIDI 파일 분석')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='--all 병렬 분석 프로세스 수 (0 = CPU 코어 수)')
     
     args = parser.parse_args()
     
@@ -261,7 +299,8 @@ def main():
     
     elif args.all:
         # 모든 파일 분석
-        analyze_all_midi_files(sound_dir)
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        analyze_all_midi_files(sound_dir, jobs)
     
     else:
         # 기본: 대화형 모드
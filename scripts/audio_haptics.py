@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+오디오(MP3/WAV) 기반 햅틱 이벤트 추출
+
+저음역 노트가 없는 MIDI 트랙이나 MIDI 자체가 없는 날씨 앰비언스 / 노이즈 마스킹 트랙을 위해
+오디오를 ffmpeg 파이프로 디코딩(모노 s16le)해 NumPy 로 읽고, 벡터화된 STFT 로
+프레임별 저역(LOW_BAND_HZ) 에너지와 onset(스펙트럼 플럭스) 곡선을 구해
+기존 햅틱 패턴 JSON 과 같은 형식의 이벤트를 만듭니다.
+
+긴 파일도 메모리가 일정하도록 BLOCK_SECONDS 단위 블록으로 읽으며,
+프레임 경계 샘플 / 직전 스펙트럼 / onset 임계값용 이력은 블록 사이에 이어 갑니다.
+
+- time:     onset 프레임 중심 시각 (ms)
+- note:     저역에서 가장 센 주파수에 가까운 MIDI 노트 (LOW_NOTE_RANGE 로 제한)
+- velocity: 저역 에너지 dB 를 SILENCE_DB ~ 0dB -> 1~127 로 변환
+
+사용법:
+    python scripts/audio_haptics.py --weather                       # 날씨 사운드 전체
+    python scripts/audio_haptics.py assets/sound/weather/rain_ambient.mp3 --track-id weather_rain
+    python scripts/generate_all_haptic_patterns.py                  # 저음역 노트가 없으면 트랙 MP3 로 대체
+
+    from audio_haptics import extract_audio_haptic_events
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from haptic_codec import PATTERN_DIR, write_haptic_binary
+from haptic_profiles import select_spaced_indices
+from haptic_simplify import compute_stats
+from midi_analysis import LOW_NOTE_RANGE
+
+PROJECT_ROOT = Path(__file__).parent.parent
+WEATHER_DIR = PROJECT_ROOT / 'assets' / 'sound' / 'weather'
+
+SAMPLE_RATE = 11025          # 저역만 보므로 낮은 샘플레이트로 디코딩
+FRAME_SIZE = 2048            # 약 186ms 창, 주파수 해상도 약 5.4Hz
+HOP_SIZE = 256               # 약 23ms 간격
+BLOCK_SECONDS = 10           # 한 번에 읽는 오디오 길이
+LOW_BAND_HZ = (30, 150)      # 진동으로 옮길 저역 대역
+
+ONSET_HISTORY_FRAMES = 43    # onset 임계값을 구하는 직전 프레임 수 (약 1초)
+ONSET_RATIO = 2.0            # 직전 평균 대비 이 배수를 넘어야 onset
+ONSET_DELTA = 0.1            # 조용한 구간에서 잡음이 onset 이 되지 않도록 더하는 값
+ONSET_COMPRESSION = 10.0     # 플럭스 계산 전 log(1 + C * 크기) 압축 계수
+SILENCE_DB = -60.0           # 이보다 작은 저역 에너지는 무시
+MIN_EVENT_GAP_MS = 200       # 이벤트 최소 간격
+
+DEFAULT_BPM = 120.0
+BPM_RANGE = (60, 180)
+
+# 출력에 영향을 주는 추출 파라미터 (generate_all_haptic_patterns 가 재생성 여부 판단에 사용)
+AUDIO_PARAMS = {
+    'sample_rate': SAMPLE_RATE,
+    'frame_size': FRAME_SIZE,
+    'hop_size': HOP_SIZE,
+    'low_band_hz': list(LOW_BAND_HZ),
+    'onset_history_frames': ONSET_HISTORY_FRAMES,
+    'onset_ratio': ONSET_RATIO,
+    'onset_delta': ONSET_DELTA,
+    'onset_compression': ONSET_COMPRESSION,
+    'silence_db': SILENCE_DB,
+    'min_event_gap_ms': MIN_EVENT_GAP_MS,
+    'default_bpm': DEFAULT_BPM,
+    'bpm_range': list(BPM_RANGE),
+}
+
+
+def read_pcm_blocks(stream: BinaryIO, block_samples: int) -> Iterator[np.ndarray]:
+    """s16le 모노 바이트 스트림 -> float32 (-1~1) 블록"""
+    while True:
+        raw = stream.read(block_samples * 2)
+        if not raw:
+            return
+        usable = len(raw) - len(raw) % 2
+        if usable:
+            yield np.frombuffer(raw[:usable], dtype='<i2').astype(np.float32) / 32768.0
+
+
+def decode_audio_blocks(path: Path, sample_rate: int = SAMPLE_RATE,
+                        block_seconds: float = BLOCK_SECONDS) -> Iterator[np.ndarray]:
+    """ffmpeg 로 오디오 파일을 모노 sample_rate 로 디코딩하며 블록 단위로 반환"""
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError('ffmpeg 를 찾을 수 없습니다 (PATH 확인)')
+
+    cmd = [
+        'ffmpeg', '-v', 'error', '-nostdin', '-i', str(path),
+        '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate), '-',
+    ]
+    # stderr 는 임시 파일로 받아 stdout 을 읽는 동안 파이프 버퍼가 차서 멈추는 일이 없도록 함
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            yield from read_pcm_blocks(proc.stdout, int(sample_rate * block_seconds))
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        if proc.returncode != 0:
+            stderr.seek(0)
+            error = stderr.read().decode('utf-8', 'replace').strip()
+            raise RuntimeError(f"ffmpeg 디코딩 실패 ({path.name}): {error}")
+
+
+def _frequency_to_note(freqs: np.ndarray) -> np.ndarray:
+    notes = np.rint(69 + 12 * np.log2(np.maximum(freqs, 1.0) / 440.0))
+    return np.clip(notes, *LOW_NOTE_RANGE).astype(np.int64)
+
+
+class LowBandOnsets:
+    """블록 단위로 샘플을 받아 저역 onset 햅틱 이벤트를 내보내는 스트리밍 추출기
+
+    feed() 가 돌려주는 이벤트는 바로 앞 블록까지 확정된 것이고,
+    마지막 프레임은 다음 블록(또는 finish()) 에서 판정합니다.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_size: int = FRAME_SIZE,
+                 hop_size: int = HOP_SIZE):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hop_size = hop_size
+
+        window = np.hanning(frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(frame_size, 1 / sample_rate)
+        self.window = window
+        self.band = np.flatnonzero((freqs >= LOW_BAND_HZ[0]) & (freqs <= LOW_BAND_HZ[1]))
+        self.band_notes = _frequency_to_note(freqs[self.band])
+        # Parseval: 대역 성분의 RMS^2 가 되도록 하는 스케일
+        self.power_scale = 2.0 / (frame_size * float(np.sum(window.astype(np.float64) ** 2)))
+
+        self.frames_seen = 0
+        self._leftover = np.zeros(0, dtype=np.float32)
+        self._prev_log_mag: Optional[np.ndarray] = None
+
+        # onset 판정용 이력 (전역 프레임 번호 _carry_start 부터)
+        self._onset = np.zeros(0, dtype=np.float64)
+        self._energy_db = np.zeros(0, dtype=np.float64)
+        self._notes = np.zeros(0, dtype=np.int64)
+        self._carry_start = 0
+        self._next_eval = 0          # _onset 안에서 아직 판정하지 않은 첫 위치
+        self._last_event_ms = None
+
+    def _frame_features(self, frames: np.ndarray):
+        spectrum = np.fft.rfft(frames * self.window, axis=1)[:, self.band]
+        mag = np.abs(spectrum)
+
+        power = (mag.astype(np.float64) ** 2).sum(axis=1) * self.power_scale
+        energy_db = 10 * np.log10(power + 1e-12)
+        notes = self.band_notes[np.argmax(mag, axis=1)]
+
+        log_mag = np.log1p(ONSET_COMPRESSION * mag)
+        prev = log_mag[:1] if self._prev_log_mag is None else self._prev_log_mag
+        flux = np.maximum(np.diff(log_mag, axis=0, prepend=prev), 0).sum(axis=1)
+        self._prev_log_mag = log_mag[-1:]
+        return flux / len(self.band), energy_db, notes
+
+    def _frame_samples(self, samples: np.ndarray) -> np.ndarray:
+        """이전 블록 남은 샘플과 이어 붙여 완성되는 프레임만 (프레임 수, FRAME_SIZE) 뷰로"""
+        buf = np.concatenate([self._leftover, samples]) if len(self._leftover) else samples
+        if len(buf) < self.frame_size:
+            self._leftover = buf
+            return np.zeros((0, self.frame_size), dtype=np.float32)
+        count = (len(buf) - self.frame_size) // self.hop_size + 1
+        frames = np.lib.stride_tricks.sliding_window_view(buf, self.frame_size)[::self.hop_size][:count]
+        self._leftover = buf[count * self.hop_size:].copy()
+        return frames
+
+    def _pick(self, onset, energy_db, notes) -> List[Dict]:
+        """새 프레임 특징을 이력에 붙이고, 다음 프레임이 있는 위치까지 onset 피크 판정"""
+        o = np.concatenate([self._onset, onset])
+        e = np.concatenate([self._energy_db, energy_db])
+        n = np.concatenate([self._notes, notes])
+        total = len(o)
+
+        idx = np.arange(self._next_eval, max(self._next_eval, total - 1))
+        events: List[Dict] = []
+        if len(idx):
+            csum = np.concatenate(([0.0], np.cumsum(o)))
+            global_idx = idx + self._carry_start
+            lo = np.maximum(idx - ONSET_HISTORY_FRAMES, 0)
+            history = idx - lo
+            mean = (csum[idx] - csum[lo]) / np.maximum(history, 1)
+            threshold = mean * ONSET_RATIO + ONSET_DELTA
+
+            peak = ((history > 0) & (global_idx > 0)
+                    & (o[idx] > threshold)
+                    & (o[idx] >= o[np.maximum(idx - 1, 0)])
+                    & (o[idx] > o[idx + 1])
+                    & (e[idx] > SILENCE_DB))
+            rows = idx[peak]
+            # 프레임 중심 시각
+            times = ((rows + self._carry_start) * self.hop_size + self.frame_size // 2) * 1000 // self.sample_rate
+
+            # 이전 블록 마지막 이벤트와의 간격도 지키도록 먼저 거른 뒤 간격 선택
+            if self._last_event_ms is not None:
+                keep = times >= self._last_event_ms + MIN_EVENT_GAP_MS
+                rows, times = rows[keep], times[keep]
+            kept = select_spaced_indices(times, MIN_EVENT_GAP_MS)
+            rows, times = rows[kept], times[kept]
+
+            velocities = np.clip(np.rint((e[rows] - SILENCE_DB) / -SILENCE_DB * 126 + 1), 1, 127)
+            events = [
+                {'time': t, 'note': note, 'velocity': v}
+                for t, note, v in zip(times.tolist(), n[rows].tolist(), velocities.astype(np.int64).tolist())
+            ]
+            if events:
+                self._last_event_ms = events[-1]['time']
+
+        # 임계값 이력 + 아직 판정하지 않은 마지막 프레임만 남김
+        evaluated_to = max(self._next_eval, total - 1)
+        keep_from = max(0, total - (ONSET_HISTORY_FRAMES + 1))
+        self._onset, self._energy_db, self._notes = o[keep_from:], e[keep_from:], n[keep_from:]
+        self._carry_start += keep_from
+        self._next_eval = evaluated_to - keep_from
+        return events
+
+    def feed(self, samples: np.ndarray) -> List[Dict]:
+        """float32 모노 샘플 블록 -> 확정된 햅틱 이벤트"""
+        frames = self._frame_samples(np.asarray(samples, dtype=np.float32))
+        if len(frames) == 0:
+            return []
+        self.frames_seen += len(frames)
+        return self._pick(*self._frame_features(frames))
+
+    def finish(self) -> List[Dict]:
+        """남은 샘플을 0 으로 채워 마지막 프레임까지 판정"""
+        events = self.feed(np.zeros(self.frame_size, dtype=np.float32)) if len(self._leftover) else []
+        # 마지막 프레임 뒤에 onset 0 / 무음 프레임을 하나 두어 판정
+        return events + self._pick(np.zeros(1), np.full(1, -np.inf), np.zeros(1, dtype=np.int64))
+
+    @property
+    def duration_ms(self) -> int:
+        return self.frames_seen * self.hop_size * 1000 // self.sample_rate
+
+
+def estimate_bpm(events: List[Dict]) -> float:
+    """이벤트 간격 중앙값 -> BPM_RANGE 안으로 옥타브 접기 (이벤트가 적으면 DEFAULT_BPM)
+
+    MIDI 패턴의 bpm(TempoMap.initial_bpm)과 같이 소수 첫째 자리까지의 float 입니다.
+    """
+    if len(events) < 3:
+        return DEFAULT_BPM
+    intervals = np.diff([event['time'] for event in events])
+    bpm = 60_000 / max(float(np.median(intervals)), 1.0)
+    while bpm < BPM_RANGE[0]:
+        bpm *= 2
+    while bpm > BPM_RANGE[1]:
+        bpm /= 2
+    return round(bpm, 1)
+
+
+def extract_audio_haptic_events(audio_path: Path, block_seconds: float = BLOCK_SECONDS) -> Dict:
+    """오디오 파일 -> {'bpm', 'events'} (extract_haptic_events 와 같은 형식)"""
+    tracker = LowBandOnsets()
+    events: List[Dict] = []
+    for block in decode_audio_blocks(Path(audio_path), tracker.sample_rate, block_seconds):
+        events.extend(tracker.feed(block))
+    events.extend(tracker.finish())
+    return {'bpm': estimate_bpm(events), 'events': events, 'duration_ms': tracker.duration_ms}
+
+
+def save_audio_pattern(track_id: str, result: Dict, output_dir: Path = PATTERN_DIR) -> Path:
+    """추출 결과를 햅틱 패턴 JSON (+ .hpat) 으로 저장"""
+    json_data = {
+        'track_id': track_id,
+        'haptic_enabled': True,
+        'bpm': result['bpm'],
+        'events': result['events'],
+        'stats': compute_stats(result['events']),
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"{track_id}.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    write_haptic_binary(output_file, json_data)
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='오디오 저역 onset 기반 햅틱 패턴 생성')
+    parser.add_argument('files', nargs='*', type=Path, help='MP3/WAV 파일')
+    parser.add_argument('--weather', '-w', action='store_true', help='assets/sound/weather 의 모든 MP3')
+    parser.add_argument('--track-id', help='출력 트랙 ID (파일 하나일 때, 기본은 파일 이름)')
+    parser.add_argument('--output-dir', '-o', type=Path, default=PATTERN_DIR, help='출력 디렉토리')
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.weather:
+        files.extend(sorted(WEATHER_DIR.glob('*.mp3')))
+    if not files:
+        parser.error('오디오 파일 또는 --weather 가 필요합니다')
+    if args.track_id and len(files) != 1:
+        parser.error('--track-id 는 파일 하나에만 쓸 수 있습니다')
+
+    print("🔊 오디오 기반 햅틱 패턴 생성 중...\n")
+    generated = 0
+    for audio_path in files:
+        track_id = args.track_id or (f"weather_{audio_path.stem}" if audio_path.parent == WEATHER_DIR
+                                     else audio_path.stem)
+        print(f"📁 {track_id} ({audio_path.name})")
+        try:
+            result = extract_audio_haptic_events(audio_path)
+        except (RuntimeError, OSError, ValueError) as e:
+            print(f"   ❌ {e}\n")
+            continue
+        if not result['events']:
+            print(f"   ⚠️  저역 onset 없음\n")
+            continue
+        save_audio_pattern(track_id, result, args.output_dir)
+        stats = compute_stats(result['events'])
+        print(f"   ✅ {stats['total_events']}개 이벤트 생성 ({result['duration_ms'] / 1000:.1f}초 분석)")
+        print(f"   📊 BPM: {result['bpm']}, 평균 Velocity: {stats['avg_velocity']}\n")
+        generated += 1
+
+    print(f"✅ 완료! {generated}개 햅틱 패턴 생성")
+    print(f"출력 경로: {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+MIDI 분석 스크립트 벤치마크 + 합성 MIDI 코퍼스 생성기
+
+실제 assets/sound 코퍼스와 카탈로그의 N배 규모로 생성한 합성 코퍼스에서
+분석 함수들의 처리량(files/s, events/s)과 최대 메모리(RSS)를 측정하고
+결과를 JSON 으로 저장합니다. 각 측정은 별도 프로세스에서 빈 분석 캐시로
+시작하여 cold(첫 실행) / warm(캐시 적중) 을 나눠 기록합니다.
+
+사용법:
+    python scripts/benchmark_midi.py                          # 실제 코퍼스 + 10배 합성 코퍼스
+    python scripts/benchmark_midi.py --scales 10 100 1000     # 규모별 합성 코퍼스
+    python scripts/benchmark_midi.py --tracks 8 --density 12 --tempo-changes 4
+    python scripts/benchmark_midi.py --compare .cache/benchmarks/이전결과.json
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
+CORPUS_DIR = PROJECT_ROOT / '.cache' / 'bench_corpus'
+RESULTS_DIR = PROJECT_ROOT / '.cache' / 'benchmarks'
+
+# 측정 대상: 이름 -> (모듈, 함수)
+BENCH_TARGETS = {
+    'analyze_midi_file': ('analyze_midi_instruments', 'analyze_midi_file'),
+    'extract_instruments_and_tempo': ('analyze_all_orchestrated', 'extract_instruments_and_tempo'),
+    'extract_haptic_events': ('generate_all_haptic_patterns', 'extract_haptic_events'),
+    'deep_analyze_midi': ('deep_midi_analysis', 'deep_analyze_midi'),
+}
+
+TICKS_PER_BEAT = 480
+BASE_TEMPO = 500000  # 120 BPM
+
+
+# ---------------------------------------------------------------------------
+# 합성 코퍼스 생성
+# ---------------------------------------------------------------------------
+
+def _varint(value: int) -> bytes:
+    """가변 길이 정수 인코딩"""
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def _track_chunk(events) -> bytes:
+    """(절대 tick, 이벤트 바이트) 목록 -> MTrk 청크"""
+    body = bytearray()
+    last_tick = 0
+    for tick, data in events:
+        body += _varint(tick - last_tick)
+        body += data
+        last_tick = tick
+    body += b'\x00\xff\x2f\x00'  # end_of_track
+    return b'MTrk' + struct.pack('>I', len(body)) + bytes(body)
+
+
+def _meta_text(meta_type: int, text: str) -> bytes:
+    raw = text.encode('latin1')
+    return bytes([0xFF, meta_type]) + _varint(len(raw)) + raw
+
+
+def synthesize_midi(rng: np.random.Generator, tracks: int = 3, notes_per_sec: float = 4.0,
+                    tempo_changes: int = 0, duration: float = 300.0):
+    """합성 MIDI (format 1) 바이트와 메시지 수 반환
+
+    트랙 0 은 템포 트랙, 나머지 트랙은 채널/악기가 하나씩인 노트 트랙입니다.
+    """
+    total_ticks = int(duration * 1_000_000 / BASE_TEMPO * TICKS_PER_BEAT)
+    chunks = []
+    num_messages = 0
+
+    # 템포 트랙: 시작 템포 + 균등 간격 템포 변경
+    conductor = [(0, _meta_text(0x03, 'Tempo')), (0, b'\xff\x51\x03' + BASE_TEMPO.to_bytes(3, 'big'))]
+    for i in range(1, tempo_changes + 1):
+        tempo = int(BASE_TEMPO * rng.uniform(0.6, 1.4))
+        conductor.append((total_ticks * i // (tempo_changes + 1), b'\xff\x51\x03' + tempo.to_bytes(3, 'big')))
+    chunks.append(_track_chunk(conductor))
+    num_messages += len(conductor) + 1
+
+    num_notes = int(notes_per_sec * duration)
+    for track in range(tracks):
+        channel = track % 16
+        if channel == 9:  # 드럼 채널 회피
+            channel = 15
+        program = int(rng.integers(0, 128))
+
+        onsets = np.sort(rng.integers(0, total_ticks, num_notes))
+        lengths = rng.integers(TICKS_PER_BEAT // 8, TICKS_PER_BEAT * 2, num_notes)
+        notes = rng.integers(24, 97, num_notes)
+        velocities = rng.integers(30, 111, num_notes)
+
+        # note_off 가 같은 tick 의 note_on 보다 먼저 오도록 (tick, 종류) 순 정렬
+        ticks = np.concatenate([onsets, onsets + lengths])
+        kinds = np.concatenate([np.ones(num_notes, dtype=np.int64), np.zeros(num_notes, dtype=np.int64)])
+        order = np.lexsort((kinds, ticks))
+
+        events = [
+            (0, _meta_text(0x03, f'Synth {track + 1}')),
+            (0, bytes([0xC0 | channel, program])),
+        ]
+        for idx in order.tolist():
+            n = idx % num_notes
+            if idx < num_notes:
+                data = bytes([0x90 | channel, int(notes[n]), int(velocities[n])])
+            else:
+                data = bytes([0x80 | channel, int(notes[n]), 0])
+            events.append((int(ticks[idx]), data))
+
+        chunks.append(_track_chunk(events))
+        num_messages += len(events) + 1
+
+    header = b'MThd' + struct.pack('>IHHH', 6, 1, len(chunks), TICKS_PER_BEAT)
+    return header + b''.join(chunks), num_messages
+
+
+def generate_synthetic_corpus(out_dir: Path, num_files: int, tracks: int, notes_per_sec: float,
+                              tempo_changes: int, duration: float, seed: int = 0) -> Dict:
+    """합성 코퍼스 생성 (같은 설정으로 이미 만든 코퍼스가 있으면 재사용)"""
+    info_file = out_dir / 'corpus.json'
+    if info_file.exists():
+        with open(info_file, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if info.get('num_files') == num_files:
+            return info
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"🛠️  합성 코퍼스 생성 중: {out_dir.name} ({num_files}개 파일)")
+
+    total_messages = 0
+    for i in range(num_files):
+        rng = np.random.default_rng(seed + i)
+        data, num_messages = synthesize_midi(rng, tracks, notes_per_sec, tempo_changes, duration)
+        (out_dir / f"synth_{i:06d}.mid").write_bytes(data)
+        total_messages += num_messages
+
+    info = {
+        'num_files': num_files,
+        'events': total_messages,
+        'tracks': tracks,
+        'notes_per_sec': notes_per_sec,
+        'tempo_changes': tempo_changes,
+        'duration': duration,
+        'seed': seed,
+    }
+    with open(info_file, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    return info
+
+
+def count_corpus_events(midi_files: List[Path]) -> int:
+    """코퍼스 전체 MIDI 메시지 수 (분석 캐시 사용)"""
+    from midi_analysis import analyze_midi
+
+    total = 0
+    for midi_file in midi_files:
+        facets = analyze_midi(midi_file)
+        total += sum(sum(track['msg_types'].values()) for track in facets['tracks'])
+    return total
+
+
+# ---------------------------------------------------------------------------
+# 측정
+# ---------------------------------------------------------------------------
+
+def _peak_rss_mb() -> Optional[float]:
+    """현재 프로세스 최대 RSS (MB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 byte 단위
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _bench_worker(target: str, midi_files: List[str]) -> Dict:
+    """별도 프로세스에서 빈 캐시로 cold/warm 두 번 측정"""
+    import midi_analysis
+
+    module_name, func_name = BENCH_TARGETS[target]
+    func = getattr(importlib.import_module(module_name), func_name)
+    paths = [Path(p) for p in midi_files]
+
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix='midi_bench_') as cache_dir:
+        midi_analysis.CACHE_DIR = Path(cache_dir)
+        for phase in ('cold', 'warm'):
+            # deep_analyze_midi 등의 출력은 버림
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for path in paths:
+                    func(path)
+                timings[phase] = time.perf_counter() - start
+
+    return {'timings': timings, 'peak_rss_mb': _peak_rss_mb()}
+
+
+def run_benchmark(corpus_name: str, midi_files: List[Path], num_events: int,
+                  targets: List[str]) -> List[Dict]:
+    """코퍼스 하나에 대해 모든 대상 함수 측정"""
+    results = []
+    files = [str(p) for p in midi_files]
+
+    for target in targets:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            measured = executor.submit(_bench_worker, target, files).result()
+
+        for phase, elapsed in measured['timings'].items():
+            record = {
+                'corpus': corpus_name,
+                'target': target,
+                'phase': phase,
+                'files': len(files),
+                'events': num_events,
+                'seconds': round(elapsed, 4),
+                'files_per_sec': round(len(files) / elapsed, 1) if elapsed else None,
+                'events_per_sec': round(num_events / elapsed) if elapsed else None,
+                'peak_rss_mb': measured['peak_rss_mb'],
+            }
+            results.append(record)
+            print(f"   {target:32s} {phase:4s} {elapsed:8.2f}s  "
+                  f"{record['files_per_sec']:>10,.1f} files/s  {record['events_per_sec']:>12,} events/s  "
+                  f"RSS {record['peak_rss_mb']} MB")
+
+    return results
+
+
+def compare_results(previous_file: Path, results: List[Dict]):
+    """이전 결과 JSON 과 처리량 비교"""
+    with open(previous_file, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+
+    baseline = {
+        (r['corpus'], r['target'], r['phase']): r for r in previous['results']
+    }
+
+    print(f"\n{'='*80}")
+    print(f"📈 이전 결과 대비 ({previous_file.name})")
+    print(f"{'='*80}")
+
+    for record in results:
+        old = baseline.get((record['corpus'], record['target'], record['phase']))
+        if not old or not old['files_per_sec']:
+            continue
+        ratio = record['files_per_sec'] / old['files_per_sec']
+        print(f"   {record['corpus']:20s} {record['target']:32s} {record['phase']:4s} x{ratio:.2f}")
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='MIDI 분석 스크립트 벤치마크')
+    parser.add_argument('--scales', type=int, nargs='*', default=[10],
+                        help='합성 코퍼스 규모 (실제 카탈로그 파일 수의 배수)')
+    parser.add_argument('--tracks', type=int, default=3, help='합성 파일당 노트 트랙 수')
+    parser.add_argument('--density', type=float, default=4.0, help='트랙당 초당 노트 수')
+    parser.add_argument('--tempo-changes', type=int, default=0, help='합성 파일당 템포 변경 횟수')
+    parser.add_argument('--duration', type=float, default=300.0, help='합성 파일 길이 (초)')
+    parser.add_argument('--targets', nargs='*', choices=list(BENCH_TARGETS), default=list(BENCH_TARGETS),
+                        help='측정할 함수')
+    parser.add_argument('--skip-real', action='store_true', help='실제 코퍼스 측정 생략')
+    parser.add_argument('--output', type=str, help='결과 JSON 경로')
+    parser.add_argument('--compare', type=str, help='비교할 이전 결과 JSON')
+
+    args = parser.parse_args()
+
+    real_files = sorted(SOUND_DIR.rglob('*.mid'))
+    results = []
+
+    if not args.skip_real:
+        print(f"\n🎵 실제 코퍼스: {len(real_files)}개 파일")
+        results += run_benchmark('real', real_files, count_corpus_events(real_files), args.targets)
+
+    for scale in args.scales:
+        num_files = len(real_files) * scale
+        corpus_name = (f"x{scale}_t{args.tracks}_d{args.density:g}"
+                       f"_c{args.tempo_changes}_s{args.duration:g}")
+        corpus_dir = CORPUS_DIR / corpus_name
+        info = generate_synthetic_corpus(corpus_dir, num_files, args.tracks, args.density,
+                                         args.tempo_changes, args.duration)
+
+        print(f"\n🧪 합성 코퍼스 {corpus_name}: {info['num_files']}개 파일, {info['events']:,}개 메시지")
+        synth_files = sorted(corpus_dir.glob('*.mid'))
+        results += run_benchmark(corpus_name, synth_files, info['events'], args.targets)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': vars(args),
+        'results': results,
+    }
+
+    if args.output:
+        output_file = Path(args.output)
+    else:
+        output_file = RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✅ 결과 저장: {output_file}")
+
+    if args.compare:
+        compare_results(Path(args.compare), results)
+
+
+if __name__ == '__main__':
+    main()
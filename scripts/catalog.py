@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+트랙 카탈로그 인덱스
+
+assets/sound 를 os.scandir 한 번의 순회로 훑어 트랙 번호(예: 1_1)마다
+폴더, 평면 MIDI(1_1.mid), Orchestrated/Reduced MIDI, MP3, 햅틱 JSON 경로를 정리하고
+디스크(.cache/catalog_index.json)에 저장합니다. 스크립트마다 트랙별로
+glob 하던 것을 대신하며, 트랙 매핑 테이블(TRACK_MAPPING)도 여기 한 곳에서 관리합니다.
+
+디렉토리 mtime 이 바뀌지 않았다면 저장된 인덱스를 그대로 사용하고,
+파일이 추가/삭제/이름 변경되면 자동으로 다시 만듭니다.
+
+한 폴더에 *Orchestrated.mid / *Reduced.mid 가 여러 개면 이름순 첫 파일을 쓰되,
+모든 후보를 항목의 'candidates' 에 기록하고 인덱스를 (다시) 만들 때 stderr 에 경고합니다.
+저장된 인덱스를 그대로 쓸 때는 경고하지 않으므로 감시 루프에서 같은 경고가 반복되지 않습니다.
+
+사용법:
+    python scripts/catalog.py              # 인덱스 생성 후 요약 출력
+    python scripts/catalog.py --rebuild    # 강제 재생성
+
+    from catalog import load_catalog_index
+    index = load_catalog_index()
+    entry = index['1_1']            # 트랙 번호로 조회
+    entry = index.by_id['sleep_01']  # 트랙 ID 로 조회
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
+HAPTIC_DIR = PROJECT_ROOT / 'assets' / 'haptic_patterns'
+INDEX_FILE = PROJECT_ROOT / '.cache' / 'catalog_index.json'
+
+# 인덱스 구조가 바뀌면 올려서 기존 인덱스를 무효화
+INDEX_VERSION = 2
+
+# 인덱스 항목의 경로 필드
+PATH_FIELDS = ('folder', 'midi', 'orchestrated', 'reduced', 'mp3', 'haptic')
+
+# 폴더 안에서 여러 파일이 맞을 수 있는 필드 -> 파일 이름 끝
+VERSION_SUFFIXES = {'orchestrated': 'Orchestrated.mid', 'reduced': 'Reduced.mid'}
+
+_TRACK_KEY_RE = re.compile(r'^(\d+_\d+)(?:_|\.mid$|\.mp3$)')
+
+# 트랙 번호 -> (트랙 ID, 재구성 제목) 매핑 (앱 표시 제목은 APP_TRACK_TITLES)
+TRACK_MAPPING = {
+    # 강아지 트랙 (1-5)
+    '1_1': ('sleep_01', '온화한 밤'),
+    '1_2': ('sleep_02', '따뜻한 오후'),
+    '1_3': ('sleep_03', '깊은 안정'),
+    '1_4': ('sleep_04', '부드러운 포옹'),
+    '1_5': ('sleep_05', '깊은 울림'),
+    '1_6': ('sleep_06', '포근한 선율'),
+    '1_7': ('sleep_07', '맑은 아침'),
+    '1_8': ('sleep_08', '맑은 울림'),
+    '2_1': ('separation_01', '묵직한 위로'),
+    '2_2': ('separation_02', '따뜻한 공명'),
+    '2_3': ('separation_03', '평온한 균형'),
+    '2_4': ('separation_04', '포근한 쉼'),
+    '2_5': ('separation_05', '산뜻한 안정'),
+    '2_6': ('separation_06', '밝은 위로'),
+    '2_7': ('separation_07', '평온한 오후'),
+    '2_8': ('separation_08', '평화로운 쉼터'),
+    '3_1': ('noise_01', '부드러운 장막'),
+    '3_2': ('noise_02', '깊은 방패'),
+    '3_3': ('noise_03', '일상의 평온'),
+    '3_4': ('noise_04', '든든한 보호'),
+    '3_5': ('noise_05', '산뜻한 보호막'),
+    '3_6': ('noise_06', '포근한 담요'),
+    '3_7': ('noise_07', '고요한 공간'),
+    '3_8': ('noise_08', '깊은 고요'),
+    '4_1': ('energy_01', '리드미컬 산책'),
+    '4_2': ('energy_02', '활기찬 움직임'),
+    '4_3': ('energy_03', '경쾌한 발걸음'),
+    '4_4': ('energy_04', '신나는 놀이'),
+    '4_5': ('energy_05', '가벼운 발걸음'),
+    '4_6': ('energy_06', '신나는 질주'),
+    '4_7': ('energy_07', '밝은 나들이'),
+    '4_8': ('energy_08', '리드미컬한 박자'),
+    '5_1': ('senior_01', '치유의 선율'),
+    '5_2': ('senior_02', '깊은 안정'),
+    '5_3': ('senior_03', '부드러운 공명'),
+    '5_4': ('senior_04', '편안한 휴식'),
+    '5_5': ('senior_05', '포근한 온기'),
+    '5_6': ('senior_06', '산뜻한 평온'),
+    '5_7': ('senior_07', '깊은 안식'),
+    '5_8': ('senior_08', '평온한 품'),
+    
+    # 고양이 트랙 (6-10)
+    '6_1': ('cat_sleep_01', '편안한 리듬'),
+    '6_2': ('cat_sleep_02', '맑은 별빛'),
+    '6_3': ('cat_sleep_03', '깊은 휴식'),
+    '6_4': ('cat_sleep_04', '고요한 밤'),
+    '6_5': ('cat_sleep_05', '은은한 달빛'),
+    '6_6': ('cat_sleep_06', '포근한 꿈'),
+    '6_7': ('cat_sleep_07', '따뜻한 쉼터'),
+    '6_8': ('cat_sleep_08', '부드러운 울림'),
+    '7_1': ('cat_separation_01', '안전한 공간'),
+    '7_2': ('cat_separation_02', '맑은 오후'),
+    '7_3': ('cat_separation_03', '평온한 안식처'),
+    '7_4': ('cat_separation_04', '부드러운 바람'),
+    '7_5': ('cat_separation_05', '따뜻한 동행'),
+    '7_6': ('cat_separation_06', '따스한 시간'),
+    '7_7': ('cat_separation_07', '편안한 일상'),
+    '7_8': ('cat_separation_08', '고요한 순간'),
+    '8_1': ('cat_noise_01', '부드러운 차단'),
+    '8_2': ('cat_noise_02', '자연의 속삭임'),
+    '8_3': ('cat_noise_03', '따뜻한 보호막'),
+    '8_4': ('cat_noise_04', '깊은 평온'),
+    '8_5': ('cat_noise_05', '평화로운 정원'),
+    '8_6': ('cat_noise_06', '흐르는 평온'),
+    '8_7': ('cat_noise_07', '고요한 방어막'),
+    '8_8': ('cat_noise_08', '부드러운 배경'),
+    '9_1': ('cat_energy_01', '경쾌한 질주'),
+    '9_2': ('cat_energy_02', '신나는 추격'),
+    '9_3': ('cat_energy_03', '가벼운 도약'),
+    '9_4': ('cat_energy_04', '활기찬 움직임'),
+    '9_5': ('cat_energy_05', '모험의 시작'),
+    '9_6': ('cat_energy_06', '즐거운 놀이'),
+    '9_7': ('cat_energy_07', '신나는 파티'),
+    '9_8': ('cat_energy_08', '리드미컬한 춤'),
+    '10_1': ('cat_senior_01', '치유의 선율'),
+    '10_2': ('cat_senior_02', '따뜻한 위로'),
+    '10_3': ('cat_senior_03', '평온한 오후'),
+    '10_4': ('cat_senior_04', '추억의 여운'),
+    '10_5': ('cat_senior_05', '깊은 공명'),
+    '10_6': ('cat_senior_06', '따스한 심박'),
+    '10_7': ('cat_senior_07', '고요한 쉼터'),
+    '10_8': ('cat_senior_08', '편안한 호흡'),
+}
+
+
+# 앱에 표시되는 강아지 트랙 제목 (lib/app/translations/ko_kr.dart 의 track_<id>_title)
+# TRACK_MAPPING 의 제목은 analyze_all_orchestrated 의 재구성 제목이라 일부가 앱과 다르며,
+# 고양이 트랙은 두 제목이 같으므로 따로 두지 않습니다.
+APP_TRACK_TITLES = {
+    'sleep_01': '스탠다드 자장가',
+    'sleep_02': '따뜻한 오후',
+    'sleep_03': '깊은 밤의 꿈',
+    'sleep_04': '엄마의 요람',
+    'sleep_05': '깊은 울림',
+    'sleep_06': '포근한 왈츠',
+    'sleep_07': '맑은 아침',
+    'sleep_08': '사뿐한 왈츠',
+    'separation_01': '묵직한 위로',
+    'separation_02': '따뜻한 공명',
+    'separation_03': '균형 잡힌 안정',
+    'separation_04': '포근한 공기',
+    'separation_05': '산뜻한 안정',
+    'separation_06': '밝은 공기',
+    'separation_07': '평온한 오후',
+    'separation_08': '숲속의 쉼터',
+    'noise_01': '부드러운 장막',
+    'noise_02': '깊은 방패',
+    'noise_03': '일상의 평온',
+    'noise_04': '든든한 방음벽',
+    'noise_05': '산뜻한 보호막',
+    'noise_06': '포근한 담요',
+    'noise_07': '우주 여행',
+    'noise_08': '깊은 바다',
+    'energy_01': '리드미컬 산책',
+    'energy_02': '활기찬 터그',
+    'energy_03': '경쾌한 총총',
+    'energy_04': '신나는 술래',
+    'energy_05': '사뿐한 총총',
+    'energy_06': '신나는 우다다',
+    'energy_07': '피크닉',
+    'energy_08': '댄스 타임',
+    'senior_01': '치유의 주파수',
+    'senior_02': '깊은 안정',
+    'senior_03': '부드러운 공명',
+    'senior_04': '편안한 휴식',
+    'senior_05': '포근한 온기',
+    'senior_06': '산뜻한 평온',
+    'senior_07': '영혼의 안식',
+    'senior_08': '자연의 품',
+}
+
+
+def app_title(track_key: str) -> str:
+    """트랙 번호 -> 앱 표시 제목 (없으면 TRACK_MAPPING 의 제목)"""
+    track_id, title = TRACK_MAPPING[track_key]
+    return APP_TRACK_TITLES.get(track_id, title)
+
+
+def is_cat_track(track_key: str) -> bool:
+    """고양이 트랙 여부 (6_X ~ 10_X)"""
+    return int(track_key.split('_')[0]) >= 6
+
+
+class CatalogIndex(dict):
+    """트랙 번호 -> 항목 dict, by_id 로 트랙 ID 조회 (모두 O(1))"""
+
+    def __init__(self, entries: Dict[str, Dict]):
+        super().__init__(entries)
+        self.by_id = {e['track_id']: e for e in entries.values() if e['track_id']}
+
+
+def _relative(path: Path) -> str:
+    return Path(os.path.relpath(path, PROJECT_ROOT)).as_posix()
+
+
+def _scan(sound_dir: Path, haptic_dir: Path):
+    """sound_dir 한 번 순회로 인덱스 항목과 디렉토리 mtime 수집"""
+    entries: Dict[str, Dict] = {}
+    dir_mtimes = {_relative(sound_dir): sound_dir.stat().st_mtime_ns}
+
+    def entry_for(track_key: str) -> Dict:
+        if track_key not in entries:
+            track_id, title = TRACK_MAPPING.get(track_key, (None, None))
+            entries[track_key] = {'track_key': track_key, 'track_id': track_id, 'title': title,
+                                  **{field: None for field in PATH_FIELDS}, 'candidates': {}}
+        return entries[track_key]
+
+    with os.scandir(sound_dir) as it:
+        top_level = sorted(it, key=lambda e: e.name)
+
+    for item in top_level:
+        match = _TRACK_KEY_RE.match(item.name)
+        if not match:
+            continue
+        entry = entry_for(match.group(1))
+
+        if item.is_file():
+            if item.name.endswith('.mid'):
+                entry['midi'] = _relative(Path(item.path))
+            elif item.name.endswith('.mp3'):
+                entry['mp3'] = _relative(Path(item.path))
+            continue
+
+        if not item.is_dir() or entry['folder']:
+            continue
+
+        folder = Path(item.path)
+        entry['folder'] = _relative(folder)
+        dir_mtimes[entry['folder']] = item.stat().st_mtime_ns
+
+        with os.scandir(folder) as it:
+            names = sorted(e.name for e in it if e.is_file())
+
+        for field, suffix in VERSION_SUFFIXES.items():
+            matches = [_relative(folder / name) for name in names if name.endswith(suffix)]
+            if matches:
+                entry[field] = matches[0]
+            if len(matches) > 1:
+                # 어느 내보내기가 맞는지 알 수 없음 -> 모든 후보를 남겨 경고
+                entry['candidates'][field] = matches
+
+        for name in names:
+            if name.endswith('.mp3') and not name.endswith('.tmp.mp3'):
+                # 평면 MP3(1_1.mp3)가 있으면 그것을 우선
+                entry['mp3'] = entry['mp3'] or _relative(folder / name)
+
+    if haptic_dir.exists():
+        dir_mtimes[_relative(haptic_dir)] = haptic_dir.stat().st_mtime_ns
+        with os.scandir(haptic_dir) as it:
+            haptic_files = {e.name: e.path for e in it if e.name.endswith('.json')}
+        for entry in entries.values():
+            path = haptic_files.get(f"{entry['track_id']}.json")
+            if path:
+                entry['haptic'] = _relative(Path(path))
+
+    # 매핑된 트랙은 TRACK_MAPPING 순서, 나머지는 이름순
+    ordered = {key: entries.pop(key) for key in TRACK_MAPPING if key in entries}
+    ordered.update(entries)
+    return ordered, dir_mtimes
+
+
+def _is_fresh(data: Dict) -> bool:
+    """저장된 인덱스의 디렉토리 mtime 이 그대로인지 확인"""
+    if data.get('version') != INDEX_VERSION:
+        return False
+    for rel_path, mtime_ns in data['dir_mtimes'].items():
+        try:
+            if (PROJECT_ROOT / rel_path).stat().st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _to_paths(entries: Dict[str, Dict]) -> Dict[str, Dict]:
+    """상대 경로 문자열 -> 절대 Path"""
+    for entry in entries.values():
+        for field in PATH_FIELDS:
+            if entry[field]:
+                entry[field] = PROJECT_ROOT / entry[field]
+        for field, paths in entry['candidates'].items():
+            entry['candidates'][field] = [PROJECT_ROOT / path for path in paths]
+    return entries
+
+
+def warn_ambiguous(index: Dict[str, Dict]):
+    """Orchestrated/Reduced 후보가 여러 개인 트랙을 stderr 에 경고"""
+    for track_key, entry in index.items():
+        for field, paths in entry['candidates'].items():
+            names = ', '.join(path.name for path in paths)
+            print(f"⚠️  {track_key}: {VERSION_SUFFIXES[field]} 후보 {len(paths)}개 ({names}) "
+                  f"-> {entry[field].name} 사용", file=sys.stderr)
+
+
+def build_catalog_index(sound_dir: Path = SOUND_DIR, haptic_dir: Path = HAPTIC_DIR) -> CatalogIndex:
+    """카탈로그를 다시 훑어 인덱스를 만들고 디스크에 저장"""
+    entries, dir_mtimes = _scan(sound_dir, haptic_dir)
+
+    INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = INDEX_FILE.with_name(f"{INDEX_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': INDEX_VERSION,
+            'sound_dir': _relative(sound_dir),
+            'dir_mtimes': dir_mtimes,
+            'entries': entries,
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, INDEX_FILE)
+
+    index = CatalogIndex(_to_paths(entries))
+    warn_ambiguous(index)
+    return index
+
+
+def load_catalog_index(sound_dir: Path = SOUND_DIR, haptic_dir: Path = HAPTIC_DIR,
+                       rebuild: bool = False) -> CatalogIndex:
+    """저장된 인덱스를 읽고, 카탈로그가 바뀌었으면 다시 만듦"""
+    if not rebuild:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('sound_dir') == _relative(sound_dir) and _is_fresh(data):
+                return CatalogIndex(_to_paths(data['entries']))
+        except (OSError, ValueError, KeyError):
+            pass
+
+    return build_catalog_index(sound_dir, haptic_dir)
+
+
+def main():
+    """메인 함수"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='트랙 카탈로그 인덱스 도구')
+    parser.add_argument('--rebuild', action='store_true', help='인덱스 강제 재생성')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = load_catalog_index(rebuild=args.rebuild)
+    elapsed = time.perf_counter() - start
+
+    print(f"📚 트랙 {len(index)}개 ({elapsed * 1000:.1f}ms)")
+    print(f"{'='*80}")
+    for track_key, entry in index.items():
+        flags = ''.join(
+            mark if entry[field] else '·'
+            for field, mark in zip(PATH_FIELDS[1:], 'MORAH')
+        )
+        print(f"{track_key:5s} {entry['track_id'] or '-':20s} {flags}  {entry['title'] or ''}")
+    print(f"{'='*80}")
+    print("M: 평면 MIDI, O: Orchestrated, R: Reduced, A: MP3, H: 햅틱 JSON")
+    print(f"인덱스 경로: {INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,29 @@
 #!/usr/bin/env python3
 """
 Orchestrated vs Reduced MIDI 비교 분석
+
+사용법:
+    python scripts/compare_midi_versions.py                     # 샘플 4곡 상세 출력
+    python scripts/compare_midi_versions.py --all --jobs 8      # 전체 80쌍 구조 비교 리포트 (.cache/midi_version_diff.json)
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from mido import MidiFile
+from typing import Dict, List
+import json
+import os
+
+import numpy as np
+
+from catalog import PROJECT_ROOT, load_catalog_index
+from midi_analysis import (TYPE_PROGRAM_CHANGE, analyze_midi, load_events, note_on_mask,
+                           tempo_to_bpm)
+from tempo_map import TempoMap
+
+# 생성 리포트는 저장소에 올리지 않도록 .cache/ 아래에 둠
+REPORT_FILE = PROJECT_ROOT / '.cache' / 'midi_version_diff.json'
+
+VERSIONS = ('orchestrated', 'reduced')
 
 # General MIDI Instrument Names
 GM_INSTRUMENTS = {
@@ -50,29 +69,29 @@ GM_INSTRUMENTS = {
 
 def analyze_midi_instruments(filepath: Path):
     """MIDI 파일에서 악기 정보 추출"""
-    midi = MidiFile(filepath)
+    facets = analyze_midi(filepath)
     
-    instruments = {}  # channel -> (program, track_name)
+    instruments = {}  # channel -> (program, track_name, 프로그램 변경 이력)
     tempo = None
     
-    for track in midi.tracks:
-        track_name = track.name if hasattr(track, 'name') else None
-        
-        for msg in track:
-            if msg.type == 'program_change':
-                instruments[msg.channel] = {
-                    'program': msg.program,
-                    'instrument': GM_INSTRUMENTS.get(msg.program, f"Unknown ({msg.program})"),
-                    'track': track_name
-                }
-            
-            if msg.type == 'set_tempo':
-                tempo = round(60_000_000 / msg.tempo, 1)
+    for track in facets['tracks']:
+        for pc in track['program_changes']:
+            history = instruments.get(pc['channel'], {}).get('programs', [])
+            instruments[pc['channel']] = {
+                'program': pc['program'],
+                'instrument': GM_INSTRUMENTS.get(pc['program'], f"Unknown ({pc['program']})"),
+                'track': track['name'],
+                'programs': history + [pc['program']]
+            }
+    
+    if facets['tempo_changes']:
+        tempo = tempo_to_bpm(facets['tempo_changes'][-1]['tempo'])
     
     return {
         'instruments': instruments,
         'tempo': tempo,
-        'tracks': len(midi.tracks)
+        'duration_ms': TempoMap.from_facets(facets).tick_to_ms(facets['length_ticks']),
+        'tracks': facets['num_tracks']
     }
 
 def compare_midi_pair(orchestrated_path: Path, reduced_path: Path):
@@ -85,33 +104,209 @@ def compare_midi_pair(orchestrated_path: Path, reduced_path: Path):
         'reduced': reduced
     }
 
+def _channel_summaries(merged: np.ndarray, group: np.ndarray, tempo_maps: List[TempoMap]) -> List[Dict]:
+    """합친 이벤트 배열을 (버전, 채널) 그룹 키로 한 번에 집계
+
+    group = 버전 * 16 + 채널. 버전별 채널 노트 수, 음역, 프로그램 타임라인을 돌려줍니다.
+    """
+    num_groups = len(tempo_maps) * 16
+    results: List[Dict[str, Dict]] = [{} for _ in tempo_maps]
+    
+    is_note = note_on_mask(merged)
+    note_groups = group[is_note]
+    note_values = merged['note'][is_note]
+    
+    note_counts = np.bincount(note_groups, minlength=num_groups)
+    low = np.full(num_groups, 255, dtype=np.int64)
+    high = np.full(num_groups, -1, dtype=np.int64)
+    np.minimum.at(low, note_groups, note_values)
+    np.maximum.at(high, note_groups, note_values)
+    
+    for g in np.flatnonzero(note_counts).tolist():
+        results[g // 16][str(g % 16)] = {
+            'notes': int(note_counts[g]),
+            'pitch_range': [int(low[g]), int(high[g])],
+            'programs': [],
+        }
+    
+    # 프로그램 타임라인: (그룹, tick) 순 정렬 후 버전별 템포 맵으로 ms 변환
+    is_pc = merged['type'] == TYPE_PROGRAM_CHANGE
+    pc_groups = group[is_pc]
+    pcs = merged[is_pc]
+    order = np.lexsort((pcs['tick'], pc_groups))
+    pc_groups, pcs = pc_groups[order], pcs[order]
+    
+    for version, tempo_map in enumerate(tempo_maps):
+        in_version = (pc_groups // 16) == version
+        times_ms = tempo_map.ticks_to_ms(pcs['tick'][in_version]).tolist()
+        channels = (pc_groups[in_version] % 16).tolist()
+        programs = pcs['note'][in_version].tolist()
+        for time_ms, ch, program in zip(times_ms, channels, programs):
+            info = results[version].setdefault(str(ch), {'notes': 0, 'pitch_range': None, 'programs': []})
+            info['programs'].append({
+                'time_ms': time_ms,
+                'program': program,
+                'instrument': GM_INSTRUMENTS.get(program, f"Unknown ({program})"),
+            })
+    
+    return results
+
+
+def _tempo_summary(tempo_map: TempoMap) -> List[List]:
+    """템포 맵 -> [[시작 ms, BPM], ...]"""
+    times_ms = tempo_map.ticks_to_ms(tempo_map.ticks).tolist()
+    return [[time_ms, tempo_to_bpm(t, 2)] for time_ms, t in zip(times_ms, tempo_map.tempos.tolist())]
+
+
+def diff_midi_pair(orchestrated_path: Path, reduced_path: Path) -> Dict:
+    """Orchestrated/Reduced 구조 비교
+
+    두 파일의 이벤트 배열을 합쳐 (버전, 채널) 키로 한 번에 집계한 뒤
+    채널별 프로그램 타임라인, 노트 수, 음역과 템포 맵을 비교합니다.
+    """
+    paths = (orchestrated_path, reduced_path)
+    facets = [analyze_midi(p) for p in paths]
+    events = [load_events(p) for p in paths]
+    tempo_maps = [TempoMap.from_facets(f) for f in facets]
+    
+    merged = np.concatenate(events)
+    version = np.repeat(np.arange(len(events), dtype=np.int64), [len(e) for e in events])
+    group = version * 16 + merged['channel']
+    
+    orch_channels, reduced_channels = _channel_summaries(merged, group, tempo_maps)
+    
+    notes = {
+        name: int(np.count_nonzero(note_on_mask(e)))
+        for name, e in zip(VERSIONS, events)
+    }
+    duration_ms = {
+        name: tm.tick_to_ms(f['length_ticks'])
+        for name, tm, f in zip(VERSIONS, tempo_maps, facets)
+    }
+    tempo = {name: _tempo_summary(tm) for name, tm in zip(VERSIONS, tempo_maps)}
+    
+    all_channels = sorted(set(orch_channels) | set(reduced_channels), key=int)
+    
+    channels = {}
+    program_mismatches = 0
+    for ch in all_channels:
+        o = orch_channels.get(ch)
+        r = reduced_channels.get(ch)
+        o_programs = [p['program'] for p in o['programs']] if o else []
+        r_programs = [p['program'] for p in r['programs']] if r else []
+        program_match = o_programs == r_programs
+        program_mismatches += not program_match
+        channels[ch] = {
+            'orchestrated': o,
+            'reduced': r,
+            'program_match': program_match,
+            'note_delta': (r['notes'] if r else 0) - (o['notes'] if o else 0),
+        }
+    
+    return {
+        'orchestrated': Path(os.path.relpath(orchestrated_path, PROJECT_ROOT)).as_posix(),
+        'reduced': Path(os.path.relpath(reduced_path, PROJECT_ROOT)).as_posix(),
+        'summary': {
+            'notes': notes,
+            'duration_ms': duration_ms,
+            'channels': {'orchestrated': len(orch_channels), 'reduced': len(reduced_channels)},
+            'channels_only_in_orchestrated': [ch for ch in all_channels if ch not in reduced_channels],
+            'channels_only_in_reduced': [ch for ch in all_channels if ch not in orch_channels],
+            'program_mismatches': program_mismatches,
+            'tempo_match': tempo['orchestrated'] == tempo['reduced'],
+        },
+        'tempo_map': tempo,
+        'channels': channels,
+    }
+
+
+def _diff_entry(entry: Dict) -> Dict:
+    """워커 프로세스용: 카탈로그 항목 하나 비교"""
+    try:
+        result = diff_midi_pair(entry['orchestrated'], entry['reduced'])
+    except Exception as e:
+        result = {'error': str(e)}
+    return {'track_key': entry['track_key'], 'track_id': entry['track_id'],
+            'title': entry['title'], **result}
+
+
+def diff_catalog(sound_dir: Path, jobs: int = 1) -> List[Dict]:
+    """카탈로그의 모든 Orchestrated/Reduced 쌍을 병렬로 비교 (카탈로그 순서 유지)"""
+    index = load_catalog_index(sound_dir)
+    entries = [e for e in index.values() if e['orchestrated'] and e['reduced']]
+    
+    if jobs <= 1:
+        return [_diff_entry(e) for e in entries]
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_diff_entry, entries, chunksize=max(1, len(entries) // (jobs * 4))))
+
+
+def print_diff_summary(report: List[Dict]):
+    """비교 리포트 요약 표 출력"""
+    print(f"{'트랙':6s} {'ID':20s} {'노트(O/R)':>14s} {'채널(O/R)':>10s} {'악기 불일치':>8s}  템포")
+    print(f"{'─'*80}")
+    for item in report:
+        if 'error' in item:
+            print(f"{item['track_key']:6s} {item['track_id'] or '-':20s} ❌ {item['error']}")
+            continue
+        summary = item['summary']
+        notes = f"{summary['notes']['orchestrated']}/{summary['notes']['reduced']}"
+        chans = f"{summary['channels']['orchestrated']}/{summary['channels']['reduced']}"
+        tempo = '✓' if summary['tempo_match'] else '✗'
+        print(f"{item['track_key']:6s} {item['track_id'] or '-':20s} {notes:>14s} {chans:>10s} "
+              f"{summary['program_mismatches']:>8d}  {tempo}")
+
+
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Orchestrated vs Reduced MIDI 비교')
+    parser.add_argument('--all', '-a', action='store_true', help='카탈로그 전체 쌍 구조 비교')
+    parser.add_argument('--jobs', '-j', type=int, default=0, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--output', '-o', type=str, default=str(REPORT_FILE), help='리포트 JSON 경로')
+    
+    args = parser.parse_args()
+    
     project_root = Path(__file__).parent.parent
     sound_dir = project_root / 'assets' / 'sound'
     
-    # 샘플 트랙들 분석
+    if args.all:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        report = diff_catalog(sound_dir, jobs)
+        print_diff_summary(report)
+        
+        output_file = Path(args.output)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ {len(report)}쌍 비교 완료! 리포트 저장: {output_file}")
+        return
+    
+    index = load_catalog_index(sound_dir)
+    
+    # 샘플 트랙들 분석 (트랙 번호)
     test_tracks = [
-        '1_1_스탠다드 자장가',
-        '1_7_맑은 아침',  # Harp 예정
-        '2_1_묵직한 위로',  # Cello 예정
-        '4_1_리드미컬 산책',  # Jazz
+        '1_1',  # 스탠다드 자장가
+        '1_7',  # Harp 예정
+        '2_1',  # Cello 예정
+        '4_1',  # Jazz
     ]
     
     print("🎵 MIDI 파일 비교 분석\n")
     print(f"{'='*100}\n")
     
-    for track_name in test_tracks:
-        track_dir = sound_dir / track_name
+    for track_key in test_tracks:
+        entry = index.get(track_key)
         
-        if not track_dir.exists():
-            print(f"⚠️  {track_name} 폴더 없음\n")
+        if not entry or not entry['folder']:
+            print(f"⚠️  {track_key} 폴더 없음\n")
             continue
         
-        # Orchestrated와 Reduced 파일 찾기
-        orch_files = list(track_dir.glob('*Orchestrated.mid'))
-        reduced_files = list(track_dir.glob('*Reduced.mid'))
+        track_name = entry['folder'].name
         
-        if not orch_files or not reduced_files:
+        # Orchestrated와 Reduced 파일 찾기
+        if not entry['orchestrated'] or not entry['reduced']:
             print(f"⚠️  {track_name}: MIDI 파일 없음\n")
             continue
         
@@ -119,23 +314,29 @@ def main():
         print(f"📁 {track_name}")
         print(f"{'─'*100}\n")
         
-        result = compare_midi_pair(orch_files[0], reduced_files[0])
+        result = compare_midi_pair(entry['orchestrated'], entry['reduced'])
         
         # Orchestrated 분석
         print("🎼 Orchestrated.mid:")
         print(f"   Tempo: {result['orchestrated']['tempo']} BPM")
+        print(f"   Duration: {result['orchestrated']['duration_ms'] / 1000:.1f}s")
         print(f"   Tracks: {result['orchestrated']['tracks']}")
         print(f"   악기 구성:")
         for ch, info in result['orchestrated']['instruments'].items():
             print(f"      Ch{ch}: [{info['program']:3d}] {info['instrument']:30s} (Track: {info['track']})")
+            if len(info['programs']) > 1:
+                print(f"            프로그램 변경: {' → '.join(str(p) for p in info['programs'])}")
         
         # Reduced 분석
         print(f"\n🎹 Reduced.mid:")
         print(f"   Tempo: {result['reduced']['tempo']} BPM")
+        print(f"   Duration: {result['reduced']['duration_ms'] / 1000:.1f}s")
         print(f"   Tracks: {result['reduced']['tracks']}")
         print(f"   악기 구성:")
         for ch, info in result['reduced']['instruments'].items():
             print(f"      Ch{ch}: [{info['program']:3d}] {info['instrument']:30s} (Track: {info['track']})")
+            if len(info['programs']) > 1:
+                print(f"            프로그램 변경: {' → '.join(str(p) for p in info['programs'])}")
         
         print()
 
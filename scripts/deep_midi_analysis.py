@@ -1,10 +1,32 @@
 #!/usr/bin/env python3
 """
 MIDI 파일 상세 분석 - 모든 메시지 확인
+
+--stream 모드는 MidiFile 전체를 메모리에 올리지 않고 midi_scan.iter_midi_events 로
+이벤트를 하나씩 순회하며 카운터만 유지합니다. 트랙마다, 파일마다 NDJSON 레코드 한 줄씩
+출력하므로 아주 긴 생성 MIDI 도 일정한 메모리로 분석할 수 있습니다.
+
+사용법:
+    python scripts/deep_midi_analysis.py                          # 샘플 4곡 상세 출력
+    python scripts/deep_midi_analysis.py --stream assets/sound/1_1.mid
+    python scripts/deep_midi_analysis.py --stream --all > deep.ndjson
 """
 
+import argparse
+import json
+import sys
 from pathlib import Path
-from mido import MidiFile, MetaMessage
+from typing import Dict, Iterator, List
+
+from midi_analysis import analyze_midi
+from midi_scan import iter_midi_events, read_midi_header
+from tempo_map import DEFAULT_TEMPO
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
+
+# 스트리밍 레코드에 보관할 이름 최대 개수 (메모리 상한)
+STREAM_MAX_NAMES = 8
 
 def deep_analyze_midi(filepath: Path):
     """MIDI 파일의 모든 메시지 상세 분석"""
@@ -12,42 +34,28 @@ def deep_analyze_midi(filepath: Path):
     print(f"📄 파일: {filepath.name}")
     print(f"{'='*80}\n")
     
-    midi = MidiFile(filepath)
+    facets = analyze_midi(filepath)
     
-    print(f"Type: {midi.type}")
-    print(f"Ticks per beat: {midi.ticks_per_beat}")
-    print(f"Total tracks: {len(midi.tracks)}\n")
+    print(f"Type: {facets['type']}")
+    print(f"Ticks per beat: {facets['ticks_per_beat']}")
+    print(f"Total tracks: {facets['num_tracks']}\n")
     
-    for i, track in enumerate(midi.tracks):
+    for track in facets['tracks']:
         print(f"\n{'─'*80}")
-        print(f"TRACK {i}: {track.name if hasattr(track, 'name') else 'Unnamed'}")
+        print(f"TRACK {track['index']}: {track['name']}")
         print(f"{'─'*80}")
         
-        # 모든 메시지 타입 수집
-        msg_types = {}
-        program_changes = []
-        note_count = 0
+        # 모든 메시지 타입 통계 (분석 캐시에서 조회)
+        msg_types = track['msg_types']
+        program_changes = track['program_changes']
+        note_count = track['note_count']
+        
+        # Track name과 instrument name 확인
+        for name in track['track_names']:
+            print(f"  🏷️  Track Name: {name}")
         
-        for msg in track:
-            msg_type = msg.type
-            msg_types[msg_type] = msg_types.get(msg_type, 0) + 1
-            
-            if msg.type == 'program_change':
-                program_changes.append({
-                    'channel': msg.channel,
-                    'program': msg.program,
-                    'time': msg.time
-                })
-            
-            if msg.type == 'note_on':
-                note_count += 1
-            
-            # Track name과 instrument name 확인
-            if msg.type == 'track_name':
-                print(f"  🏷️  Track Name: {msg.name}")
-            
-            if hasattr(msg, 'name') and 'instrument' in msg.type.lower():
-                print(f"  🎹 Instrument Name: {msg.name}")
+        for name in track['instrument_names']:
+            print(f"  🎹 Instrument Name: {name}")
         
         print(f"\n  📊 메시지 타입 통계:")
         for msg_type, count in sorted(msg_types.items()):
@@ -62,8 +70,129 @@ def deep_analyze_midi(filepath: Path):
         else:
             print(f"\n  ⚠️  Program Change 메시지 없음")
 
+def _new_track_record(filepath: Path, index: int) -> Dict:
+    return {
+        'record': 'track',
+        'file': filepath.name,
+        'index': index,
+        'name': '',
+        'end_tick': 0,
+        'msg_types': {},
+        'note_count': 0,
+        'program_change_count': 0,
+        'programs': set(),          # (channel, program) - 최대 16 x 128
+        'track_names': [],
+        'instrument_names': [],
+    }
+
+
+def _finish_track_record(record: Dict) -> Dict:
+    record['programs'] = [
+        {'channel': channel, 'program': program}
+        for channel, program in sorted(record['programs'])
+    ]
+    return record
+
+
+def stream_analyze_midi(filepath: Path) -> Iterator[Dict]:
+    """이벤트를 스트리밍하며 트랙 레코드, 마지막에 파일 레코드를 생성
+
+    트랙 하나를 다 읽으면 바로 해당 레코드를 내보내므로 보관하는 상태는
+    현재 트랙의 카운터와 파일 합계뿐입니다.
+    """
+    header = read_midi_header(filepath)
+    file_types: Dict[str, int] = {}
+    total_notes = 0
+    tempo_change_count = 0
+    first_tempo = None   # (tick, tempo) - 가장 이른 tick 의 템포
+    length_ticks = 0
+    record = None
+
+    for track, tick, msg_type, channel, data1, data2, data in iter_midi_events(filepath):
+        if record is None or record['index'] != track:
+            if record is not None:
+                yield _finish_track_record(record)
+            record = _new_track_record(filepath, track)
+
+        msg_types = record['msg_types']
+        msg_types[msg_type] = msg_types.get(msg_type, 0) + 1
+        file_types[msg_type] = file_types.get(msg_type, 0) + 1
+        record['end_tick'] = tick
+        if tick > length_ticks:
+            length_ticks = tick
+
+        if msg_type == 'note_on':
+            record['note_count'] += 1
+            total_notes += 1
+        elif msg_type == 'program_change':
+            record['program_change_count'] += 1
+            record['programs'].add((channel, data1))
+        elif msg_type == 'set_tempo':
+            tempo_change_count += 1
+            tempo = (data[0] << 16) | (data[1] << 8) | data[2]
+            if first_tempo is None or tick < first_tempo[0]:
+                first_tempo = (tick, tempo)
+        elif msg_type == 'track_name' and data is not None:
+            name = data.decode('latin1')
+            if not record['track_names']:
+                record['name'] = name
+            if len(record['track_names']) < STREAM_MAX_NAMES:
+                record['track_names'].append(name)
+        elif msg_type == 'instrument_name' and data is not None:
+            if len(record['instrument_names']) < STREAM_MAX_NAMES:
+                record['instrument_names'].append(data.decode('latin1'))
+
+    if record is not None:
+        yield _finish_track_record(record)
+
+    # 0 tick 이전에 set_tempo 가 없으면 기본 템포로 시작
+    initial_tempo = first_tempo[1] if first_tempo and first_tempo[0] == 0 else DEFAULT_TEMPO
+    yield {
+        'record': 'file',
+        'file': filepath.name,
+        'path': str(filepath.relative_to(PROJECT_ROOT)) if filepath.is_relative_to(PROJECT_ROOT) else str(filepath),
+        'type': header['type'],
+        'ticks_per_beat': header['ticks_per_beat'],
+        # 이벤트가 없는 빈 MTrk 청크도 포함하도록 헤더의 트랙 수 사용
+        'num_tracks': header['num_tracks'],
+        'length_ticks': length_ticks,
+        'msg_types': dict(sorted(file_types.items())),
+        'note_count': total_notes,
+        'tempo_change_count': tempo_change_count,
+        'initial_bpm': round(60_000_000 / initial_tempo, 1),
+    }
+
+
+def stream_to_ndjson(files: List[Path], out=sys.stdout):
+    """여러 파일을 순서대로 스트리밍 분석하여 NDJSON 한 줄씩 출력"""
+    for filepath in files:
+        try:
+            for record in stream_analyze_midi(filepath):
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except (OSError, ValueError, IndexError) as e:
+            out.write(json.dumps({'record': 'error', 'file': filepath.name, 'error': str(e)},
+                                 ensure_ascii=False) + '\n')
+        out.flush()
+
+
 def main():
-    project_root = Path(__file__).parent.parent
+    parser = argparse.ArgumentParser(description='MIDI 파일 상세 분석')
+    parser.add_argument('files', nargs='*', type=Path, help='분석할 MIDI 파일 (--stream 전용)')
+    parser.add_argument('--stream', action='store_true',
+                        help='MidiFile 을 로드하지 않고 NDJSON 레코드로 스트리밍 출력')
+    parser.add_argument('--all', action='store_true', help='assets/sound 아래 모든 .mid (--stream 전용)')
+    args = parser.parse_args()
+
+    if args.stream:
+        files = list(args.files)
+        if args.all:
+            files.extend(sorted(SOUND_DIR.rglob('*.mid')))
+        if not files:
+            parser.error('--stream 에는 파일 경로 또는 --all 이 필요합니다')
+        stream_to_ndjson(files)
+        return
+
+    project_root = PROJECT_ROOT
     
     # 여러 파일 샘플 분석
     test_files = [
@@ -2,173 +2,206 @@
 """
 모든 트랙(강아지 40곡 + 고양이 40곡)의 햅틱 패턴 JSON 자동 생성 스크립트
 MIDI 파일에서 저음역 노트를 추출하여 햅틱 이벤트 생성
+(같은 이름의 .hpat 바이너리도 binary/ 하위 디렉토리에 함께 저장, haptic_codec.py 참고)
+저음역 노트가 없고 트랙 MP3 가 있으면 오디오 저역 onset 으로 대신 생성 (audio_haptics.py 참고)
+
+패턴마다 소스 MIDI 내용 해시와 추출 파라미터 해시를 매니페스트에 기록해 두고,
+둘 다 그대로이고 출력 파일도 손대지 않았다면 다시 만들지 않습니다.
+다시 만들어야 하는 패턴은 프로세스 풀에 나눠 생성합니다.
+
+사용법:
+    python scripts/generate_all_haptic_patterns.py              # 변경된 패턴만 재생성
+    python scripts/generate_all_haptic_patterns.py --force      # 전체 재생성
+    python scripts/generate_all_haptic_patterns.py --jobs 8
+    python scripts/generate_all_haptic_patterns.py --chunk-seconds 30   # 탐색용 시간 구간 청크도 생성
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from mido import MidiFile
+from typing import Dict, List, Optional
+import argparse
+import hashlib
 import json
-import re
+import os
+
+from audio_haptics import AUDIO_PARAMS, extract_audio_haptic_events
+from catalog import TRACK_MAPPING, is_cat_track, load_catalog_index
+from haptic_chunks import CHUNK_DIR, INDEX_FILE_NAME, write_chunks
+from haptic_codec import binary_path, write_haptic_binary
+from haptic_profiles import Stage, extract_profile_events
+from midi_analysis import LOW_NOTE_RANGE, file_sha1
 
 # 프로젝트 경로 설정
 PROJECT_ROOT = Path(__file__).parent.parent
 SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
 OUTPUT_DIR = PROJECT_ROOT / 'assets' / 'haptic_patterns'
+MANIFEST_FILE = PROJECT_ROOT / '.cache' / 'haptic_manifest.json'
 
-# 강아지 트랙 매핑 (번호 기반)
-DOG_TRACK_MAPPING = {
-    '1_1': 'sleep_01', '1_2': 'sleep_02', '1_3': 'sleep_03', '1_4': 'sleep_04',
-    '1_5': 'sleep_05', '1_6': 'sleep_06', '1_7': 'sleep_07', '1_8': 'sleep_08',
-    '2_1': 'separation_01', '2_2': 'separation_02', '2_3': 'separation_03', '2_4': 'separation_04',
-    '2_5': 'separation_05', '2_6': 'separation_06', '2_7': 'separation_07', '2_8': 'separation_08',
-    '3_1': 'noise_01', '3_2': 'noise_02', '3_3': 'noise_03', '3_4': 'noise_04',
-    '3_5': 'noise_05', '3_6': 'noise_06', '3_7': 'noise_07', '3_8': 'noise_08',
-    '4_1': 'energy_01', '4_2': 'energy_02', '4_3': 'energy_03', '4_4': 'energy_04',
-    '4_5': 'energy_05', '4_6': 'energy_06', '4_7': 'energy_07', '4_8': 'energy_08',
-    '5_1': 'senior_01', '5_2': 'senior_02', '5_3': 'senior_03', '5_4': 'senior_04',
-    '5_5': 'senior_05', '5_6': 'senior_06', '5_7': 'senior_07', '5_8': 'senior_08',
-}
+# 이 간격(ms) 이내로 이어지는 햅틱 이벤트는 하나만 남김
+DEDUPE_WINDOW_MS = 100
 
-# 고양이 트랙 매핑 (폴더 기반)
-CAT_TRACK_MAPPING = {
-    '6_1': 'cat_sleep_01', '6_2': 'cat_sleep_02', '6_3': 'cat_sleep_03', '6_4': 'cat_sleep_04',
-    '6_5': 'cat_sleep_05', '6_6': 'cat_sleep_06', '6_7': 'cat_sleep_07', '6_8': 'cat_sleep_08',
-    '7_1': 'cat_separation_01', '7_2': 'cat_separation_02', '7_3': 'cat_separation_03', '7_4': 'cat_separation_04',
-    '7_5': 'cat_separation_05', '7_6': 'cat_separation_06', '7_7': 'cat_separation_07', '7_8': 'cat_separation_08',
-    '8_1': 'cat_noise_01', '8_2': 'cat_noise_02', '8_3': 'cat_noise_03', '8_4': 'cat_noise_04',
-    '8_5': 'cat_noise_05', '8_6': 'cat_noise_06', '8_7': 'cat_noise_07', '8_8': 'cat_noise_08',
-    '9_1': 'cat_energy_01', '9_2': 'cat_energy_02', '9_3': 'cat_energy_03', '9_4': 'cat_energy_04',
-    '9_5': 'cat_energy_05', '9_6': 'cat_energy_06', '9_7': 'cat_energy_07', '9_8': 'cat_energy_08',
-    '10_1': 'cat_senior_01', '10_2': 'cat_senior_02', '10_3': 'cat_senior_03', '10_4': 'cat_senior_04',
-    '10_5': 'cat_senior_05', '10_6': 'cat_senior_06', '10_7': 'cat_senior_07', '10_8': 'cat_senior_08',
+# 추출 파라미터 (바뀌면 모든 패턴이 다시 생성됨)
+EXTRACTION_PARAMS = {
+    'register': list(LOW_NOTE_RANGE),       # 저음역 노트 범위 (양끝 포함)
+    'dedupe_window_ms': DEDUPE_WINDOW_MS,
+    'programs': None,                       # 대상 악기 GM 프로그램 목록 (None = 전체)
 }
 
+# 출력 구조나 추출 로직이 바뀌면 올려서 기존 매니페스트를 무효화
+GENERATOR_VERSION = 2
+
+# 강아지 / 고양이 트랙 매핑 (카탈로그의 TRACK_MAPPING 에서 파생)
+DOG_TRACK_MAPPING = {key: track_id for key, (track_id, _) in TRACK_MAPPING.items() if not is_cat_track(key)}
+CAT_TRACK_MAPPING = {key: track_id for key, (track_id, _) in TRACK_MAPPING.items() if is_cat_track(key)}
+
+
+def extraction_stages(params: Dict = EXTRACTION_PARAMS) -> List[Stage]:
+    """추출 파라미터 -> haptic_profiles 단계 목록"""
+    stages: List[Stage] = [('register', tuple(params['register']))]
+    if params['programs'] is not None:
+        stages.append(('instruments', list(params['programs'])))
+    stages.append(('dedupe', params['dedupe_window_ms']))
+    return stages
+
 
-def ticks_to_ms(ticks, ticks_per_beat, tempo_us):
-    """Ticks를 밀리초로 변환"""
-    return int((ticks * tempo_us) / (ticks_per_beat * 1000))
+def extract_haptic_events(midi_path, params: Dict = EXTRACTION_PARAMS):
+    """MIDI에서 햅틱 이벤트 추출 (저음역 노트만, 100ms 이내 이벤트 제거)"""
+    return extract_profile_events(midi_path, extraction_stages(params))
 
 
-def extract_haptic_events(midi_path):
-    """MIDI에서 햅틱 이벤트 추출 (저음역 노트만)"""
-    midi = MidiFile(str(midi_path))
+def params_hash(params: Dict = EXTRACTION_PARAMS) -> str:
+    """추출 파라미터 + 생성기 버전 해시"""
+    payload = json.dumps({'version': GENERATOR_VERSION, 'params': params}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def audio_params_hash(params: Dict = AUDIO_PARAMS) -> str:
+    """오디오 대체 추출 파라미터 + 생성기 버전 해시 (오디오에서 만든 / 비어 있는 트랙에만 사용)"""
+    return params_hash({'audio': params})
+
+
+def _uses_audio(record: Optional[Dict]) -> bool:
+    """기록된 결과가 오디오에 의존하는지 (오디오에서 추출했거나 MIDI 결과가 비어 있었음)"""
+    return bool(record) and bool(record.get('from_audio') or record.get('empty'))
+
+
+def collect_jobs(index) -> Dict[str, List[Dict]]:
+    """카탈로그에서 강아지 / 고양이 트랙별 생성 작업 목록 구성 (매핑 순서 유지)
+
+    소스가 없는 트랙은 출력할 경고 메시지만 담은 항목이 됩니다.
+    """
+    jobs = {'dog': [], 'cat': []}
     
-    # 템포 추출 (첫 번째 set_tempo)
-    tempo_us = 500000  # 기본 120 BPM
-    for track in midi.tracks:
-        for msg in track:
-            if msg.type == 'set_tempo':
-                tempo_us = msg.tempo
-                break
-        if tempo_us != 500000:
-            break
+    for track_num, track_id in DOG_TRACK_MAPPING.items():
+        # 평면 MIDI (예: 1_1.mid)
+        entry = index.get(track_num)
+        if not entry or not entry['midi']:
+            continue
+        jobs['dog'].append({
+            'track_id': track_id,
+            'label': f"[DOG] {track_id} ({entry['midi'].name})",
+            'source': entry['midi'],
+            'audio': entry['mp3'],
+        })
     
-    bpm = round(60_000_000 / tempo_us, 1)
+    for track_num, track_id in CAT_TRACK_MAPPING.items():
+        # 폴더 (예: 6_1_골골송 자장가) 안의 Orchestrated.mid
+        entry = index.get(track_num)
+        if not entry or not entry['folder']:
+            continue
+        if not entry['orchestrated']:
+            jobs['cat'].append({'track_id': track_id, 'missing': f"[CAT] {track_id}: No Orchestrated.mid"})
+            continue
+        jobs['cat'].append({
+            'track_id': track_id,
+            'label': f"[CAT] {track_id} ({entry['folder'].name})",
+            'source': entry['orchestrated'],
+            'audio': entry['mp3'],
+        })
     
-    # 모든 트랙에서 저음역 노트 추출
-    events = []
+    return jobs
+
+
+def _is_fresh(job: Dict, record: Optional[Dict], current_params_hash: str) -> bool:
+    """매니페스트 기록과 비교하여 다시 만들 필요가 없는지 판단"""
+    if not record:
+        return False
+    if record.get('source_sha1') != job['source_sha1'] or record.get('params_hash') != current_params_hash:
+        return False
+    if record.get('from_audio') and not job['audio']:
+        return False
+    if _uses_audio(record) and job['audio']:
+        # MP3 나 오디오 추출 파라미터가 바뀌었으면 오디오 대체를 다시 실행
+        if (record.get('audio_sha1') != job['audio_sha1']
+                or record.get('audio_params_hash') != audio_params_hash()):
+            return False
+    if record.get('empty'):
+        return True
     
-    for track in midi.tracks:
-        current_time_ticks = 0
-        
-        for msg in track:
-            current_time_ticks += msg.time
-            
-            # Note On 이벤트 처리
-            if msg.type == 'note_on' and msg.velocity > 0:
-                # 저음역만 (C2=36 ~ C4=60) - 베이스, 첼로 등
-                if not (36 <= msg.note <= 60):
-                    continue
-                
-                time_ms = ticks_to_ms(current_time_ticks, midi.ticks_per_beat, tempo_us)
-                
-                events.append({
-                    'time': time_ms,
-                    'note': msg.note,
-                    'velocity': msg.velocity,
-                })
-    
-    # 시간순 정렬 및 중복 제거 (100ms 이내 이벤트 병합)
-    events.sort(key=lambda x: x['time'])
-    
-    # 중복 제거 (100ms 이내)
-    filtered_events = []
-    last_time = -200
-    for event in events:
-        if event['time'] - last_time >= 100:
-            filtered_events.append(event)
-            last_time = event['time']
+    # 출력 파일이 지워졌거나 직접 수정된 경우 재생성
+    output_file = OUTPUT_DIR / f"{job['track_id']}.json"
+    if job['chunk_ms'] and not (CHUNK_DIR / job['track_id'] / INDEX_FILE_NAME).exists():
+        return False
+    try:
+        return (file_sha1(output_file) == record.get('output_sha1')
+                and binary_path(output_file).exists())
+    except OSError:
+        return False
+
+
+def generate_pattern(job: Dict) -> Dict:
+    """작업 하나 처리 (워커 프로세스에서 실행): 추출 + 저장 후 요약 반환"""
+    result = extract_haptic_events(job['source'])
+    from_audio = False
+    audio_sha1 = None
+    if not result['events'] and job.get('audio'):
+        # 저음역 노트가 없으면 트랙 오디오의 저역 onset 으로 대체
+        try:
+            audio_sha1 = file_sha1(job['audio'])
+            result = extract_audio_haptic_events(job['audio'])
+        except (RuntimeError, OSError, ValueError) as e:
+            # ffmpeg 없음 / 디코딩 실패 / 없거나 손상된 MP3 는 이 트랙만 건너뛰고 계속
+            return {'empty': True, 'error': str(e)}
+        from_audio = True
+    if not result['events']:
+        return {'empty': True, 'audio_sha1': audio_sha1}
     
+    json_data = save_haptic_json(job['track_id'], result)
+    if job['chunk_ms']:
+        write_chunks(json_data, CHUNK_DIR, job['chunk_ms'])
+    stats = json_data['stats']
     return {
-        'bpm': bpm,
-        'events': filtered_events,
+        'empty': False,
+        'from_audio': from_audio,
+        'bpm': result['bpm'],
+        'stats': stats,
+        'audio_sha1': audio_sha1,
+        'output_sha1': file_sha1(OUTPUT_DIR / f"{job['track_id']}.json"),
     }
 
 
-def process_dog_tracks():
-    """강아지 트랙 처리 (번호.mid 형식)"""
-    results = {}
-    midi_files = list(SOUND_DIR.glob('*.mid'))
+def _run_jobs(stale: List[Dict], jobs: int) -> List[Dict]:
+    """재생성 대상을 순서대로 처리 (jobs > 1 이면 프로세스 풀)"""
+    if jobs <= 1 or len(stale) <= 1:
+        return [generate_pattern(job) for job in stale]
     
-    for midi_path in midi_files:
-        # 파일명에서 트랙 번호 추출 (예: 1_1.mid -> 1_1)
-        match = re.match(r'^(\d+_\d+)\.mid$', midi_path.name)
-        if not match:
-            continue
-        
-        track_num = match.group(1)
-        track_id = DOG_TRACK_MAPPING.get(track_num)
-        
-        if not track_id:
-            continue
-        
-        print(f"📁 [DOG] {track_id} ({midi_path.name})")
-        
-        result = extract_haptic_events(midi_path)
-        
-        if not result['events']:
-            print(f"   ⚠️  저음역 노트 없음\n")
-            continue
-        
-        save_haptic_json(track_id, result)
-        results[track_id] = result
-    
-    return results
+    with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as executor:
+        return list(executor.map(generate_pattern, stale, chunksize=max(1, len(stale) // (jobs * 4))))
 
 
-def process_cat_tracks():
-    """고양이 트랙 처리 (폴더/Orchestrated.mid 형식)"""
-    results = {}
-    
-    for track_num, track_id in CAT_TRACK_MAPPING.items():
-        # 폴더 찾기 (예: 6_1_골골송 자장가)
-        folders = list(SOUND_DIR.glob(f'{track_num}_*'))
-        
-        if not folders:
-            continue
-        
-        folder = folders[0]
-        orch_files = list(folder.glob('*Orchestrated.mid'))
-        
-        if not orch_files:
-            print(f"   ⚠️  [CAT] {track_id}: No Orchestrated.mid\n")
-            continue
-        
-        print(f"📁 [CAT] {track_id} ({folder.name})")
-        
-        result = extract_haptic_events(orch_files[0])
-        
-        if not result['events']:
-            print(f"   ⚠️  저음역 노트 없음\n")
-            continue
-        
-        save_haptic_json(track_id, result)
-        results[track_id] = result
-    
-    return results
+def print_job_result(job: Dict, outcome: Dict):
+    print(f"📁 {job['label']}")
+    if outcome['empty']:
+        print(f"   ⚠️  저음역 노트 없음" + (f" (오디오 대체 실패: {outcome['error']})" if outcome.get('error') else "") + "\n")
+        return
+    if outcome.get('from_audio'):
+        print(f"   🔊 저음역 노트 없음 -> 오디오({job['audio'].name})에서 추출")
+    print(f"   ✅ {outcome['stats']['total_events']}개 이벤트 생성")
+    print(f"   📊 BPM: {outcome['bpm']}, 평균 Velocity: {outcome['stats']['avg_velocity']}\n")
 
 
 def save_haptic_json(track_id, result):
-    """햅틱 패턴 JSON 저장"""
+    """햅틱 패턴 JSON 저장 -> 저장한 패턴 dict 반환"""
     velocities = [e['velocity'] for e in result['events']]
     notes = [e['note'] for e in result['events']]
     
@@ -191,34 +224,114 @@ def save_haptic_json(track_id, result):
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(json_data, f, ensure_ascii=False, indent=2)
     
-    print(f"   ✅ {stats['total_events']}개 이벤트 생성")
-    print(f"   📊 BPM: {result['bpm']}, 평균 Velocity: {stats['avg_velocity']}\n")
+    # 앱 로딩용 바이너리 포맷 (.hpat) 도 함께 저장
+    write_haptic_binary(output_file, json_data)
+    
+    return json_data
 
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description='모든 트랙의 햅틱 패턴 JSON 생성')
+    parser.add_argument('--force', '-f', action='store_true', help='변경 여부와 관계없이 전체 재생성')
+    parser.add_argument('--jobs', '-j', type=int, default=0, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--chunk-seconds', '-c', type=float, default=0,
+                        help='탐색용 시간 구간 청크 길이 (초, 0 = 생성 안 함)')
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    chunk_ms = int(args.chunk_seconds * 1000)
+    
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
     print("🎵 모든 트랙(강아지 + 고양이)의 햅틱 패턴 JSON 생성 중...\n")
-    print("=" * 60)
-    print("🐕 강아지 트랙 처리")
-    print("=" * 60)
     
-    dog_results = process_dog_tracks()
+    index = load_catalog_index(SOUND_DIR)
+    job_groups = collect_jobs(index)
+    manifest = {} if args.force else _load_manifest()
+    # 청크 설정도 출력에 영향을 주므로 사용할 때만 해시에 포함
+    current_params_hash = params_hash(dict(EXTRACTION_PARAMS, chunk_ms=chunk_ms) if chunk_ms else EXTRACTION_PARAMS)
     
-    print("=" * 60)
-    print("🐱 고양이 트랙 처리")
-    print("=" * 60)
+    # 소스 해시로 재생성 대상 선별
+    stale = []
+    for job in job_groups['dog'] + job_groups['cat']:
+        if 'missing' in job:
+            continue
+        job['source_sha1'] = file_sha1(job['source'])
+        record = manifest.get(job['track_id'])
+        # MP3 는 오디오 대체에 쓰인(또는 MIDI 결과가 비어 있던) 트랙만 해시 (MIDI 패턴은 MP3 와 무관)
+        job['audio_sha1'] = file_sha1(job['audio']) if job['audio'] and _uses_audio(record) else None
+        job['chunk_ms'] = chunk_ms
+        if not _is_fresh(job, record, current_params_hash):
+            stale.append(job)
     
-    cat_results = process_cat_tracks()
+    outcomes = dict(zip((job['track_id'] for job in stale), _run_jobs(stale, jobs)))
     
-    total = len(dog_results) + len(cat_results)
+    # 결과 출력 (카탈로그 순서) 및 매니페스트 갱신
+    counts = {}
+    for group, title in (('dog', '🐕 강아지 트랙 처리'), ('cat', '🐱 고양이 트랙 처리')):
+        print("=" * 60)
+        print(title)
+        print("=" * 60)
+        
+        generated = skipped = 0
+        for job in job_groups[group]:
+            if 'missing' in job:
+                print(f"   ⚠️  {job['missing']}\n")
+                continue
+            
+            outcome = outcomes.get(job['track_id'])
+            if outcome is None:
+                skipped += 1
+                continue
+            
+            print_job_result(job, outcome)
+            if not outcome['empty']:
+                generated += 1
+            if outcome.get('error'):
+                # 오디오 대체가 환경 문제(ffmpeg 없음 등)로 실패하면 다음 실행에서 다시 시도
+                manifest.pop(job['track_id'], None)
+                continue
+            record = {
+                'source': str(job['source'].relative_to(PROJECT_ROOT)),
+                'source_sha1': job['source_sha1'],
+                'params_hash': current_params_hash,
+                'empty': outcome['empty'],
+                'from_audio': outcome.get('from_audio', False),
+                'output_sha1': outcome.get('output_sha1'),
+            }
+            if outcome.get('audio_sha1'):
+                record['audio_sha1'] = outcome['audio_sha1']
+                record['audio_params_hash'] = audio_params_hash()
+            manifest[job['track_id']] = record
+        
+        if skipped:
+            print(f"⏭️  변경 없음 {skipped}곡 건너뜀\n")
+        counts[group] = (generated, skipped)
+    
+    _save_manifest(manifest)
+    
+    total = counts['dog'][0] + counts['cat'][0]
+    total_skipped = counts['dog'][1] + counts['cat'][1]
     print(f"{'='*60}")
-    print(f"✅ 완료! 총 {total}개 햅틱 패턴 JSON 생성")
-    print(f"   - 강아지: {len(dog_results)}곡")
-    print(f"   - 고양이: {len(cat_results)}곡")
+    print(f"✅ 완료! 총 {total}개 햅틱 패턴 JSON 생성" + (f" ({total_skipped}개 변경 없음)" if total_skipped else ""))
+    print(f"   - 강아지: {counts['dog'][0]}곡")
+    print(f"   - 고양이: {counts['cat'][0]}곡")
     print(f"출력 경로: {OUTPUT_DIR}")
 
 
+def _load_manifest() -> Dict:
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest: Dict):
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
 if __name__ == '__main__':
     main()
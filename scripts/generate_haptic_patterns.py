@@ -6,117 +6,48 @@
 - sleep_03: 깊은 밤의 꿈 (Deep Sleep - Heartbeat)
 - separation_01: 묵직한 위로 (Calm Shelter - Heartbeat)
 - senior_02: 깊은 안정 (Senior Care - Purr)
+(트랙 설정 HAPTIC_TRACKS 는 haptic_profiles.py 에 있으며, 같은 결과를
+ haptic_profiles.py 의 heartbeat / purr 프로파일로도 생성할 수 있습니다)
+
+사용법:
+    python scripts/generate_haptic_patterns.py
+    python scripts/generate_haptic_patterns.py --simplify   # 예산으로 단순화한 패턴도 simplified/ 에 저장
+    python scripts/generate_haptic_patterns.py --chunk-seconds 30   # 탐색용 청크도 mode_chunked/ 에 생성
 """
 
 from pathlib import Path
-from mido import MidiFile
+import argparse
 import json
+import sys
 
-# General MIDI 악기 매핑
-GM_INSTRUMENTS = {
-    0: "Acoustic Grand Piano", 42: "Cello", 43: "Contrabass",
-    32: "Acoustic Bass", 33: "Electric Bass (finger)", 34: "Electric Bass (pick)",
-}
-
-# 햅틱 대상 트랙 설정
-HAPTIC_TRACKS = {
-    'sleep_03': {
-        'title': '깊은 밤의 꿈',
-        'folder': '1_3_깊은 밤의 꿈',
-        'pattern': 'heartbeat',
-        'target_instruments': ['Cello', 'Contrabass'],
-    },
-    'separation_01': {
-        'title': '묵직한 위로',
-        'folder': '2_1_묵직한 위로',
-        'pattern': 'heartbeat',
-        'target_instruments': ['Cello', 'Contrabass'],
-    },
-    'senior_02': {
-        'title': '깊은 안정',
-        'folder': '5_2_깊은 안정',
-        'pattern': 'purr',
-        'target_instruments': ['Contrabass', 'Cello'],
-    },
-}
+from catalog import load_catalog_index
+from haptic_chunks import write_chunks
+from haptic_codec import PATTERN_DIR, write_haptic_binary
+from haptic_profiles import HAPTIC_TRACKS, extract_profile_events, track_stages
+from haptic_simplify import (PATTERN_BUDGETS, SIMPLIFIED_DIR, check_budget, compute_stats,
+                             print_report, simplify_pattern)
 
-
-def ticks_to_ms(ticks, ticks_per_beat, tempo_us):
-    """Ticks를 밀리초로 변환"""
-    return int((ticks * tempo_us) / (ticks_per_beat * 1000))
+# 모드용 청크 출력 루트 (generate_all_haptic_patterns 의 chunked/ 와 트랙 ID 가 겹치므로 분리)
+MODE_CHUNK_DIR = PATTERN_DIR / 'mode_chunked'
 
 
 def extract_haptic_events(midi_path, config):
-    """MIDI에서 햅틱 이벤트 추출"""
-    midi = MidiFile(midi_path)
-    
-    # 템포 추출 (첫 번째 set_tempo)
-    tempo_us = 500000  # 기본 120 BPM
-    for track in midi.tracks:
-        for msg in track:
-            if msg.type == 'set_tempo':
-                tempo_us = msg.tempo
-                break
-        if tempo_us != 500000:
-            break
-    
-    bpm = round(60_000_000 / tempo_us, 1)
-    
-    # 각 트랙별로 악기와 노트 추출
-    events = []
-    
-    for track_idx, track in enumerate(midi.tracks):
-        current_time_ticks = 0
-        track_instrument = None
-        
-        for msg in track:
-            current_time_ticks += msg.time
-            
-            # Program Change로 악기 확인
-            if msg.type == 'program_change':
-                track_instrument = GM_INSTRUMENTS.get(msg.program, f"Program{msg.program}")
-            
-            # Note On 이벤트 처리
-            if msg.type == 'note_on' and msg.velocity > 0:
-                # 타겟 악기만
-                if track_instrument not in config['target_instruments']:
-                    continue
-                
-                # 저음역만 (C2=36 ~ C4=60)
-                if not (36 <= msg.note <= 60):
-                    continue
-                
-                time_ms = ticks_to_ms(current_time_ticks, midi.ticks_per_beat, tempo_us)
-                
-                events.append({
-                    'time': time_ms,
-                    'note': msg.note,
-                    'velocity': msg.velocity,
-                })
-    
-    # 시간순 정렬
-    events.sort(key=lambda x: x['time'])
-    
-    # 통계 계산
-    velocities = [e['velocity'] for e in events]
-    notes = [e['note'] for e in events]
-    
-    stats = {
-        'total_events': len(events),
-        'duration_ms': events[-1]['time'] if events else 0,
-        'avg_velocity': round(sum(velocities) / len(velocities)) if velocities else 0,
-        'note_range': f"{min(notes)}-{max(notes)}" if notes else "N/A",
-    }
-    
-    return {
-        'bpm': bpm,
-        'events': events,
-        'stats': stats,
-    }
+    """MIDI에서 햅틱 이벤트 추출 (저음역 + 대상 악기, haptic_profiles 단계 사용)"""
+    result = extract_profile_events(midi_path, track_stages(config))
+    result['stats'] = compute_stats(result['events'])
+    return result
 
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description='햅틱 패턴 JSON 생성 (3가지 모드)')
+    parser.add_argument('--simplify', '-s', action='store_true',
+                        help='패턴 타입별 예산(haptic_simplify.PATTERN_BUDGETS)으로 단순화한 패턴을 '
+                             'simplified/ 에 추가 저장 (배포용 JSON 은 그대로)')
+    parser.add_argument('--chunk-seconds', '-c', type=float, default=0,
+                        help='탐색용 시간 구간 청크 길이 (초, 0 = 생성 안 함)')
+    args = parser.parse_args()
+    
     project_root = Path(__file__).parent.parent
     sound_dir = project_root / 'assets' / 'sound'
     output_dir = project_root / 'assets' / 'haptic_patterns'
@@ -127,20 +58,21 @@ def main():
     print("🎵 햅틱 패턴 JSON 생성 중...\n")
     
     results = {}
+    over_budget = []
+    index = load_catalog_index(sound_dir)
     
     for track_id, config in HAPTIC_TRACKS.items():
         print(f"📁 {track_id}: {config['title']}")
         
-        # Orchestrated MIDI 파일 찾기
-        track_folder = sound_dir / config['folder']
-        orch_files = list(track_folder.glob('*Orchestrated.mid'))
+        # Orchestrated MIDI 파일 찾기 (카탈로그 인덱스)
+        entry = index.by_id.get(track_id)
         
-        if not orch_files:
+        if not entry or not entry['orchestrated']:
             print(f"   ⚠️  Orchestrated.mid 파일 없음\n")
             continue
         
         # 햅틱 이벤트 추출
-        result = extract_haptic_events(orch_files[0], config)
+        result = extract_haptic_events(entry['orchestrated'], config)
         
         # JSON 데이터 구성
         json_data = {
@@ -157,10 +89,32 @@ def main():
         output_file = output_dir / f"{track_id}.json"
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(json_data, f, ensure_ascii=False, indent=2)
+        write_haptic_binary(output_file, json_data)
+        
+        # 단순화 (단계별 리포트 + 예산 검사)
+        # 앱 플레이어는 repeat/interval 을 재생하지 않으므로 배포용 JSON 과 다른 디렉토리에 저장
+        if args.simplify:
+            budget = PATTERN_BUDGETS[config['pattern']]
+            simplified, report = simplify_pattern(json_data, budget)
+            violations = check_budget(simplified, budget)
+            print(f"   🧹 단순화 ({config['pattern']} 예산)")
+            print_report(report, violations)
+            if violations:
+                over_budget.append(track_id)
+            SIMPLIFIED_DIR.mkdir(parents=True, exist_ok=True)
+            simplified_file = SIMPLIFIED_DIR / f"{track_id}.json"
+            with open(simplified_file, 'w', encoding='utf-8') as f:
+                json.dump(simplified, f, ensure_ascii=False, indent=2)
+            write_haptic_binary(simplified_file, simplified)
         
-        print(f"   ✅ {result['stats']['total_events']}개 이벤트 생성")
-        print(f"   📊 BPM: {result['bpm']}, 평균 Velocity: {result['stats']['avg_velocity']}")
-        print(f"   💾 저장: {output_file.name}\n")
+        print(f"   ✅ {json_data['stats']['total_events']}개 이벤트 생성")
+        print(f"   📊 BPM: {result['bpm']}, 평균 Velocity: {json_data['stats']['avg_velocity']}")
+        print(f"   💾 저장: {output_file.name}")
+        
+        if args.chunk_seconds > 0:
+            index_file = write_chunks(json_data, MODE_CHUNK_DIR, int(args.chunk_seconds * 1000))
+            print(f"   🧩 청크: {index_file.parent.relative_to(output_dir)}/")
+        print()
         
         results[track_id] = json_data
     
@@ -168,6 +122,10 @@ def main():
     print("✅ 완료!")
     print(f"총 {len(results)}개 햅틱 패턴 JSON 생성")
     print(f"출력 경로: {output_dir}")
+    
+    if over_budget:
+        print(f"❌ 예산 초과: {', '.join(over_budget)}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
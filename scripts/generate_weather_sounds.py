@@ -1,135 +1,745 @@
-import numpy as np
-import scipy.io.wavfile as wav
+#!/usr/bin/env python3
+"""
+날씨 앰비언스 사운드 합성 (비, 맑음/새소리, 밤/귀뚜라미, 눈/약한 바람, 강풍, 흐림)
+
+사운드마다 이름에서 정해지는 시드로 만든 난수 생성기(np.random.Generator)를 넘겨
+같은 설정이면 항상 같은 오디오가 나옵니다. 사운드들은 서로 독립이므로 프로세스 풀에서
+동시에 렌더링하고, 출력 WAV 의 LIST/INFO(ICMT) 청크에 파라미터 해시를 기록해 두어
+설정이 그대로인 사운드는 다시 만들지 않습니다.
+
+WAV 는 블록 단위로 기록합니다 (WavWriter). 첫 순회에서 블록별 피크만 구하고 두 번째 순회에서
+정규화해 int16 PCM 또는 float32 로 쓰므로, 전체 길이 임시 배열을 만들지 않습니다.
+모든 사운드는 스트림 형태(STREAM_SOUNDS)가 있어 렌더링 자체도 길이와 관계없이 블록 하나 정도의
+메모리로 끝납니다 (빗방울, 새 처프, 바람 변조, 귀뚜라미 엔벨로프도 블록마다 절대 샘플 위치 기준으로 계산).
+
+--export 를 주면 중간 WAV 없이 정규화한 float32 블록을 ffmpeg 표준 입력으로 흘려보내
+앱에서 쓰는 비트레이트(128kbps)의 MP3 / AAC(.m4a) / Opus 로 바로 인코딩합니다.
+파라미터 해시는 태그의 comment 에 같은 접두어로 기록합니다.
+assets/sound/weather/ 의 MP3 는 앱이 쓰는 실제 녹음이므로 내보내기 기본 출력은 build/weather_export/ 이고,
+파라미터 해시 태그가 없는 기존 파일은 --force 없이는 덮어쓰지 않습니다.
+
+사용법:
+    python scripts/generate_weather_sounds.py                    # 바뀐 사운드만 렌더링
+    python scripts/generate_weather_sounds.py --force --jobs 4   # 전체 재렌더링
+    python scripts/generate_weather_sounds.py rain_ambient --seed 7 --duration 60
+    python scripts/generate_weather_sounds.py cloudy_ambient --duration 3600 --format float32
+    python scripts/generate_weather_sounds.py --export mp3 --sample-rate 44100 --channels 2
+    python scripts/generate_weather_sounds.py --export opus --bitrate 96k --sample-rate 48000
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import hashlib
+import json
 import os
-import random
-
-def save_wav(filename, data, sr=44100):
-    # Normalize to 16-bit PCM range
-    data = data / np.max(np.abs(data)) * 32767
-    wav.write(filename, sr, data.astype(np.int16))
-    print(f"Generated: {filename}")
-
-def generate_white_noise(duration, sr=44100):
-    return np.random.uniform(-1, 1, int(sr * duration))
-
-def generate_pink_noise(duration, sr=44100):
-    white = generate_white_noise(duration, sr)
-    # Simple 1/f filter approximation
-    X = np.fft.rfft(white)
-    S = np.sqrt(np.arange(len(X)) + 1.)  # +1 to avoid division by zero
-    Y = X / S
-    pink = np.fft.irfft(Y)
-    if len(pink) > len(white):
-        pink = pink[:len(white)]
-    return pink
-
-def generate_brown_noise(duration, sr=44100):
-    white = generate_white_noise(duration, sr)
-    # 1/f^2 filter
-    X = np.fft.rfft(white)
-    S = np.arange(len(X)) + 1.  # +1 to avoid zero
-    Y = X / S
-    brown = np.fft.irfft(Y)
-    if len(brown) > len(white):
-        brown = brown[:len(white)]
-    return brown
-
-def generate_rain(duration=10, sr=44100):
-    # Pink noise base
-    noise = generate_pink_noise(duration, sr)
-    # Add random droplets (high freq pops)
-    droplets = np.zeros_like(noise)
-    for _ in range(int(duration * 20)): # 20 drops per second
-        idx = random.randint(0, len(noise)-1000)
-        droplets[idx:idx+100] += np.random.uniform(-0.5, 0.5, 100)
-    
-    return noise * 0.7 + droplets * 0.3
-
-def generate_wind(duration=10, sr=44100, intensity='strong'):
-    # Brown noise with amplitude modulation
-    noise = generate_brown_noise(duration, sr)
-    t = np.linspace(0, duration, len(noise))
-    
-    # Slow modulation for wind gusts
-    if intensity == 'strong':
-        mod = 0.5 + 0.5 * np.sin(2 * np.pi * 0.2 * t + np.random.normal(0, 0.1, len(t)))
-    else: # snow/gentle
-        mod = 0.7 + 0.3 * np.sin(2 * np.pi * 0.1 * t)
-        
-    return noise * mod
-
-def generate_crickets(duration=10, sr=44100):
-    t = np.linspace(0, duration, int(duration*sr))
-    # Carrier frequency ~4kHz
-    carrier = np.sin(2 * np.pi * 4000 * t)
-    # Modulation (chirp pattern)
-    mod = (np.sin(2 * np.pi * 30 * t) + 1) / 2 # Fast chirp
-    mod[mod < 0.8] = 0 # Gate
-    
-    # Add silence gaps
-    envelope = np.zeros_like(t)
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import zlib
+
+import numpy as np
+from scipy.signal import lfilter
+
+try:
+    from mutagen import File as MutagenFile
+except ImportError:
+    MutagenFile = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+WEATHER_DIR = PROJECT_ROOT / 'assets' / 'sound' / 'weather'
+EXPORT_DIR = PROJECT_ROOT / 'build' / 'weather_export'
+
+SAMPLE_RATE = 44100
+DEFAULT_DURATION = 10
+DEFAULT_SEED = 0
+
+# 합성 로직이 바뀌면 올려서 기존 WAV 를 모두 다시 렌더링
+SYNTH_VERSION = 3
+
+# WAV ICMT 주석에 파라미터 해시를 기록할 때 쓰는 접두어
+PARAMS_COMMENT_PREFIX = 'petbeats-params:'
+
+# 출력 샘플 형식 -> (WAV format tag, 비트 수)
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+SAMPLE_FORMATS = {
+    'int16': (WAVE_FORMAT_PCM, 16),
+    'float32': (WAVE_FORMAT_IEEE_FLOAT, 32),
+}
+
+# 압축 내보내기 형식 -> (ffmpeg 인코더, 확장자)
+EXPORT_FORMATS = {
+    'mp3': ('libmp3lame', '.mp3'),
+    'aac': ('aac', '.m4a'),
+    'opus': ('libopus', '.opus'),
+}
+DEFAULT_BITRATE = '128k'  # compress_mp3.py 와 같은 앱 비트레이트
+
+# 스트리밍 노이즈 블록 크기 (샘플)
+BLOCK_SIZE = 65536
+
+# 핑크 노이즈: 1/f 파워 스펙트럼(-3 dB/옥타브)의 4극 IIR 근사
+PINK_B = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+PINK_A = [1, -2.494956002, 2.017265875, -0.522189400]
+PINK_GAIN = 4.0
+
+# 브라운 노이즈: DC 로 흘러가지 않도록 약간 새는 적분기 (-6 dB/옥타브)
+BROWN_LEAK = 0.998
+BROWN_GAIN = 0.02
+
+# 그레인 테이블(빗방울, 새 처프)에 미리 만들어 두는 변형 수
+GRAIN_VARIANTS = 64
+# scatter 한 번에 더하는 그레인 샘플 수
+SCATTER_BATCH = 1 << 18
+
+
+def _rng(rng=None) -> np.random.Generator:
+    """None / 시드 / Generator -> Generator (Generator 는 그대로 반환)"""
+    return np.random.default_rng(rng)
+
+
+def generate_white_noise(duration, sr=SAMPLE_RATE, rng=None):
+    return _rng(rng).uniform(-1, 1, int(sr * duration))
+
+
+def stream_white_noise(total_samples=None, block_size=BLOCK_SIZE, rng=None):
+    """block_size 샘플 float32 블록을 차례로 반환 (마지막 블록만 짧을 수 있음)
+
+    total_samples 가 None 이면 끝없이 이어집니다.
+    """
+    rng = _rng(rng)
+    remaining = total_samples
+    while remaining is None or remaining > 0:
+        n = block_size if remaining is None else min(block_size, remaining)
+        yield rng.uniform(-1, 1, n).astype(np.float32)
+        if remaining is not None:
+            remaining -= n
+
+
+def _stream_filtered_noise(b, a, gain, total_samples, block_size, rng):
+    # 필터 상태(zi)를 다음 블록으로 넘기므로 이어 붙인 결과가 전체를 한 번에 거른 것과 같음 (이음매 없음)
+    zi = np.zeros(max(len(a), len(b)) - 1)
+    for white in stream_white_noise(total_samples, block_size, rng):
+        out, zi = lfilter(b, a, white, zi=zi)
+        yield (out * gain).astype(np.float32)
+
+
+def stream_pink_noise(total_samples=None, block_size=BLOCK_SIZE, rng=None):
+    return _stream_filtered_noise(PINK_B, PINK_A, PINK_GAIN, total_samples, block_size, rng)
+
+
+def stream_brown_noise(total_samples=None, block_size=BLOCK_SIZE, rng=None):
+    return _stream_filtered_noise([1.0], [1.0, -BROWN_LEAK], BROWN_GAIN, total_samples, block_size, rng)
+
+
+def generate_pink_noise(duration, sr=SAMPLE_RATE, rng=None):
+    return np.concatenate(list(stream_pink_noise(int(sr * duration), rng=rng)))
+
+
+def generate_brown_noise(duration, sr=SAMPLE_RATE, rng=None):
+    return np.concatenate(list(stream_brown_noise(int(sr * duration), rng=rng)))
+
+
+def scatter_grains(length, onsets, grain_table, grain_ids, gains=None):
+    """onsets[k] 위치에 grain_table[grain_ids[k]] * gains[k] 를 더한 신호
+
+    이벤트별 루프 없이 가중 bincount 로 더합니다 (np.add.at 과 같은 결과).
+    onset 순으로 정렬한 뒤 약 SCATTER_BATCH 샘플씩 나눠, 묶음이 걸친 구간
+    [첫 onset, 마지막 그레인 끝) 에만 더하므로 묶음마다 전체 길이 배열을 만들지 않습니다.
+    끝을 넘는 부분은 잘립니다.
+    """
+    grain_len = grain_table.shape[1]
+    order = np.argsort(onsets, kind='stable')
+    onsets = np.asarray(onsets)[order]
+    grain_ids = np.asarray(grain_ids)[order]
+    if gains is not None:
+        gains = np.asarray(gains)[order]
+    output = np.zeros(length)
+    batch = max(1, SCATTER_BATCH // grain_len)
+    offsets = np.arange(grain_len)
+    for i in range(0, len(onsets), batch):
+        values = grain_table[grain_ids[i:i + batch]]
+        if gains is not None:
+            values = values * gains[i:i + batch, None]
+        lo = int(onsets[i])
+        hi = min(int(onsets[i:i + batch][-1]) + grain_len, length)
+        if hi <= lo:
+            break
+        positions = (onsets[i:i + batch, None] - lo + offsets).ravel()
+        values = values.ravel()
+        inside = positions < hi - lo
+        output[lo:hi] += np.bincount(positions[inside], weights=values[inside], minlength=hi - lo)
+    return output
+
+
+def droplet_grains(grain_len=100, variants=GRAIN_VARIANTS, rng=None):
+    # 빗방울용 짧은 노이즈 버스트
+    return _rng(rng).uniform(-0.5, 0.5, (variants, grain_len))
+
+
+def chirp_grains(sr=SAMPLE_RATE, variants=GRAIN_VARIANTS, rng=None):
+    # FM 처프 (빠른 주파수 하강 + 페이드 인/아웃), 가장 긴 처프 길이에 맞춰 0 으로 채움
+    rng = _rng(rng)
+    durations = rng.uniform(0.1, 0.3, variants)
+    f_start = rng.uniform(2000, 4000, variants)[:, None]
+    f_end = rng.uniform(1000, 2000, variants)[:, None]
+    lengths = (durations * sr).astype(int)
+    t = np.arange(lengths.max())[None, :]
+    pos = t / np.maximum(lengths - 1, 1)[:, None]  # 처프마다 0..1
+
+    freq = f_start + (f_end - f_start) * pos
+    phase = 2 * np.pi * np.cumsum(freq, axis=1) / sr
+    chirps = np.sin(phase) * pos * (1 - pos)
+    chirps[t >= lengths[:, None]] = 0
+    return chirps
+
+
+def _stream_grain_events(total_samples, block_size, rng, grains, events_per_sec, sr, polarity=False):
+    """그레인 이벤트를 블록마다 새로 뽑아 흩뿌린 float64 블록 열
+
+    블록 길이에 비례한 포아송 개수만큼 블록 안 임의 위치에 그레인을 놓고,
+    블록 끝을 넘는 그레인 꼬리는 다음 블록 앞에 더하므로 전체 길이 배열이 필요 없습니다.
+    """
+    grain_len = grains.shape[1]
+    tail = np.zeros(grain_len)
+    remaining = total_samples
+    while remaining is None or remaining > 0:
+        n = block_size if remaining is None else min(block_size, remaining)
+        count = rng.poisson(events_per_sec * n / sr)
+        onsets = rng.integers(0, n, count)
+        grain_ids = rng.integers(0, len(grains), count)
+        gains = rng.choice([-1.0, 1.0], count) if polarity else None
+        block = scatter_grains(n + grain_len, onsets, grains, grain_ids, gains)
+        block[:grain_len] += tail
+        tail = block[n:]
+        yield block[:n]
+        if remaining is not None:
+            remaining -= n
+
+
+def _block_times(offset, n, sr):
+    # 절대 샘플 위치 기준 시각 (초) -> 블록을 어떻게 나눠도 변조가 이어짐
+    return (offset + np.arange(n)) / sr
+
+
+def stream_rain(total_samples=None, block_size=BLOCK_SIZE, rng=None, sr=SAMPLE_RATE, drops_per_sec=20):
+    # 바탕 노이즈와 빗방울이 서로의 난수 순서에 영향을 주지 않도록 생성기를 나눔
+    noise_rng, drop_rng = _rng(rng).spawn(2)
+    # 빗방울(고음 톡톡): 이벤트마다 임의 그레인 + 임의 극성
+    droplets = _stream_grain_events(total_samples, block_size, drop_rng, droplet_grains(rng=drop_rng),
+                                    drops_per_sec, sr, polarity=True)
+    # 핑크 노이즈 바탕
+    for noise, drops in zip(stream_pink_noise(total_samples, block_size, noise_rng), droplets):
+        yield (noise * 0.7 + drops * 0.3).astype(np.float32)
+
+
+def generate_rain(duration=DEFAULT_DURATION, sr=SAMPLE_RATE, drops_per_sec=20, rng=None):
+    return np.concatenate(list(stream_rain(int(sr * duration), rng=rng, sr=sr, drops_per_sec=drops_per_sec)))
+
+
+def stream_wind(total_samples=None, block_size=BLOCK_SIZE, rng=None, sr=SAMPLE_RATE, intensity='strong'):
+    noise_rng, jitter_rng = _rng(rng).spawn(2)
+    offset = 0
+    # 브라운 노이즈 + 진폭 변조
+    for noise in stream_brown_noise(total_samples, block_size, noise_rng):
+        t = _block_times(offset, len(noise), sr)
+        # 돌풍을 표현하는 느린 변조
+        if intensity == 'strong':
+            mod = 0.5 + 0.5 * np.sin(2 * np.pi * 0.2 * t + jitter_rng.normal(0, 0.1, len(t)))
+        else:  # 눈 / 약한 바람
+            mod = 0.7 + 0.3 * np.sin(2 * np.pi * 0.1 * t)
+        yield (noise * mod).astype(np.float32)
+        offset += len(noise)
+
+
+def generate_wind(duration=DEFAULT_DURATION, sr=SAMPLE_RATE, intensity='strong', rng=None):
+    return np.concatenate(list(stream_wind(int(sr * duration), rng=rng, sr=sr, intensity=intensity)))
+
+
+def stream_crickets(total_samples=None, block_size=BLOCK_SIZE, rng=None, sr=SAMPLE_RATE):
+    # 난수를 쓰지 않지만 다른 생성기와 같은 형태로 rng 인자를 받음
+    # 엔벨로프: 처프 3번 후 무음 구간, 끝을 넘는 처프는 생략
     chirp_len = int(0.1 * sr)
-    gap_len = int(0.5 * sr)
-    cursor = 0
-    while cursor < len(envelope):
-        # 3 chirps
-        for _ in range(3):
-            if cursor + chirp_len < len(envelope):
-                envelope[cursor:cursor+chirp_len] = 1
-            cursor += chirp_len + int(0.05*sr)
-        cursor += gap_len
-        
-    return carrier * mod * envelope * 0.1
-
-def generate_birds(duration=10, sr=44100):
-    # Very simple synthetic bird chirp using FM synthesis
-    output = np.zeros(int(duration * sr))
-    num_chirps = int(duration * 0.5) # 1 chirp every 2 secs approx
-    
-    for _ in range(num_chirps):
-        start = random.randint(0, len(output) - sr)
-        chirp_dur = random.uniform(0.1, 0.3)
-        t = np.linspace(0, chirp_dur, int(chirp_dur * sr))
-        
-        # FM Chirp: rapid frequency slide
-        f_start = random.uniform(2000, 4000)
-        f_end = random.uniform(1000, 2000)
-        freq = np.linspace(f_start, f_end, len(t))
-        phase = 2 * np.pi * np.cumsum(freq) / sr
-        chirp = np.sin(phase) * np.linspace(0, 1, len(t)) # Fade in
-        chirp *= np.linspace(1, 0, len(t)) # Fade out
-        
-        output[start:start+len(chirp)] += chirp * 0.2
-        
-    # Add light background wind
-    bg = generate_brown_noise(duration, sr) * 0.05
-    return output + bg
+    chirp_step = chirp_len + int(0.05 * sr)
+    cycle = 3 * chirp_step + int(0.5 * sr)
+    offset = 0
+    remaining = total_samples
+    while remaining is None or remaining > 0:
+        n = block_size if remaining is None else min(block_size, remaining)
+        index = offset + np.arange(n)
+        t = index / sr
+        # 약 4kHz 반송파
+        carrier = np.sin(2 * np.pi * 4000 * t)
+        # 빠른 처프 변조 + 게이트
+        mod = (np.sin(2 * np.pi * 30 * t) + 1) / 2
+        mod[mod < 0.8] = 0
+
+        # 처프 구간 마스크 (scatter 없이 주기 안의 위치로 판정)
+        in_cycle = index % cycle
+        in_chirp = in_cycle % chirp_step
+        envelope = (in_cycle < 3 * chirp_step) & (in_chirp < chirp_len)
+        if total_samples is not None:
+            envelope &= index - in_chirp + chirp_len < total_samples
+
+        yield (carrier * mod * envelope * 0.1).astype(np.float32)
+        offset += n
+        if remaining is not None:
+            remaining -= n
+
+
+def generate_crickets(duration=DEFAULT_DURATION, sr=SAMPLE_RATE, rng=None):
+    return np.concatenate(list(stream_crickets(int(sr * duration), rng=rng, sr=sr)))
+
+
+def stream_birds(total_samples=None, block_size=BLOCK_SIZE, rng=None, sr=SAMPLE_RATE, chirps_per_sec=0.5):
+    noise_rng, chirp_rng = _rng(rng).spawn(2)
+    # 간단한 합성 새소리: FM 처프 그레인을 임의 위치에 배치 (약 2초에 한 번)
+    chirps = _stream_grain_events(total_samples, block_size, chirp_rng, chirp_grains(sr, rng=chirp_rng),
+                                  chirps_per_sec, sr)
+    # 옅은 배경 바람
+    for noise, chirp in zip(stream_brown_noise(total_samples, block_size, noise_rng), chirps):
+        yield (chirp * 0.2 + noise * 0.05).astype(np.float32)
+
+
+def generate_birds(duration=DEFAULT_DURATION, sr=SAMPLE_RATE, chirps_per_sec=0.5, rng=None):
+    return np.concatenate(list(stream_birds(int(sr * duration), rng=rng, sr=sr, chirps_per_sec=chirps_per_sec)))
+
+
+def stream_cloudy(total_samples=None, block_size=BLOCK_SIZE, rng=None, sr=SAMPLE_RATE):
+    for block in stream_pink_noise(total_samples, block_size, rng):
+        yield block * 0.5
+
+
+def generate_cloudy(duration=DEFAULT_DURATION, sr=SAMPLE_RATE, rng=None):
+    return np.concatenate(list(stream_cloudy(int(sr * duration), rng=rng)))
+
+
+# 출력 이름 -> (생성 함수, 추가 인자)
+WEATHER_SOUNDS = {
+    'rain_ambient': (generate_rain, {}),
+    'sunny_birds': (generate_birds, {}),
+    'night_crickets': (generate_crickets, {}),
+    'snow_wind': (generate_wind, {'intensity': 'gentle'}),
+    'strong_wind': (generate_wind, {'intensity': 'strong'}),
+    'cloudy_ambient': (generate_cloudy, {}),
+}
+
+# 블록 스트림으로도 만들 수 있는 사운드 (길이와 관계없이 블록 하나 정도의 메모리로 렌더링)
+STREAM_SOUNDS = {
+    'rain_ambient': stream_rain,
+    'sunny_birds': stream_birds,
+    'night_crickets': stream_crickets,
+    'snow_wind': stream_wind,
+    'strong_wind': stream_wind,
+    'cloudy_ambient': stream_cloudy,
+}
+
+
+# ---------------------------------------------------------------------------
+# WAV 저장 + 파라미터 해시 기록
+# ---------------------------------------------------------------------------
+
+def _info_chunk(comment: str) -> bytes:
+    """LIST/INFO 청크 (ICMT 주석 하나)"""
+    text = comment.encode('ascii') + b'\0'
+    if len(text) % 2:
+        text += b'\0'
+    body = b'INFO' + b'ICMT' + struct.pack('<I', len(text)) + text
+    return b'LIST' + struct.pack('<I', len(body)) + body
+
+
+class WavWriter:
+    """블록 단위 WAV 기록기 (int16 PCM 또는 float32 IEEE)
+
+    헤더의 크기 필드는 자리만 잡아 두고 close() 에서 채우므로 전체 길이를 미리 알 필요가 없습니다.
+    int16 은 -1~1 float 블록을 받아 블록마다 변환하고, 이미 int16 인 블록은 그대로 씁니다.
+    channels 가 2 이상이면 모노 블록을 모든 채널에 복제해 인터리브합니다.
+    comment 가 있으면 data 뒤에 LIST/INFO(ICMT) 청크로 기록합니다.
+
+    같은 디렉토리의 임시 파일에 쓰고 close() 가 끝나야 path 로 바꿔 넣습니다.
+    with 블록에서 예외가 나면 헤더/주석을 채우지 않고 임시 파일을 지우므로
+    (abort()), 해시가 기록된 잘린 WAV 가 남아 다음 실행에서 최신으로 취급되는 일이 없습니다.
+    """
+
+    def __init__(self, path, sr=SAMPLE_RATE, sample_format='int16', comment: Optional[str] = None,
+                 channels: int = 1):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"지원하지 않는 샘플 형식: {sample_format}")
+        self.sample_format = sample_format
+        self.comment = comment
+        self.channels = channels
+        self.frames = 0
+        self.path = Path(path)
+        self._tmp_path = _partial_path(self.path)
+        self._file = open(self._tmp_path, 'wb')
+
+        format_tag, bits = SAMPLE_FORMATS[sample_format]
+        block_align = bits // 8 * channels
+        fmt = struct.pack('<HHIIHH', format_tag, channels, sr, sr * block_align, block_align, bits)
+        header = [b'RIFF', b'\0\0\0\0', b'WAVE', b'fmt ', struct.pack('<I', len(fmt)), fmt]
+        if format_tag != WAVE_FORMAT_PCM:
+            # PCM 이 아닌 형식은 fact 청크(샘플 수)를 둠
+            self._fact_offset = sum(map(len, header)) + 8
+            header += [b'fact', struct.pack('<I', 4), b'\0\0\0\0']
+        else:
+            self._fact_offset = None
+        header += [b'data', b'\0\0\0\0']
+        self._file.write(b''.join(header))
+        self._data_offset = self._file.tell()
+
+    def write(self, block):
+        block = np.asarray(block)
+        if self.sample_format == 'int16' and block.dtype != np.int16:
+            block = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+        elif self.sample_format == 'float32':
+            block = block.astype(np.float32)
+        if self.channels > 1:
+            block = np.repeat(block, self.channels)
+        self._file.write(block.astype(block.dtype.newbyteorder('<')).tobytes())
+        self.frames += len(block) // self.channels
+
+    def close(self):
+        f = self._file
+        data_size = f.tell() - self._data_offset
+        if data_size % 2:
+            f.write(b'\0')
+        if self.comment:
+            f.write(_info_chunk(self.comment))
+        riff_size = f.tell() - 8
+
+        f.seek(4)
+        f.write(struct.pack('<I', riff_size))
+        f.seek(self._data_offset - 4)
+        f.write(struct.pack('<I', data_size))
+        if self._fact_offset is not None:
+            f.seek(self._fact_offset)
+            f.write(struct.pack('<I', self.frames))
+        f.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """기록 중단: 임시 파일을 지우고 기존 path 는 그대로 둠"""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _partial_path(path: Path) -> Path:
+    """path 와 같은 디렉토리의 임시 파일 경로 (확장자 유지, os.replace 가 원자적이도록)"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=f".part{path.suffix}")
+    os.close(fd)
+    return Path(tmp)
+
+
+def read_params_hash(path: Path) -> Optional[str]:
+    """WAV 의 LIST/INFO ICMT 에 기록된 파라미터 해시 (청크 헤더만 읽고 data 는 건너뜀)"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                return None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+                if chunk_id != b'LIST':
+                    f.seek(size + size % 2, os.SEEK_CUR)
+                    continue
+                body = f.read(size)
+                if body[:4] != b'INFO':
+                    continue
+                pos = 4
+                while pos + 8 <= len(body):
+                    sub_id, sub_size = body[pos:pos + 4], struct.unpack('<I', body[pos + 4:pos + 8])[0]
+                    text = body[pos + 8:pos + 8 + sub_size].rstrip(b'\0').decode('ascii', 'replace')
+                    if sub_id == b'ICMT' and text.startswith(PARAMS_COMMENT_PREFIX):
+                        return text[len(PARAMS_COMMENT_PREFIX):]
+                    pos += 8 + sub_size + sub_size % 2
+    except OSError:
+        return None
+
+
+def _blocks(data, block_size=BLOCK_SIZE):
+    for i in range(0, len(data), block_size):
+        yield data[i:i + block_size]
+
+
+def _peak(blocks) -> float:
+    """블록별 최댓값으로 구한 전체 피크 (전체 길이 abs 임시 배열을 만들지 않음)"""
+    return max((float(np.max(np.abs(block))) for block in blocks if len(block)), default=0.0)
+
+
+def write_normalized_wav(filename, make_blocks, sr=SAMPLE_RATE, params_hash: Optional[str] = None,
+                         sample_format='int16', channels: int = 1) -> int:
+    """피크 정규화 WAV 를 블록 단위로 저장 -> 기록한 샘플 수
+
+    make_blocks() 는 매번 같은 블록 열을 돌려줘야 합니다 (배열 조각 또는 시드 고정 스트림).
+    첫 번째 순회로 피크만 구하고 두 번째 순회에서 정규화해 기록하므로
+    메모리는 블록 하나 정도만 더 씁니다.
+    """
+    peak = _peak(make_blocks())
+    comment = PARAMS_COMMENT_PREFIX + params_hash if params_hash else None
+    with WavWriter(filename, sr, sample_format, comment, channels) as writer:
+        for block in make_blocks():
+            if sample_format == 'int16':
+                # 기존 저장 방식과 같은 연산 순서 (data / peak * 32767 후 정수 변환)
+                block = (block / peak * 32767 if peak > 0 else block).astype(np.int16)
+            elif peak > 0:
+                block = block / peak
+            writer.write(block)
+    return writer.frames
+
+
+def save_wav(filename, data, sr=SAMPLE_RATE, params_hash: Optional[str] = None, sample_format='int16',
+             channels: int = 1):
+    # 16비트 PCM(또는 float32) 범위로 정규화해 블록 단위로 저장
+    return write_normalized_wav(filename, lambda: _blocks(data), sr, params_hash, sample_format, channels)
+
+
+# ---------------------------------------------------------------------------
+# 압축 내보내기 (ffmpeg 파이프)
+# ---------------------------------------------------------------------------
+
+def export_compressed(filename, make_blocks, sr=SAMPLE_RATE, export_format='mp3', bitrate=DEFAULT_BITRATE,
+                      channels: int = 1, params_hash: Optional[str] = None) -> int:
+    """피크 정규화한 블록을 ffmpeg 표준 입력(f32le)으로 보내 바로 압축 -> 기록한 샘플 수
+
+    write_normalized_wav 와 같이 첫 순회로 피크를 구하고 두 번째 순회에서 블록을 흘려보내므로
+    중간 WAV 파일이나 전체 길이 배열이 필요 없습니다.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 내보내기 형식: {export_format}")
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError('ffmpeg 를 찾을 수 없습니다 (PATH 확인)')
+
+    codec, _ = EXPORT_FORMATS[export_format]
+    peak = _peak(make_blocks())
+    cmd = [
+        'ffmpeg', '-v', 'error', '-nostdin', '-y',
+        '-f', 'f32le', '-ar', str(sr), '-ac', str(channels), '-i', 'pipe:0',
+        '-c:a', codec, '-b:a', bitrate,
+    ]
+    if params_hash:
+        cmd += ['-metadata', f"comment={PARAMS_COMMENT_PREFIX}{params_hash}"]
+    # ffmpeg 는 태그(comment)를 오디오보다 먼저 쓰므로 임시 파일로 인코딩하고 성공했을 때만 바꿔 넣음
+    filename = Path(filename)
+    tmp_path = _partial_path(filename)
+    cmd.append(str(tmp_path))
+
+    frames = 0
+    # stderr 는 임시 파일로 받아 파이프 버퍼가 차서 멈추는 일이 없도록 함
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            try:
+                for block in make_blocks():
+                    if peak > 0:
+                        block = block / peak
+                    if channels > 1:
+                        block = np.repeat(block, channels)
+                    proc.stdin.write(np.asarray(block, dtype='<f4').tobytes())
+                    frames += len(block) // channels
+                proc.stdin.close()
+            except BrokenPipeError:
+                # ffmpeg 가 먼저 종료됨 -> 아래에서 종료 코드와 오류 메시지로 보고
+                pass
+            proc.wait()
+            if proc.returncode != 0:
+                stderr.seek(0)
+                error = stderr.read().decode('utf-8', 'replace').strip()
+                raise RuntimeError(f"ffmpeg 인코딩 실패 ({filename.name}): {error}")
+        except BaseException:
+            # 실패 / Ctrl+C: ffmpeg 를 멈추고 잘린 출력은 지움 (기존 파일은 그대로)
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            tmp_path.unlink(missing_ok=True)
+            raise
+    os.replace(tmp_path, filename)
+    return frames
+
+
+def read_export_params_hash(path: Path) -> Optional[str]:
+    """압축 파일 태그(ID3 COMM / MP4 ©cmt / Vorbis COMMENT)에 기록된 파라미터 해시"""
+    if MutagenFile is None or not path.exists():
+        return None
+    try:
+        audio = MutagenFile(path)
+    except Exception:
+        return None
+    if audio is None or not audio.tags:
+        return None
+    for value in audio.tags.values():
+        texts = getattr(value, 'text', value)
+        for text in [texts] if isinstance(texts, str) else texts:
+            if isinstance(text, str) and text.startswith(PARAMS_COMMENT_PREFIX):
+                return text[len(PARAMS_COMMENT_PREFIX):]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 렌더링 작업
+# ---------------------------------------------------------------------------
+
+def sound_seed(name: str, base_seed: int = DEFAULT_SEED) -> List[int]:
+    """사운드 이름별 시드 (이름 CRC + 기본 시드, 사운드 추가/순서와 무관)"""
+    return [base_seed, zlib.crc32(name.encode('utf-8'))]
+
+
+def params_hash(name: str, duration: float, sr: int, base_seed: int, sample_format: str = 'int16',
+                channels: int = 1, export_format: Optional[str] = None, bitrate: Optional[str] = None) -> str:
+    """출력에 영향을 주는 설정 + 합성 버전 해시"""
+    func, kwargs = WEATHER_SOUNDS[name]
+    payload = {
+        'version': SYNTH_VERSION,
+        'sound': name,
+        'generator': func.__name__,
+        'kwargs': kwargs,
+        'duration': duration,
+        'sample_rate': sr,
+        'sample_format': sample_format,
+        'seed': sound_seed(name, base_seed),
+    }
+    # 기본값(모노 WAV)일 때는 키를 넣지 않아 기존 WAV 의 해시가 그대로 유지되도록 함
+    if channels != 1:
+        payload['channels'] = channels
+    if export_format:
+        del payload['sample_format']
+        payload['export'] = {'format': export_format, 'bitrate': bitrate}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _block_source(job: Dict):
+    """작업 -> 매번 같은 블록 열을 돌려주는 make_blocks()"""
+    stream = STREAM_SOUNDS.get(job['name'])
+    if stream is not None:
+        # 피크용 / 기록용 두 번 순회하므로 매번 같은 시드로 새 스트림 생성
+        total = int(job['sr'] * job['duration'])
+        kwargs = WEATHER_SOUNDS[job['name']][1]
+        return lambda: stream(total, rng=np.random.default_rng(job['seed']), sr=job['sr'], **kwargs)
+
+    func, kwargs = WEATHER_SOUNDS[job['name']]
+    data = func(job['duration'], job['sr'], rng=np.random.default_rng(job['seed']), **kwargs)
+    return lambda: _blocks(data)
+
+
+def render_sound(job: Dict) -> Dict:
+    """사운드 하나 렌더링 + 저장 (워커 프로세스에서 실행)"""
+    make_blocks = _block_source(job)
+    if job['export']:
+        samples = export_compressed(job['path'], make_blocks, job['sr'], job['export'], job['bitrate'],
+                                    job['channels'], job['params_hash'])
+    else:
+        samples = write_normalized_wav(job['path'], make_blocks, job['sr'], job['params_hash'],
+                                       job['sample_format'], job['channels'])
+    return {'samples': samples, 'bytes': job['path'].stat().st_size}
+
+
+def _run_jobs(stale: List[Dict], jobs: int) -> List[Dict]:
+    """렌더링 대상을 순서대로 처리 (jobs > 1 이면 프로세스 풀)"""
+    if jobs <= 1 or len(stale) <= 1:
+        return [render_sound(job) for job in stale]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as executor:
+        return list(executor.map(render_sound, stale))
+
 
 def main():
-    base_dir = r"c:\PetBeats\assets\sound\weather"
-    os.makedirs(base_dir, exist_ok=True)
-    
-    print("Generating weather sounds...")
-    
-    # 1. Rain
-    save_wav(os.path.join(base_dir, "rain_ambient.wav"), generate_rain())
-    
-    # 2. Sunny (Birds)
-    save_wav(os.path.join(base_dir, "sunny_birds.wav"), generate_birds())
-    
-    # 3. Night (Crickets)
-    save_wav(os.path.join(base_dir, "night_crickets.wav"), generate_crickets())
-    
-    # 4. Snow (Gentle Wind)
-    save_wav(os.path.join(base_dir, "snow_wind.wav"), generate_wind(intensity='gentle'))
-    
-    # 5. Strong Wind
-    save_wav(os.path.join(base_dir, "strong_wind.wav"), generate_wind(intensity='strong'))
-    
-    # 6. Cloudy (White/Pink Mix)
-    save_wav(os.path.join(base_dir, "cloudy_ambient.wav"), generate_pink_noise(10) * 0.5)
-    
-    print("Done!")
+    parser = argparse.ArgumentParser(description='날씨 앰비언스 사운드 합성')
+    parser.add_argument('sounds', nargs='*', help=f"렌더링할 사운드 (기본: 전체, {', '.join(WEATHER_SOUNDS)})")
+    parser.add_argument('--force', '-f', action='store_true', help='변경 여부와 관계없이 전체 렌더링')
+    parser.add_argument('--jobs', '-j', type=int, default=0, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='기본 시드')
+    parser.add_argument('--duration', '-d', type=float, default=DEFAULT_DURATION, help='길이 (초)')
+    parser.add_argument('--format', choices=list(SAMPLE_FORMATS), default='int16', help='WAV 샘플 형식')
+    parser.add_argument('--export', '-e', choices=list(EXPORT_FORMATS),
+                        help='WAV 대신 ffmpeg 파이프로 바로 압축 (mp3 / aac / opus)')
+    parser.add_argument('--bitrate', '-b', default=DEFAULT_BITRATE, help='압축 비트레이트 (기본 128k)')
+    parser.add_argument('--sample-rate', '-r', type=int, default=SAMPLE_RATE, help='샘플레이트 (Hz)')
+    parser.add_argument('--channels', '-c', type=int, default=1, help='채널 수 (모노 신호를 복제)')
+    parser.add_argument('--output-dir', '-o', type=Path,
+                        help='출력 디렉토리 (기본: WAV 는 assets/sound/weather, --export 는 build/weather_export)')
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    unknown = [name for name in args.sounds if name not in WEATHER_SOUNDS]
+    if unknown:
+        parser.error(f"알 수 없는 사운드: {', '.join(unknown)}")
+    if args.sample_rate <= 0 or args.channels <= 0:
+        parser.error('--sample-rate 와 --channels 는 1 이상이어야 합니다')
+    if args.export and shutil.which('ffmpeg') is None:
+        parser.error('--export 에는 ffmpeg 가 필요합니다 (PATH 확인)')
+    if args.export and MutagenFile is None:
+        print("⚠️  mutagen 이 없어 변경 여부를 확인할 수 없습니다 (기존 파일은 --force 일 때만 덮어씀)\n")
+    suffix = EXPORT_FORMATS[args.export][1] if args.export else '.wav'
+    read_hash = read_export_params_hash if args.export else read_params_hash
+
+    output_dir = args.output_dir or (EXPORT_DIR if args.export else WEATHER_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print("🌦️  날씨 사운드 생성 중...\n")
+
+    render_jobs = []
+    for name in args.sounds or WEATHER_SOUNDS:
+        render_jobs.append({
+            'name': name,
+            'path': output_dir / f"{name}{suffix}",
+            'seed': sound_seed(name, args.seed),
+            'duration': args.duration,
+            'sr': args.sample_rate,
+            'channels': args.channels,
+            'sample_format': args.format,
+            'export': args.export,
+            'bitrate': args.bitrate,
+            'params_hash': params_hash(name, args.duration, args.sample_rate, args.seed, args.format,
+                                       args.channels, args.export, args.bitrate),
+        })
+
+    stale, protected = [], set()
+    for job in render_jobs:
+        if args.force:
+            stale.append(job)
+            continue
+        existing = read_hash(job['path'])
+        if existing is None and job['path'].exists():
+            # 이 스크립트가 만든 파일이 아님 (예: 앱에 들어가는 녹음) -> --force 없이는 덮어쓰지 않음
+            protected.add(job['name'])
+        elif existing != job['params_hash']:
+            stale.append(job)
+    try:
+        results = _run_jobs(stale, jobs)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    outcomes = dict(zip((job['name'] for job in stale), results))
+
+    for job in render_jobs:
+        outcome = outcomes.get(job['name'])
+        if job['name'] in protected:
+            print(f"⚠️  {job['name']}: 파라미터 해시가 없는 기존 파일이라 건너뜀 ({job['path'].name}, 덮어쓰려면 --force)")
+            continue
+        if outcome is None:
+            print(f"⏭️  {job['name']}: 변경 없음")
+            continue
+        print(f"✅ {job['name']}: {outcome['samples'] / job['sr']:.1f}초, {outcome['bytes'] / 1024:.0f}KB")
+
+    unchanged = len(render_jobs) - len(stale) - len(protected)
+    print(f"\n✅ 완료! {len(stale)}개 렌더링" +
+          (f" ({unchanged}개 변경 없음)" if unchanged else "") +
+          (f" ({len(protected)}개 보호된 기존 파일 건너뜀)" if protected else ""))
+    print(f"출력 경로: {output_dir}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+시간 구간별 햅틱 패턴 청크 + 탐색(seek) 인덱스
+
+5분짜리 패턴 전체를 파싱한 뒤 현재 위치를 선형 탐색하는 대신, 패턴을 고정 길이
+구간(기본 30초)으로 나눠 청크 파일로 저장하고, 구간 시작 시각 -> 청크 파일 /
+이벤트 오프셋을 담은 작은 인덱스를 함께 만듭니다.
+
+플레이어는 index.json 만 읽은 뒤 position_ms // chunk_ms 로 청크 번호를 바로 구해
+해당 청크 하나만 로드하면 됩니다 (이벤트가 없는 구간은 file 이 null).
+
+출력 구조:
+    assets/haptic_patterns/chunked/<track_id>/index.json
+    assets/haptic_patterns/chunked/<track_id>/000.json (+ binary/000.hpat), 001.json, ...
+    (generate_haptic_patterns 의 모드용 청크는 트랙 ID 가 겹치므로 mode_chunked/<track_id>/)
+
+사용법:
+    python scripts/haptic_chunks.py --all                          # 저장된 모든 패턴 분할
+    python scripts/haptic_chunks.py assets/haptic_patterns/sleep_03.json --chunk-seconds 15
+    python scripts/generate_all_haptic_patterns.py --chunk-seconds 30   # 생성 시 함께 분할
+
+    from haptic_chunks import write_chunks, load_chunk_at
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from haptic_codec import PATTERN_DIR, write_haptic_binary
+
+CHUNK_DIR = PATTERN_DIR / 'chunked'
+DEFAULT_CHUNK_MS = 30_000
+INDEX_FILE_NAME = 'index.json'
+
+
+def _split_repeat(event: Dict, boundary_ms: int) -> Tuple[Dict, Optional[Dict]]:
+    """구간 경계를 넘는 반복 이벤트(repeat/interval)를 경계 앞/뒤 두 이벤트로 분리"""
+    repeat = event.get('repeat', 1)
+    interval = event.get('interval', 0)
+    if repeat <= 1 or interval <= 0:
+        return event, None
+
+    # 경계 앞에 들어가는 반복 횟수
+    before = min(repeat, (boundary_ms - event['time'] + interval - 1) // interval)
+    if before >= repeat:
+        return event, None
+
+    def part(time_ms: int, count: int) -> Dict:
+        piece = {'time': time_ms, 'note': event['note'], 'velocity': event['velocity']}
+        if count > 1:
+            piece['repeat'] = count
+            piece['interval'] = interval
+        return piece
+
+    return part(event['time'], before), part(event['time'] + before * interval, repeat - before)
+
+
+def split_pattern(data: Dict, chunk_ms: int = DEFAULT_CHUNK_MS) -> Tuple[Dict, List[List[Dict]]]:
+    """패턴 dict -> (인덱스 dict, 청크별 이벤트 목록)
+
+    이벤트 시간은 곡 시작 기준 절대값 그대로 두므로 청크를 이어 붙이면 원래 순서가 됩니다.
+    """
+    if chunk_ms <= 0:
+        raise ValueError('chunk_ms 는 0 보다 커야 합니다')
+
+    events = data['events']
+    duration_ms = data.get('stats', {}).get('duration_ms', events[-1]['time'] if events else 0)
+    chunks: List[List[Dict]] = [[] for _ in range(duration_ms // chunk_ms + 1)]
+
+    for event in events:
+        while event is not None:
+            idx = event['time'] // chunk_ms
+            while idx >= len(chunks):
+                chunks.append([])
+            head, event = _split_repeat(event, (idx + 1) * chunk_ms)
+            chunks[idx].append(head)
+
+    entries = []
+    event_offset = 0
+    for idx, chunk_events in enumerate(chunks):
+        entries.append({
+            'start_ms': idx * chunk_ms,
+            'file': f"{idx:03d}.json" if chunk_events else None,
+            'event_offset': event_offset,
+            'events': len(chunk_events),
+        })
+        event_offset += len(chunk_events)
+
+    index = {
+        'track_id': data.get('track_id'),
+        'bpm': data.get('bpm'),
+        'chunk_ms': chunk_ms,
+        'duration_ms': duration_ms,
+        'total_events': event_offset,
+        'chunks': entries,
+    }
+    return index, chunks
+
+
+def write_chunks(data: Dict, output_root: Path = CHUNK_DIR, chunk_ms: int = DEFAULT_CHUNK_MS) -> Path:
+    """청크 파일(JSON + .hpat)과 index.json 저장 -> 인덱스 파일 경로
+
+    같은 트랙의 이전 청크는 먼저 지워 구간 수가 줄어도 남는 파일이 없도록 합니다.
+    """
+    index, chunks = split_pattern(data, chunk_ms)
+    track_dir = output_root / data['track_id']
+    if track_dir.exists():
+        shutil.rmtree(track_dir)
+    track_dir.mkdir(parents=True)
+
+    for entry, chunk_events in zip(index['chunks'], chunks):
+        if entry['file'] is None:
+            continue
+        chunk_data = {
+            'track_id': data['track_id'],
+            'chunk': entry['start_ms'] // chunk_ms,
+            'start_ms': entry['start_ms'],
+            'end_ms': entry['start_ms'] + chunk_ms,
+            'events': chunk_events,
+        }
+        chunk_file = track_dir / entry['file']
+        with open(chunk_file, 'w', encoding='utf-8') as f:
+            json.dump(chunk_data, f, ensure_ascii=False, indent=2)
+        write_haptic_binary(chunk_file, chunk_data)
+
+    index_file = track_dir / INDEX_FILE_NAME
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return index_file
+
+
+def load_chunk_at(index_file: Path, position_ms: int) -> Tuple[Dict, List[Dict]]:
+    """재생 위치가 속한 청크 하나만 로드 -> (인덱스 항목, position 이후 이벤트)
+
+    청크 번호는 position_ms // chunk_ms 로 바로 구합니다 (인덱스 선형 탐색 없음).
+    position 이전에 시작했지만 이후에도 반복이 남은 이벤트는 지난 반복만 잘라내 남깁니다.
+    """
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    idx = max(position_ms, 0) // index['chunk_ms']
+    if idx >= len(index['chunks']):
+        return {}, []
+    entry = index['chunks'][idx]
+    if entry['file'] is None:
+        return entry, []
+
+    with open(index_file.parent / entry['file'], 'r', encoding='utf-8') as f:
+        chunk_events = json.load(f)['events']
+    events = []
+    for event in chunk_events:
+        if event['time'] < position_ms:
+            _, event = _split_repeat(event, position_ms)
+            if event is None:
+                continue
+        events.append(event)
+    return entry, events
+
+
+def join_chunks(index_file: Path) -> List[Dict]:
+    """모든 청크를 순서대로 이어 붙인 이벤트 목록 (검증용)"""
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    events = []
+    for entry in index['chunks']:
+        if entry['file'] is None:
+            continue
+        with open(index_file.parent / entry['file'], 'r', encoding='utf-8') as f:
+            events.extend(json.load(f)['events'])
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description='햅틱 패턴 시간 구간 분할 + 탐색 인덱스 생성')
+    parser.add_argument('files', nargs='*', type=Path, help='패턴 JSON 파일')
+    parser.add_argument('--all', '-a', action='store_true', help='assets/haptic_patterns 의 모든 패턴')
+    parser.add_argument('--chunk-seconds', '-c', type=float, default=DEFAULT_CHUNK_MS / 1000,
+                        help='구간 길이 (초, 기본 30)')
+    parser.add_argument('--output-dir', '-o', type=Path, default=CHUNK_DIR, help='출력 디렉토리')
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.all:
+        files.extend(sorted(PATTERN_DIR.glob('*.json')))
+    if not files:
+        parser.error('패턴 파일 또는 --all 이 필요합니다')
+
+    chunk_ms = int(args.chunk_seconds * 1000)
+    for json_path in files:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index_file = write_chunks(data, args.output_dir, chunk_ms)
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        loaded = sum(1 for entry in index['chunks'] if entry['file'])
+        print(f"📁 {data['track_id']}: {len(index['chunks'])}개 구간 "
+              f"(이벤트 있는 청크 {loaded}개, 이벤트 {index['total_events']}개)")
+
+    print(f"\n✅ {len(files)}개 패턴 분할 완료 ({chunk_ms / 1000:g}초 단위)")
+    print(f"출력 경로: {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
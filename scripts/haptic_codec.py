@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+햅틱 패턴 바이너리 포맷 (.hpat) 인코더/디코더
+
+assets/haptic_patterns/*.json 과 같은 내용을 작은 바이너리로 저장합니다.
+.hpat 는 JSON 옆의 binary/ 하위 디렉토리(예: assets/haptic_patterns/binary/sleep_01.hpat)에 둡니다.
+pubspec.yaml 은 assets/haptic_patterns/ 바로 아래 파일만 번들하므로, 앱에 Dart 디코더가
+생기기 전까지 읽지 못하는 바이너리가 앱 번들에 들어가지 않습니다.
+이벤트마다 dict 를 두는 대신 시간 델타 / 노트 / velocity 를 열(column)별로 묶어
+저장하므로 파일이 작고, 디코딩은 np.frombuffer + cumsum 한 번으로 끝납니다.
+
+파일 구조 (리틀 엔디안):
+    헤더 16바이트   magic 'PBHP' | version u8 | delta 폭 u8 (2 또는 4) | 플래그 u16
+                    | 이벤트 수 u32 | 메타 길이 u32
+    메타            UTF-8 JSON (events 를 제외한 track_id, bpm, stats 등 모든 키, 키 순서 유지)
+    델타 열         u16 또는 u32 x 이벤트 수 (첫 값은 0 기준, 시간은 오름차순이어야 함)
+    노트 열         u8 x 이벤트 수
+    velocity 열     u8 x 이벤트 수
+    (플래그 FLAG_SPARSE_REPEATS 일 때) 반복 이벤트 수 u32 = m
+                    | 이벤트 번호 u32 x m | repeat u16 x m | interval u16 x m
+        haptic_simplify 가 반복 이벤트를 합친 경우에만 쓰며, repeat 가 2 이상인 이벤트만
+        기록합니다. 나머지는 JSON 에서 repeat/interval 키가 없는 이벤트로 복원됩니다.
+    (플래그 FLAG_REPEATS, 이전 형식) repeat 열 u16, interval 열 u16 x 이벤트 수
+        모든 이벤트마다 두 열을 써서 반복이 드물면 병합 전보다 커지므로 디코딩만 지원합니다.
+
+decode_haptic(encode_haptic(data)) == data 가 항상 성립합니다.
+
+사용법:
+    python scripts/haptic_codec.py --encode-all     # 모든 JSON 의 .hpat 를 binary/ 에 생성
+    python scripts/haptic_codec.py --bench          # JSON 대비 크기/디코딩 시간 비교
+
+    from haptic_codec import encode_haptic, decode_haptic
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PATTERN_DIR = PROJECT_ROOT / 'assets' / 'haptic_patterns'
+
+MAGIC = b'PBHP'
+FORMAT_VERSION = 1
+BINARY_SUFFIX = '.hpat'
+BINARY_SUBDIR = 'binary'
+
+_HEADER = struct.Struct('<4sBBHII')
+FLAG_REPEATS = 0x0001         # 이전 형식 (이벤트마다 repeat/interval 열), 디코딩만 지원
+FLAG_SPARSE_REPEATS = 0x0002  # repeat > 1 인 이벤트만 (번호, repeat, interval)
+
+_EVENT_KEYS = ['time', 'note', 'velocity']
+_REPEAT_KEYS = _EVENT_KEYS + ['repeat', 'interval']
+_EVENTS_PLACEHOLDER = None  # 메타 JSON 안에서 events 자리 (키 순서 보존용)
+
+
+def encode_haptic(data: Dict) -> bytes:
+    """햅틱 패턴 dict (JSON 과 동일 구조) -> .hpat 바이트"""
+    events = data['events']
+    count = len(events)
+
+    times = np.empty(count, dtype=np.int64)
+    notes = np.empty(count, dtype=np.int64)
+    velocities = np.empty(count, dtype=np.int64)
+    repeats = np.ones(count, dtype=np.int64)
+    intervals = np.zeros(count, dtype=np.int64)
+    for i, event in enumerate(events):
+        keys = list(event)
+        if keys == _REPEAT_KEYS:
+            if event['repeat'] < 2:
+                raise ValueError(f"이벤트 {i}: repeat 키가 있으면 2 이상이어야 합니다")
+            repeats[i], intervals[i] = event['repeat'], event['interval']
+        elif keys != _EVENT_KEYS:
+            raise ValueError(f"이벤트 {i}: 키는 {_EVENT_KEYS} 또는 {_REPEAT_KEYS} 순서여야 합니다 ({keys})")
+        times[i], notes[i], velocities[i] = event['time'], event['note'], event['velocity']
+    repeated = np.flatnonzero(repeats > 1)
+    flags = FLAG_SPARSE_REPEATS if len(repeated) else 0
+
+    deltas = np.diff(times, prepend=0)
+    if count and (deltas.min() < 0):
+        raise ValueError('이벤트 시간이 오름차순(0 이상)이 아닙니다')
+    for name, column in (('note', notes), ('velocity', velocities)):
+        if count and (column.min() < 0 or column.max() > 255):
+            raise ValueError(f"{name} 값이 0~255 범위를 벗어났습니다")
+    for name, column in (('repeat', repeats), ('interval', intervals)):
+        if count and (column.min() < 0 or column.max() > 0xFFFF):
+            raise ValueError(f"{name} 값이 0~65535 범위를 벗어났습니다")
+
+    max_delta = int(deltas.max()) if count else 0
+    if max_delta <= 0xFFFF:
+        delta_width, delta_dtype = 2, '<u2'
+    elif max_delta <= 0xFFFFFFFF:
+        delta_width, delta_dtype = 4, '<u4'
+    else:
+        raise ValueError('이벤트 간격이 너무 큽니다')
+
+    meta = {key: (_EVENTS_PLACEHOLDER if key == 'events' else value) for key, value in data.items()}
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    parts = [
+        _HEADER.pack(MAGIC, FORMAT_VERSION, delta_width, flags, count, len(meta_bytes)),
+        meta_bytes,
+        deltas.astype(delta_dtype).tobytes(),
+        notes.astype(np.uint8).tobytes(),
+        velocities.astype(np.uint8).tobytes(),
+    ]
+    if flags & FLAG_SPARSE_REPEATS:
+        parts.append(struct.pack('<I', len(repeated)))
+        parts.append(repeated.astype('<u4').tobytes())
+        parts.append(repeats[repeated].astype('<u2').tobytes())
+        parts.append(intervals[repeated].astype('<u2').tobytes())
+    return b''.join(parts)
+
+
+def decode_haptic_arrays(buf: bytes) -> Tuple[Dict, np.ndarray, np.ndarray, np.ndarray]:
+    """.hpat 바이트 -> (메타 dict, time int64 배열, note uint8 배열, velocity uint8 배열)
+
+    이벤트를 dict 로 만들지 않는 빠른 경로입니다. 메타의 'events' 값은 None 이며,
+    반복 이벤트가 있으면 메타의 '_repeats' 에 이벤트 수 길이의 (repeat, interval) uint16 배열 쌍을 담습니다.
+    """
+    if len(buf) < _HEADER.size:
+        raise ValueError('헤더가 잘렸습니다')
+    magic, version, delta_width, flags, count, meta_len = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError('햅틱 바이너리 파일이 아닙니다')
+    if version != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 포맷 버전: {version}")
+    if delta_width not in (2, 4):
+        raise ValueError(f"잘못된 델타 폭: {delta_width}")
+
+    pos = _HEADER.size
+    meta = json.loads(bytes(buf[pos:pos + meta_len]).decode('utf-8'))
+    pos += meta_len
+
+    expected = pos + count * (delta_width + 2 + (4 if flags & FLAG_REPEATS else 0))
+    repeated_count = 0
+    if flags & FLAG_SPARSE_REPEATS:
+        if len(buf) < expected + 4:
+            raise ValueError('반복 이벤트 영역이 잘렸습니다')
+        repeated_count = struct.unpack_from('<I', buf, expected)[0]
+        expected += 4 + repeated_count * 8
+    if len(buf) != expected:
+        raise ValueError(f"파일 길이 불일치 ({len(buf)} != {expected})")
+
+    deltas = np.frombuffer(buf, dtype='<u2' if delta_width == 2 else '<u4', count=count, offset=pos)
+    pos += count * delta_width
+    notes = np.frombuffer(buf, dtype=np.uint8, count=count, offset=pos)
+    velocities = np.frombuffer(buf, dtype=np.uint8, count=count, offset=pos + count)
+    if flags & FLAG_REPEATS:
+        pos += count * 2
+        meta['_repeats'] = (np.frombuffer(buf, dtype='<u2', count=count, offset=pos),
+                            np.frombuffer(buf, dtype='<u2', count=count, offset=pos + count * 2))
+    elif flags & FLAG_SPARSE_REPEATS:
+        pos += count * 2 + 4
+        index = np.frombuffer(buf, dtype='<u4', count=repeated_count, offset=pos)
+        if repeated_count and int(index.max()) >= count:
+            raise ValueError('반복 이벤트 번호가 범위를 벗어났습니다')
+        pos += repeated_count * 4
+        repeats = np.ones(count, dtype=np.uint16)
+        intervals = np.zeros(count, dtype=np.uint16)
+        repeats[index] = np.frombuffer(buf, dtype='<u2', count=repeated_count, offset=pos)
+        intervals[index] = np.frombuffer(buf, dtype='<u2', count=repeated_count, offset=pos + repeated_count * 2)
+        meta['_repeats'] = (repeats, intervals)
+
+    return meta, np.cumsum(deltas, dtype=np.int64), notes, velocities
+
+
+def decode_haptic(buf: bytes) -> Dict:
+    """.hpat 바이트 -> JSON 과 동일한 햅틱 패턴 dict"""
+    meta, times, notes, velocities = decode_haptic_arrays(buf)
+    repeat_columns = meta.pop('_repeats', None)
+    meta['events'] = [
+        {'time': t, 'note': n, 'velocity': v}
+        for t, n, v in zip(times.tolist(), notes.tolist(), velocities.tolist())
+    ]
+    if repeat_columns is not None:
+        for event, repeat, interval in zip(meta['events'], *(column.tolist() for column in repeat_columns)):
+            if repeat > 1:
+                event['repeat'] = repeat
+                event['interval'] = interval
+    return meta
+
+
+def binary_path(json_path: Path) -> Path:
+    """JSON 파일에 대응하는 .hpat 경로 (같은 디렉토리의 binary/ 아래, 같은 이름)"""
+    return json_path.parent / BINARY_SUBDIR / json_path.with_suffix(BINARY_SUFFIX).name
+
+
+def write_haptic_binary(json_path: Path, data: Dict) -> Path:
+    """JSON 파일에 대응하는 binary/<이름>.hpat 저장"""
+    output_file = binary_path(json_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_bytes(encode_haptic(data))
+    return output_file
+
+
+def encode_all(pattern_dir: Path = PATTERN_DIR) -> int:
+    """디렉토리의 모든 JSON 을 .hpat 로 변환 (왕복 검증 포함)"""
+    json_files = sorted(pattern_dir.glob('*.json'))
+    for json_path in json_files:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        output_file = write_haptic_binary(json_path, data)
+        if decode_haptic(output_file.read_bytes()) != data:
+            raise ValueError(f"{json_path.name}: 왕복 결과가 다릅니다")
+    return len(json_files)
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(pattern_dir: Path = PATTERN_DIR, repeat: int = 20) -> Dict:
+    """JSON 대비 크기와 디코딩 시간 비교 (파일 내용은 메모리에 올린 뒤 파싱만 측정)"""
+    json_blobs = []
+    binary_blobs = []
+    for json_path in sorted(pattern_dir.glob('*.json')):
+        binary_file = binary_path(json_path)
+        if not binary_file.exists():
+            continue
+        json_blobs.append(json_path.read_bytes())
+        binary_blobs.append(binary_file.read_bytes())
+
+    parsed = [json.loads(blob) for blob in json_blobs]
+    assert [decode_haptic(blob) for blob in binary_blobs] == parsed
+
+    return {
+        'files': len(json_blobs),
+        'events': sum(len(data['events']) for data in parsed),
+        'json_bytes': sum(map(len, json_blobs)),
+        'binary_bytes': sum(map(len, binary_blobs)),
+        'json_decode_s': _best_of(lambda: [json.loads(blob) for blob in json_blobs], repeat),
+        'binary_decode_s': _best_of(lambda: [decode_haptic(blob) for blob in binary_blobs], repeat),
+        'binary_arrays_s': _best_of(lambda: [decode_haptic_arrays(blob) for blob in binary_blobs], repeat),
+    }
+
+
+def print_benchmark(result: Dict):
+    print(f"📊 햅틱 패턴 {result['files']}개, 이벤트 {result['events']:,}개\n")
+    ratio = result['binary_bytes'] / result['json_bytes'] if result['json_bytes'] else 0
+    print(f"   💾 JSON:   {result['json_bytes']:>10,} bytes")
+    print(f"   💾 .hpat:  {result['binary_bytes']:>10,} bytes ({ratio:.1%})\n")
+
+    json_ms = result['json_decode_s'] * 1000
+    print(f"   ⏱️  JSON 파싱 (json.loads):        {json_ms:8.2f} ms")
+    for label, key in (('.hpat -> dict (decode_haptic):  ', 'binary_decode_s'),
+                       ('.hpat -> 배열 (decode_arrays):  ', 'binary_arrays_s')):
+        ms = result[key] * 1000
+        print(f"   ⏱️  {label}{ms:8.2f} ms (x{json_ms / ms:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='햅틱 패턴 바이너리 포맷 인코더/디코더')
+    parser.add_argument('--encode-all', action='store_true', help='모든 JSON 패턴을 .hpat 로 변환')
+    parser.add_argument('--bench', action='store_true', help='JSON 대비 크기/디코딩 시간 비교')
+    parser.add_argument('--dir', type=Path, default=PATTERN_DIR, help='햅틱 패턴 디렉토리')
+    parser.add_argument('file', nargs='?', type=Path, help='내용을 출력할 .hpat 파일')
+    args = parser.parse_args()
+
+    if args.encode_all:
+        count = encode_all(args.dir)
+        print(f"✅ {count}개 패턴을 .hpat 로 변환 (왕복 검증 완료)")
+    if args.bench:
+        print_benchmark(benchmark(args.dir))
+    if args.file:
+        data = decode_haptic(args.file.read_bytes())
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    if not (args.encode_all or args.bench or args.file):
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
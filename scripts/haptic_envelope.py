@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+노트 길이 기반 연속 진폭 엔벨로프 햅틱 출력 (.henv)
+
+note_on 타임스탬프만 쓰는 기존 햅틱 이벤트와 달리, note_on / note_off 를 벡터 연산으로
+짝지어 노트 길이를 구하고 velocity 와 길이로 고정 샘플레이트(기본 50Hz) uint8 진폭 곡선을
+만듭니다. 진폭 제어를 지원하는 기기에서는 수천 개의 단발 진동을 예약하는 대신
+이 파형을 진동 API 에 바로 넘길 수 있습니다.
+
+노트 하나의 모양: 시작 시 velocity 비례 레벨 -> 노트 길이 동안 선형 감쇠(ENVELOPE_DECAY)
+-> note_off 후 RELEASE_MS 동안 0 까지 감소. 노트가 겹치면 큰 값을 사용합니다.
+
+파일 구조 (리틀 엔디안):
+    헤더 16바이트   magic 'PBHE' | version u8 | 플래그 u8 | 샘플레이트 Hz u16
+                    | 프레임 수 u32 | 메타 길이 u32
+    메타            UTF-8 JSON (track_id, bpm, stats 등)
+    진폭            uint8 x 프레임 수 (플래그 FLAG_ZLIB 이면 zlib 압축)
+
+사용법:
+    python scripts/haptic_profiles.py --envelope          # 프로파일 JSON 옆에 .henv 생성
+    python scripts/haptic_envelope.py assets/haptic_patterns/profiles/low_register/sleep_03.henv   # 내용 요약
+
+    from haptic_envelope import pair_notes, render_envelope, encode_envelope, decode_envelope
+"""
+
+import argparse
+import json
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from midi_analysis import TYPE_NOTE_OFF, TYPE_NOTE_ON
+
+MAGIC = b'PBHE'
+FORMAT_VERSION = 1
+ENVELOPE_SUFFIX = '.henv'
+FLAG_ZLIB = 0x01
+
+DEFAULT_RATE_HZ = 50
+RELEASE_MS = 60          # note_off 후 0 까지 줄어드는 시간
+ENVELOPE_DECAY = 0.4     # 노트 길이 동안 줄어드는 비율 (시작 레벨 대비)
+MAX_NOTE_MS = 4000       # 긴 패드 / note_off 없는 노트의 최대 길이
+
+_HEADER = struct.Struct('<4sBBHII')
+
+
+def pair_notes(events: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """이벤트 배열에서 note_on 마다 짝이 되는 note_off tick 찾기
+
+    -> (note_on 행 인덱스, 끝 tick 배열; 짝이 없으면 -1)
+    (트랙, 채널, 노트) 별로 tick 순 정렬하되 같은 tick 이면 note_off 를 먼저 두어,
+    같은 tick 의 note_off 는 이전 노트를 끝내도록 합니다. velocity 0 note_on 도 note_off 입니다.
+    같은 키의 노트가 겹치면 먼저 시작한 노트가 먼저 끝나도록(FIFO) 키 안에서 k 번째 note_on 을
+    k 번째 유효 note_off 와 짝짓습니다. 열린 노트가 없을 때의 note_off 는 무시합니다.
+    """
+    is_on = (events['type'] == TYPE_NOTE_ON) & (events['velocity'] > 0)
+    is_off = (events['type'] == TYPE_NOTE_OFF) | ((events['type'] == TYPE_NOTE_ON) & (events['velocity'] == 0))
+    rows = np.flatnonzero(is_on | is_off)
+
+    key = ((events['track'][rows].astype(np.int64) << 12)
+           | (events['channel'][rows].astype(np.int64) << 8)
+           | events['note'][rows].astype(np.int64))
+    ticks = events['tick'][rows]
+    on_flag = is_on[rows]
+
+    order = np.lexsort((on_flag, ticks, key))
+    rows, key, ticks, on_flag = rows[order], key[order], ticks[order], on_flag[order]
+    count = len(rows)
+    if count == 0:
+        return rows, np.empty(0, dtype=np.int64)
+
+    # 키 그룹별 누적 합 (전체 누적 합에서 그룹 시작 직전 값을 뺌)
+    group_start = np.r_[True, key[1:] != key[:-1]]
+    group = np.cumsum(group_start) - 1
+    starts = np.flatnonzero(group_start)
+
+    def group_cumsum(values):
+        total = np.cumsum(values)
+        return total - (total - values)[starts][group]
+
+    on_count = group_cumsum(on_flag.astype(np.int64))
+    off_count = group_cumsum((~on_flag).astype(np.int64))
+
+    # 열린 노트 수(on - off)가 그룹 안 최저치를 새로 찍는 note_off 는 짝이 없는 note_off.
+    # 그룹마다 큰 값씩 내려 두면 전체 minimum.accumulate 가 그룹 안 최저치가 됨
+    spread = 2 * count + 1
+    depth = on_count - off_count
+    lowest = np.minimum.accumulate(depth - group * spread) + group * spread
+    orphans = -np.minimum(lowest, 0)
+    valid_off = ~on_flag & (orphans == np.r_[0, orphans[:-1]] * ~group_start)
+
+    # (키, 키 안의 순번)으로 짝짓기: k 번째 note_on <-> k 번째 유효 note_off
+    on_pos = np.flatnonzero(on_flag)
+    off_pos = np.flatnonzero(valid_off)
+    on_rank = key[on_pos] * spread + on_count[on_pos] - 1
+    off_rank = key[off_pos] * spread + (off_count - orphans)[off_pos] - 1
+
+    nxt = np.searchsorted(off_rank, on_rank)
+    found = np.minimum(nxt, max(len(off_pos) - 1, 0))
+    matched = (nxt < len(off_pos)) & (off_rank[found] == on_rank) if len(off_pos) else np.zeros(len(on_pos), bool)
+
+    end_ticks = np.where(matched, ticks[off_pos[found]] if len(off_pos) else -1, -1)
+    return rows[on_pos], end_ticks
+
+
+def render_envelope(start_ms: np.ndarray, end_ms: np.ndarray, velocities: np.ndarray,
+                    rate_hz: int = DEFAULT_RATE_HZ, total_ms: int = 0) -> np.ndarray:
+    """노트 (시작, 끝, velocity) 배열 -> uint8 진폭 곡선
+
+    end_ms 가 음수(짝 없음)이면 MAX_NOTE_MS 길이로 봅니다.
+    """
+    start_ms = np.asarray(start_ms, dtype=np.int64)
+    end_ms = np.asarray(end_ms, dtype=np.int64)
+    end_ms = np.where(end_ms < 0, start_ms + MAX_NOTE_MS, np.minimum(end_ms, start_ms + MAX_NOTE_MS))
+
+    start_f = start_ms * rate_hz // 1000
+    hold = np.maximum(end_ms * rate_hz // 1000 - start_f, 1)
+    release = max(1, -(-RELEASE_MS * rate_hz // 1000))
+    lengths = hold + release
+
+    frame_count = int(max(total_ms * rate_hz // 1000, (start_f + lengths).max() if len(start_f) else 0))
+    amplitude = np.zeros(frame_count, dtype=np.float64)
+    if len(start_f) == 0:
+        return amplitude.astype(np.uint8)
+
+    # 노트별 프레임 위치를 한 번에 펼침
+    note_idx = np.repeat(np.arange(len(start_f)), lengths)
+    offset = np.arange(len(note_idx)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    level = np.asarray(velocities, dtype=np.float64)[note_idx] / 127 * 255
+    note_hold = hold[note_idx]
+    in_hold = offset < note_hold
+    decayed = level * (1 - ENVELOPE_DECAY * np.minimum(offset, note_hold) / note_hold)
+    released = decayed * (1 - (offset - note_hold + 1) / (release + 1))
+    values = np.where(in_hold, decayed, released)
+
+    np.maximum.at(amplitude, start_f[note_idx] + offset, values)
+    return np.rint(amplitude).clip(0, 255).astype(np.uint8)
+
+
+def envelope_stats(amplitude: np.ndarray, rate_hz: int, note_count: int) -> Dict:
+    active = amplitude > 0
+    return {
+        'notes': int(note_count),
+        'frames': int(len(amplitude)),
+        'duration_ms': int(len(amplitude) * 1000 // rate_hz),
+        'active_ratio': round(float(active.mean()), 3) if len(amplitude) else 0.0,
+        'peak': int(amplitude.max()) if len(amplitude) else 0,
+    }
+
+
+def encode_envelope(amplitude: np.ndarray, rate_hz: int, meta: Dict, compress: bool = True) -> bytes:
+    """진폭 곡선 + 메타 -> .henv 바이트"""
+    payload = np.asarray(amplitude, dtype=np.uint8).tobytes()
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 9)
+        flags |= FLAG_ZLIB
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags, rate_hz, len(amplitude), len(meta_bytes)) + meta_bytes + payload
+
+
+def decode_envelope(buf: bytes) -> Tuple[Dict, int, np.ndarray]:
+    """.henv 바이트 -> (메타, 샘플레이트, uint8 진폭 배열)"""
+    if len(buf) < _HEADER.size:
+        raise ValueError('헤더가 잘렸습니다')
+    magic, version, flags, rate_hz, frame_count, meta_len = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError('엔벨로프 파일이 아닙니다')
+    if version != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 포맷 버전: {version}")
+
+    pos = _HEADER.size
+    meta = json.loads(bytes(buf[pos:pos + meta_len]).decode('utf-8'))
+    payload = bytes(buf[pos + meta_len:])
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    amplitude = np.frombuffer(payload, dtype=np.uint8)
+    if len(amplitude) != frame_count:
+        raise ValueError(f"프레임 수 불일치 ({len(amplitude)} != {frame_count})")
+    return meta, rate_hz, amplitude
+
+
+def _sparkline(amplitude: np.ndarray, width: int = 60) -> str:
+    if len(amplitude) == 0:
+        return ''
+    blocks = ' ▁▂▃▄▅▆▇█'
+    bins = np.array_split(amplitude, min(width, len(amplitude)))
+    return ''.join(blocks[int(b.max()) * (len(blocks) - 1) // 255] for b in bins)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='햅틱 진폭 엔벨로프(.henv) 요약')
+    parser.add_argument('files', nargs='+', type=Path, help='.henv 파일')
+    args = parser.parse_args()
+
+    for path in args.files:
+        buf = path.read_bytes()
+        meta, rate_hz, amplitude = decode_envelope(buf)
+        stats = meta.get('stats', {})
+        print(f"📁 {path.name} ({meta.get('track_id')}, {meta.get('profile', '-')})")
+        print(f"   ⏱️  {rate_hz}Hz x {len(amplitude):,} 프레임 ({len(amplitude) / rate_hz:.1f}초)")
+        print(f"   🎵 노트 {stats.get('notes', 0):,}개, 진동 구간 {stats.get('active_ratio', 0):.1%}, "
+              f"최대 {stats.get('peak', 0)}")
+        print(f"   💾 {len(buf):,} bytes (비압축 {len(amplitude):,} bytes)")
+        print(f"   {_sparkline(amplitude)}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+반복 마디 기반 햅틱 패턴 압축 (모티프 + 등장 목록)
+
+수면 / 심장박동 트랙은 같은 마디 길이의 이벤트 묶음(예: 4000ms 마다 노트 60)이 곡 전체에
+걸쳐 반복됩니다. 이벤트를 bpm 기준 마디 단위로 묶고, 묶음의 첫 이벤트 기준 상대 시간으로
+(dt, note, velocity) 열을 만들어 같은 묶음은 모티프 하나로 한 번만 저장합니다.
+곡은 순서대로 나열한 등장(occurrence) 목록으로 표현하며, 같은 모티프가 일정 간격으로
+연달아 나오면 [시작, 모티프, 횟수, 간격] 한 항목으로 합칩니다.
+
+압축 구조 (events 를 제외한 메타 키는 그대로 유지):
+    "motifs":      [[[dt, note, velocity(, repeat, interval)], ...], ...]
+    "occurrences": [[start_ms, motif_id] 또는 [start_ms, motif_id, count, period_ms], ...]
+
+등장 목록을 순서대로 펼치면 원래 이벤트 목록이 되므로
+expand_pattern(compress_pattern(data)) == data 가 항상 성립합니다.
+
+이 형식은 크기(저장 / 전송)를 줄이기 위한 것입니다. 압축률은 같은 구분자의 compact JSON
+기준으로 보고하며, 읽을 때는 json 파싱 뒤 Python 에서 펼치기가 한 번 더 필요하므로
+파싱 + 펼치기 시간은 원본 JSON 파싱보다 깁니다 (리포트에 함께 표시).
+
+사용법:
+    python scripts/haptic_motifs.py --all                       # 트랙별 압축률 보고 + 저장
+    python scripts/haptic_motifs.py assets/haptic_patterns/sleep_01.json --dry-run
+
+    from haptic_motifs import compress_pattern, expand_pattern
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from haptic_codec import PATTERN_DIR
+
+MOTIF_DIR = PATTERN_DIR / 'motifs'
+DEFAULT_BPM = 120
+BEATS_PER_BAR = 4
+
+_EVENT_KEYS = ('time', 'note', 'velocity')
+_REPEAT_KEYS = ('repeat', 'interval')
+
+
+def _bar_groups(events: List[Dict], bpm: float) -> List[List[Dict]]:
+    """이벤트를 마디 번호(time // 마디 길이) 가 같은 연속 묶음으로 나누기"""
+    bar_ms = BEATS_PER_BAR * 60_000 / (bpm or DEFAULT_BPM)
+    groups: List[List[Dict]] = []
+    current_bar = None
+    for event in events:
+        bar = int(event['time'] // bar_ms)
+        if bar != current_bar:
+            groups.append([])
+            current_bar = bar
+        groups[-1].append(event)
+    return groups
+
+
+def _motif_key(group: List[Dict]) -> Tuple:
+    """묶음 -> 첫 이벤트 기준 상대 시간 (dt, note, velocity(, repeat, interval)) 튜플"""
+    start = group[0]['time']
+    key = []
+    for event in group:
+        keys = tuple(event)
+        if keys not in (_EVENT_KEYS, _EVENT_KEYS + _REPEAT_KEYS):
+            raise ValueError(f"지원하지 않는 이벤트 키: {list(keys)}")
+        key.append((event['time'] - start,) + tuple(event[k] for k in keys[1:]))
+    return tuple(key)
+
+
+def compress_pattern(data: Dict) -> Dict:
+    """햅틱 패턴 dict -> 모티프 + 등장 목록 dict"""
+    motif_ids: Dict[Tuple, int] = {}
+    occurrences: List[List[int]] = []
+
+    for group in _bar_groups(data['events'], data.get('bpm')):
+        start = group[0]['time']
+        motif_id = motif_ids.setdefault(_motif_key(group), len(motif_ids))
+
+        if occurrences and occurrences[-1][1] == motif_id:
+            last = occurrences[-1]
+            if len(last) == 2 and start > last[0]:
+                last.extend([2, start - last[0]])
+                continue
+            if len(last) == 4 and start == last[0] + last[2] * last[3]:
+                last[2] += 1
+                continue
+        occurrences.append([start, motif_id])
+
+    # events 자리에 motifs / occurrences 를 두어 펼칠 때 키 순서가 유지되도록 함
+    compressed = {}
+    for key, value in data.items():
+        if key == 'events':
+            compressed['motifs'] = [[list(element) for element in motif] for motif in motif_ids]
+            compressed['occurrences'] = occurrences
+        else:
+            compressed[key] = value
+    return compressed
+
+
+def expand_pattern(compressed: Dict) -> Dict:
+    """모티프 + 등장 목록 dict -> 원래 햅틱 패턴 dict (키 순서 포함 동일)"""
+    motifs = [
+        [dict(zip(_EVENT_KEYS + _REPEAT_KEYS, element)) for element in motif]
+        for motif in compressed['motifs']
+    ]
+
+    events = []
+    for occurrence in compressed['occurrences']:
+        start, motif_id = occurrence[0], occurrence[1]
+        count, period = (occurrence[2], occurrence[3]) if len(occurrence) == 4 else (1, 0)
+        for k in range(count):
+            base = start + k * period
+            for element in motifs[motif_id]:
+                event = dict(element)
+                event['time'] += base
+                events.append(event)
+
+    data = {}
+    for key, value in compressed.items():
+        if key == 'motifs':
+            data['events'] = events
+        elif key != 'occurrences':
+            data[key] = value
+    return data
+
+
+def _dumps(data: Dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _best_of(func, repeat: int = 20) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compression_report(json_path: Path, compressed: Dict) -> Dict:
+    """트랙 하나의 압축률 / 파싱 시간 비교 (원본 파일, 같은 구분자의 compact JSON 기준)"""
+    original_text = json_path.read_text(encoding='utf-8')
+    original = json.loads(original_text)
+    compact_text = _dumps(original)
+    compressed_text = _dumps(compressed)
+
+    events = len(original['events'])
+    elements = sum(len(motif) for motif in compressed['motifs'])
+    return {
+        'track_id': original.get('track_id', json_path.stem),
+        'events': events,
+        'motifs': len(compressed['motifs']),
+        'motif_events': elements,
+        'occurrences': len(compressed['occurrences']),
+        'file_bytes': len(original_text.encode('utf-8')),
+        'compact_bytes': len(compact_text.encode('utf-8')),
+        'motif_bytes': len(compressed_text.encode('utf-8')),
+        'parse_s': _best_of(lambda: json.loads(original_text)),
+        'motif_parse_s': _best_of(lambda: json.loads(compressed_text)),
+        'expand_s': _best_of(lambda: expand_pattern(json.loads(compressed_text))),
+    }
+
+
+def print_report(report: Dict):
+    compact_ratio = report['motif_bytes'] / report['compact_bytes'] if report['compact_bytes'] else 0
+    file_ratio = report['motif_bytes'] / report['file_bytes'] if report['file_bytes'] else 0
+    print(f"📁 {report['track_id']}: 이벤트 {report['events']}개 -> 모티프 {report['motifs']}개 "
+          f"(원소 {report['motif_events']}개), 등장 {report['occurrences']}개")
+    print(f"   💾 compact JSON {report['compact_bytes']:,} -> {report['motif_bytes']:,} bytes "
+          f"({compact_ratio:.1%}, indent=2 파일 {report['file_bytes']:,} bytes 대비 {file_ratio:.1%})")
+    slowdown = report['expand_s'] / report['parse_s'] if report['parse_s'] else 0
+    print(f"   ⏱️  로드 {report['parse_s'] * 1000:.3f} ms -> 파싱 + 펼치기 {report['expand_s'] * 1000:.3f} ms "
+          f"(x{slowdown:.1f}, 파싱만 {report['motif_parse_s'] * 1000:.3f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='반복 마디 기반 햅틱 패턴 압축 + 트랙별 압축률 보고')
+    parser.add_argument('files', nargs='*', type=Path, help='패턴 JSON 파일')
+    parser.add_argument('--all', '-a', action='store_true', help='assets/haptic_patterns 의 모든 패턴')
+    parser.add_argument('--output-dir', '-o', type=Path, default=MOTIF_DIR, help='출력 디렉토리')
+    parser.add_argument('--dry-run', '-n', action='store_true', help='저장 없이 압축률만 보고')
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.all:
+        files.extend(sorted(PATTERN_DIR.glob('*.json')))
+    if not files:
+        parser.error('패턴 파일 또는 --all 이 필요합니다')
+
+    if not args.dry_run:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    totals = {'compact_bytes': 0, 'motif_bytes': 0, 'parse_s': 0.0, 'expand_s': 0.0}
+    for json_path in files:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        compressed = compress_pattern(data)
+        expanded = expand_pattern(compressed)
+        if expanded != data or list(expanded) != list(data):
+            raise ValueError(f"{json_path.name}: 펼친 결과가 원본과 다릅니다")
+
+        report = compression_report(json_path, compressed)
+        print_report(report)
+        for key in totals:
+            totals[key] += report[key]
+
+        if not args.dry_run:
+            with open(args.output_dir / json_path.name, 'w', encoding='utf-8') as f:
+                f.write(_dumps(compressed))
+
+    ratio = totals['motif_bytes'] / totals['compact_bytes'] if totals['compact_bytes'] else 0
+    print(f"\n✅ {len(files)}개 패턴 압축 (왕복 검증 완료): compact JSON "
+          f"{totals['compact_bytes']:,} -> {totals['motif_bytes']:,} bytes ({ratio:.1%})")
+    print(f"   ⏱️  로드 시간 합계 {totals['parse_s'] * 1000:.2f} ms -> "
+          f"{totals['expand_s'] * 1000:.2f} ms (파싱 + 펼치기)")
+    if not args.dry_run:
+        print(f"출력 경로: {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+햅틱 프로파일 파이프라인 - MIDI 한 번 로드로 여러 프로파일 패턴 생성
+
+필터 단계(stage)를 조합한 이름 있는 프로파일(HAPTIC_PROFILES)을 정의하고,
+MIDI 파일마다 이벤트 배열 / 템포 맵 / note_on 시각을 한 번만 만든 뒤
+그 파일을 쓰는 모든 프로파일을 평가하여 각각의 JSON(+.hpat)을 저장합니다.
+
+단계 종류:
+    instruments     대상 악기 (GM 이름 또는 프로그램 번호 목록)
+    register        노트 범위 (low, high) 양끝 포함
+    velocity_floor  최소 velocity
+    dedupe          직전에 남긴 이벤트와 N ms 이내인 이벤트 제거 (시간순 정렬 후 적용)
+
+generate_all_haptic_patterns.py (저음역, 전체 트랙) 와 generate_haptic_patterns.py
+(악기 지정 heartbeat/purr) 의 추출도 이 단계들로 구성됩니다.
+
+사용법:
+    python scripts/haptic_profiles.py                      # 모든 프로파일 생성
+    python scripts/haptic_profiles.py --profiles heartbeat purr
+    python scripts/haptic_profiles.py --list
+    python scripts/haptic_profiles.py --envelope           # 노트 길이 기반 진폭 엔벨로프(.henv)도 생성
+
+    from haptic_profiles import extract_profile_events
+    result = extract_profile_events(midi_path, [('register', LOW_NOTE_RANGE), ('dedupe', 100)])
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from catalog import PROJECT_ROOT, SOUND_DIR, TRACK_MAPPING, is_cat_track, load_catalog_index
+from haptic_codec import PATTERN_DIR, write_haptic_binary
+from haptic_envelope import (DEFAULT_RATE_HZ, ENVELOPE_SUFFIX, encode_envelope, envelope_stats,
+                             pair_notes, render_envelope)
+from haptic_simplify import compute_stats
+from midi_analysis import (LOW_NOTE_RANGE, analyze_midi, load_events, note_on_mask, program_mask,
+                           register_mask)
+from tempo_map import TempoMap
+
+PROFILE_DIR = PATTERN_DIR / 'profiles'
+
+# General MIDI 악기 매핑 (instruments 단계에서 이름 -> 프로그램 번호)
+GM_INSTRUMENTS = {
+    0: "Acoustic Grand Piano", 42: "Cello", 43: "Contrabass",
+    32: "Acoustic Bass", 33: "Electric Bass (finger)", 34: "Electric Bass (pick)",
+}
+
+# 악기 지정 햅틱 대상 트랙 설정 (generate_haptic_patterns.py)
+HAPTIC_TRACKS = {
+    'sleep_03': {
+        'title': '깊은 밤의 꿈',
+        'pattern': 'heartbeat',
+        'target_instruments': ['Cello', 'Contrabass'],
+    },
+    'separation_01': {
+        'title': '묵직한 위로',
+        'pattern': 'heartbeat',
+        'target_instruments': ['Cello', 'Contrabass'],
+    },
+    'senior_02': {
+        'title': '깊은 안정',
+        'pattern': 'purr',
+        'target_instruments': ['Contrabass', 'Cello'],
+    },
+}
+
+Stage = Tuple[str, object]
+
+
+def track_stages(config: Dict) -> List[Stage]:
+    """HAPTIC_TRACKS 설정 -> 단계 목록 (저음역 + 대상 악기, 중복 제거 없음)"""
+    return [('register', LOW_NOTE_RANGE), ('instruments', config['target_instruments'])]
+
+
+def _pattern_profile(pattern: str) -> Dict:
+    # 같은 패턴이라도 트랙마다 target_instruments 가 다르므로 단계는 트랙별로 둠
+    per_track = {track_id: track_stages(config)
+                 for track_id, config in HAPTIC_TRACKS.items() if config['pattern'] == pattern}
+    return {
+        'description': f"악기 지정 {pattern} (generate_haptic_patterns.py 와 동일)",
+        'stages': None,
+        'track_stages': per_track,
+        'source': 'orchestrated',
+        'tracks': list(per_track),
+        'pattern': pattern,
+        'output_dir': PROFILE_DIR / pattern,
+    }
+
+
+def profile_stages(profile: Dict, track_id: str) -> List[Stage]:
+    """트랙에 적용할 단계 (track_stages 가 있으면 트랙별 단계, 없으면 공통 stages)"""
+    per_track = profile.get('track_stages')
+    return per_track[track_id] if per_track else profile['stages']
+
+
+# 이름 있는 프로파일
+#   source:  'midi' = 강아지 트랙은 평면 MIDI, 고양이 트랙은 Orchestrated / 'orchestrated' = 항상 Orchestrated
+#   tracks:  대상 트랙 ID 목록 (None = 카탈로그 전체)
+#   pattern: 지정하면 title / pattern 키가 들어간 형식으로 저장
+#   track_stages: 트랙 ID -> 단계 목록 (있으면 stages 대신 사용)
+HAPTIC_PROFILES = {
+    'low_register': {
+        'description': '저음역 전체 악기 + 100ms 중복 제거 (generate_all_haptic_patterns.py 와 동일)',
+        'stages': [('register', LOW_NOTE_RANGE), ('dedupe', 100)],
+        'source': 'midi',
+        'tracks': None,
+        'pattern': None,
+        # 배포용 assets/haptic_patterns/*.json 은 generate_all_haptic_patterns.py 가 관리하므로 따로 저장
+        'output_dir': PROFILE_DIR / 'low_register',
+    },
+    'heartbeat': _pattern_profile('heartbeat'),
+    'purr': _pattern_profile('purr'),
+    'accent': {
+        'description': '강한 저음만 (velocity 80 이상) + 250ms 중복 제거',
+        'stages': [('register', LOW_NOTE_RANGE), ('velocity_floor', 80), ('dedupe', 250)],
+        'source': 'midi',
+        'tracks': None,
+        'pattern': None,
+        'output_dir': PROFILE_DIR / 'accent',
+    },
+}
+
+
+def _instrument_programs(instruments: Sequence) -> List[int]:
+    """GM 이름 또는 프로그램 번호 목록 -> 프로그램 번호 목록"""
+    names = set(name for name in instruments if isinstance(name, str))
+    programs = [program for program, name in GM_INSTRUMENTS.items() if name in names]
+    programs.extend(program for program in instruments if isinstance(program, int))
+    return programs
+
+
+# 이벤트 배열에 AND 로 적용되는 마스크 단계
+MASK_STAGES = {
+    'instruments': lambda events, arg: program_mask(events, _instrument_programs(arg)),
+    'register': lambda events, arg: register_mask(events, arg[0], arg[1]),
+    'velocity_floor': lambda events, arg: events['velocity'] >= arg,
+}
+
+
+def select_spaced_indices(times_ms: np.ndarray, min_gap_ms: int) -> np.ndarray:
+    """오름차순 시간 배열에서 직전에 남긴 이벤트와 min_gap_ms 이상 떨어진 이벤트 인덱스 선택
+
+    각 이벤트의 '다음 후보' 위치를 searchsorted 로 한 번에 구해 두고,
+    남기는 이벤트 수만큼만 포인터를 따라가므로 촘촘한 곡에서도 빠릅니다.
+    """
+    if len(times_ms) == 0:
+        return np.empty(0, dtype=np.int64)
+    next_idx = np.searchsorted(times_ms, times_ms + min_gap_ms, side='left').tolist()
+
+    kept = []
+    count = len(next_idx)
+    i = 0
+    while i < count:
+        kept.append(i)
+        i = next_idx[i]
+    return np.asarray(kept, dtype=np.int64)
+
+
+# 시간순 정렬된 결과에 순서대로 적용되는 단계 (남길 인덱스 반환)
+SEQUENCE_STAGES = {
+    'dedupe': select_spaced_indices,
+}
+
+
+class _NoteSource:
+    """MIDI 파일 하나의 note_on 이벤트와 시각 (프로파일 간 공유)"""
+
+    def __init__(self, midi_path: Path):
+        facets = analyze_midi(midi_path)
+        self.tempo_map = TempoMap.from_facets(facets)
+        self.length_ms = self.tempo_map.tick_to_ms(facets['length_ticks'])
+        self.events = load_events(midi_path)
+        self.notes = self.events[note_on_mask(self.events)]
+        self.times_ms = self.tempo_map.ticks_to_ms(self.notes['tick'])
+        self._spans = None
+
+    def _mask(self, events: np.ndarray, stages: Sequence[Stage]) -> np.ndarray:
+        mask = np.ones(len(events), dtype=bool)
+        for name, arg in stages:
+            if name in MASK_STAGES:
+                mask &= MASK_STAGES[name](events, arg)
+            elif name not in SEQUENCE_STAGES:
+                raise ValueError(f"알 수 없는 단계: {name}")
+        return mask
+
+    def envelope(self, stages: Sequence[Stage], rate_hz: int = DEFAULT_RATE_HZ) -> Tuple[np.ndarray, int]:
+        """마스크 단계를 통과한 노트의 진폭 엔벨로프 -> (uint8 배열, 노트 수)
+
+        dedupe 같은 순서 단계는 단발 이벤트용이므로 적용하지 않습니다.
+        """
+        if self._spans is None:
+            rows, end_ticks = pair_notes(self.events)
+            end_ms = np.where(end_ticks >= 0, self.tempo_map.ticks_to_ms(np.maximum(end_ticks, 0)), -1)
+            self._spans = (self.events[rows], self.tempo_map.ticks_to_ms(self.events['tick'][rows]), end_ms)
+
+        notes, start_ms, end_ms = self._spans
+        mask = self._mask(notes, stages)
+        amplitude = render_envelope(start_ms[mask], end_ms[mask], notes['velocity'][mask],
+                                    rate_hz, self.length_ms)
+        return amplitude, int(mask.sum())
+
+    def run(self, stages: Sequence[Stage]) -> Dict:
+        """단계 적용 -> {'bpm', 'events'} (같은 시각이면 트랙 순서 유지)"""
+        index = np.flatnonzero(self._mask(self.notes, stages))
+        times_ms = self.times_ms[index]
+        order = np.argsort(times_ms, kind='stable')
+        index, times_ms = index[order], times_ms[order]
+
+        for name, arg in stages:
+            if name in SEQUENCE_STAGES:
+                keep = SEQUENCE_STAGES[name](times_ms, arg)
+                index, times_ms = index[keep], times_ms[keep]
+
+        events = [
+            {
+                'time': time_ms,
+                'note': note,
+                'velocity': velocity,
+            }
+            for time_ms, note, velocity in zip(times_ms.tolist(), self.notes['note'][index].tolist(),
+                                               self.notes['velocity'][index].tolist())
+        ]
+        return {'bpm': self.tempo_map.initial_bpm, 'events': events}
+
+
+def extract_profile_events(midi_path: Path, stages: Sequence[Stage]) -> Dict:
+    """MIDI 하나에 단계 목록 적용 -> {'bpm', 'events'}"""
+    return _NoteSource(midi_path).run(stages)
+
+
+def build_pattern_json(track_id: str, profile: Dict, result: Dict) -> Dict:
+    """프로파일 형식에 맞춘 패턴 JSON dict"""
+    stats = compute_stats(result['events'])
+    if profile['pattern'] is None:
+        return {
+            'track_id': track_id,
+            'haptic_enabled': True,
+            'bpm': result['bpm'],
+            'events': result['events'],
+            'stats': stats,
+        }
+    return {
+        'track_id': track_id,
+        'title': HAPTIC_TRACKS[track_id]['title'],
+        'haptic_enabled': True,
+        'pattern': profile['pattern'],
+        'bpm': result['bpm'],
+        'events': result['events'],
+        'stats': stats,
+    }
+
+
+def _resolve_source(entry: Dict, key: str, source: str):
+    if source == 'orchestrated' or is_cat_track(key):
+        return entry['orchestrated']
+    return entry['midi']
+
+
+def plan_sources(index, profile_names: Sequence[str]) -> Dict[Path, List[Tuple[str, str]]]:
+    """소스 MIDI -> [(프로파일 이름, 트랙 ID)] (카탈로그 순서)"""
+    plan: Dict[Path, List[Tuple[str, str]]] = {}
+    for key, (track_id, _) in TRACK_MAPPING.items():
+        entry = index.get(key)
+        if not entry:
+            continue
+        for name in profile_names:
+            profile = HAPTIC_PROFILES[name]
+            if profile['tracks'] is not None and track_id not in profile['tracks']:
+                continue
+            source = _resolve_source(entry, key, profile['source'])
+            if source:
+                plan.setdefault(source, []).append((name, track_id))
+    return plan
+
+
+def emit_profiles(task: Tuple[Path, List[Tuple[str, str]], int]) -> List[Dict]:
+    """소스 MIDI 하나를 한 번 로드하여 대상 프로파일 패턴을 모두 저장 (워커 프로세스에서 실행)
+
+    envelope_rate 가 0 보다 크면 같은 로드에서 진폭 엔벨로프(.henv)도 저장합니다.
+    """
+    midi_path, targets, envelope_rate = task
+    source = _NoteSource(midi_path)
+
+    written = []
+    for name, track_id in targets:
+        profile = HAPTIC_PROFILES[name]
+        stages = profile_stages(profile, track_id)
+        result = source.run(stages)
+        summary = {'profile': name, 'track_id': track_id, 'source': str(midi_path),
+                   'events': len(result['events'])}
+        if result['events']:
+            json_data = build_pattern_json(track_id, profile, result)
+            output_dir = profile['output_dir']
+            output_dir.mkdir(parents=True, exist_ok=True)
+            output_file = output_dir / f"{track_id}.json"
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            write_haptic_binary(output_file, json_data)
+            summary['file'] = str(output_file.relative_to(PROJECT_ROOT))
+
+            if envelope_rate > 0:
+                amplitude, note_count = source.envelope(stages, envelope_rate)
+                meta = {
+                    'track_id': track_id,
+                    'profile': name,
+                    'bpm': result['bpm'],
+                    'stats': envelope_stats(amplitude, envelope_rate, note_count),
+                }
+                envelope_bytes = encode_envelope(amplitude, envelope_rate, meta)
+                output_file.with_suffix(ENVELOPE_SUFFIX).write_bytes(envelope_bytes)
+                summary['envelope_bytes'] = len(envelope_bytes)
+        written.append(summary)
+    return written
+
+
+def run_profiles(profile_names: Sequence[str], jobs: int = 1, envelope_rate: int = 0) -> List[Dict]:
+    """선택한 프로파일 전체 생성 -> 패턴별 요약 목록"""
+    plan = [(source, targets, envelope_rate)
+            for source, targets in plan_sources(load_catalog_index(SOUND_DIR), profile_names).items()]
+    if jobs <= 1 or len(plan) <= 1:
+        groups = [emit_profiles(task) for task in plan]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            groups = list(executor.map(emit_profiles, plan, chunksize=max(1, len(plan) // (jobs * 4))))
+    return [summary for group in groups for summary in group]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 햅틱 프로파일을 MIDI 한 번 로드로 생성')
+    parser.add_argument('--profiles', '-p', nargs='+', choices=list(HAPTIC_PROFILES),
+                        default=list(HAPTIC_PROFILES), help='생성할 프로파일 (기본: 전체)')
+    parser.add_argument('--jobs', '-j', type=int, default=0, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--list', '-l', action='store_true', help='프로파일 목록 출력')
+    parser.add_argument('--envelope', '-e', action='store_true',
+                        help='노트 길이 기반 진폭 엔벨로프(.henv)도 생성')
+    parser.add_argument('--rate', type=int, default=DEFAULT_RATE_HZ, help='엔벨로프 샘플레이트 Hz (기본 50)')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, profile in HAPTIC_PROFILES.items():
+            print(f"🎛️  {name}: {profile['description']}")
+            for label, stages in (profile.get('track_stages') or {'단계': profile['stages']}).items():
+                print(f"     {label}: {', '.join(f'{stage}={arg}' for stage, arg in stages)}")
+            print(f"     출력: {profile['output_dir'].relative_to(PROJECT_ROOT)}")
+        return
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    print(f"🎵 햅틱 프로파일 생성: {', '.join(args.profiles)}\n")
+    summaries = run_profiles(args.profiles, jobs, args.rate if args.envelope else 0)
+
+    for name in args.profiles:
+        rows = [s for s in summaries if s['profile'] == name]
+        written = [s for s in rows if 'file' in s]
+        events = sum(s['events'] for s in written)
+        print(f"🎛️  {name}: {len(written)}개 패턴, 이벤트 {events:,}개"
+              + (f" (조건에 맞는 노트 없음 {len(rows) - len(written)}곡)" if len(rows) > len(written) else ""))
+        if args.envelope and written:
+            envelope_bytes = sum(s['envelope_bytes'] for s in written)
+            print(f"     엔벨로프: {args.rate}Hz, {envelope_bytes:,} bytes (패턴당 평균 {envelope_bytes // len(written):,})")
+        print(f"     출력: {HAPTIC_PROFILES[name]['output_dir'].relative_to(PROJECT_ROOT)}")
+
+    sources = len({s['source'] for s in summaries})
+    print(f"\n✅ 완료! 프로파일 패턴 {len(summaries)}개를 소스 MIDI {sources}개에서 생성 (파일당 1회 로드)")
+
+
+if __name__ == '__main__':
+    main()
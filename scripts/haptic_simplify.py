@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+햅틱 패턴 단순화 엔진 - 초당 이벤트 수 / 파일 크기 예산 적용
+
+extract_haptic_events 결과(또는 저장된 패턴 JSON)에 후처리 단계를 순서대로 적용합니다.
+    1. quantize   velocity 를 N 단계로 양자화 (이후 반복 병합이 잘 되도록)
+    2. rate       1초 구간마다 최대 N 개만 남김 (velocity 가 큰 이벤트 우선)
+    3. merge      노트/velocity 가 거의 같고 간격이 일정한 연속 이벤트를
+                  repeat(횟수) / interval(간격 ms) 를 가진 이벤트 하나로 병합
+                  (.hpat 는 반복 이벤트마다 8바이트를 더 쓰므로 MERGE_MIN_REPEAT 회 미만의
+                  짧은 반복은 합치지 않고, 그래도 .hpat 가 커지면 이 단계를 건너뜀)
+
+단계마다 전후 이벤트 수와 파일 크기(JSON indent=2 / .hpat)를 리포트하며,
+패턴 타입(heartbeat, purr)별 예산(PATTERN_BUDGETS)을 넘으면 위반으로 표시합니다.
+
+앱 플레이어(lib/app/data/services/haptic_pattern_player.dart)는 repeat/interval 을 모르고
+이벤트마다 한 번만 진동하므로, 단순화 결과는 배포용 assets/haptic_patterns/*.json 을
+덮어쓰지 않고 별도 디렉토리(기본 SIMPLIFIED_DIR, 번들되지 않는 하위 디렉토리)에 저장합니다.
+
+사용법:
+    python scripts/haptic_simplify.py assets/haptic_patterns/senior_02.json --pattern purr
+    python scripts/haptic_simplify.py --all                       # 모든 패턴 리포트
+    python scripts/haptic_simplify.py --all --save                # SIMPLIFIED_DIR 에 저장
+    python scripts/haptic_simplify.py --all --output-dir /tmp/simplified
+
+    from haptic_simplify import simplify_pattern, check_budget
+    simplified, report = simplify_pattern(json_data, PATTERN_BUDGETS['heartbeat'])
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from haptic_codec import PATTERN_DIR, encode_haptic, write_haptic_binary
+
+# 단순화된 패턴 저장 위치 (앱이 번들/재생하지 않음)
+SIMPLIFIED_DIR = PATTERN_DIR / 'simplified'
+
+# 패턴 타입별 단계 설정과 예산 (None = 해당 단계/제한 없음)
+PATTERN_BUDGETS = {
+    'heartbeat': {
+        'velocity_levels': 8,
+        'max_events_per_sec': 4,      # 심장 박동(lub-dub) 2회 x 최대 120 BPM
+        'merge_jitter_ms': 15,
+        'max_events': 1200,
+        'max_json_bytes': 96_000,
+        'max_hpat_bytes': 8_000,
+    },
+    'purr': {
+        'velocity_levels': 4,
+        'max_events_per_sec': 10,
+        'merge_jitter_ms': 25,
+        'max_events': 2500,
+        'max_json_bytes': 160_000,
+        'max_hpat_bytes': 16_000,
+    },
+    'default': {
+        'velocity_levels': 16,
+        'max_events_per_sec': 6,
+        'merge_jitter_ms': 10,
+        'max_events': 2000,
+        'max_json_bytes': 128_000,
+        'max_hpat_bytes': 12_000,
+    },
+}
+
+# 반복 병합 시 같은 이벤트로 볼 노트 / velocity 차이
+MERGE_NOTE_TOLERANCE = 0
+MERGE_VELOCITY_TOLERANCE = 0
+# 병합할 최소 반복 횟수: 2회 반복은 이벤트 하나(최대 6바이트)를 줄이고 반복 항목(8바이트)을 더해 .hpat 가 커짐
+MERGE_MIN_REPEAT = 3
+
+_MAX_U16 = 0xFFFF
+
+
+def events_to_columns(events: List[Dict]) -> Dict[str, np.ndarray]:
+    """이벤트 dict 목록 -> 열 배열 (repeat 없는 이벤트는 repeat=1, interval=0)"""
+    return {
+        'time': np.array([e['time'] for e in events], dtype=np.int64),
+        'note': np.array([e['note'] for e in events], dtype=np.int64),
+        'velocity': np.array([e['velocity'] for e in events], dtype=np.int64),
+        'repeat': np.array([e.get('repeat', 1) for e in events], dtype=np.int64),
+        'interval': np.array([e.get('interval', 0) for e in events], dtype=np.int64),
+    }
+
+
+def columns_to_events(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """열 배열 -> 이벤트 dict 목록 (repeat 가 2 이상일 때만 repeat/interval 키 추가)"""
+    events = []
+    for time_ms, note, velocity, repeat, interval in zip(
+            *(columns[key].tolist() for key in ('time', 'note', 'velocity', 'repeat', 'interval'))):
+        event = {'time': time_ms, 'note': note, 'velocity': velocity}
+        if repeat > 1:
+            event['repeat'] = repeat
+            event['interval'] = interval
+        events.append(event)
+    return events
+
+
+def _take(columns: Dict[str, np.ndarray], index: np.ndarray) -> Dict[str, np.ndarray]:
+    return {key: column[index] for key, column in columns.items()}
+
+
+def quantize_velocity(columns: Dict[str, np.ndarray], levels: int) -> Dict[str, np.ndarray]:
+    """velocity(1~127)를 levels 단계의 대표값으로 올림 양자화 (0 이 되지 않음)"""
+    step = np.ceil(columns['velocity'] * levels / 127).clip(1, levels)
+    quantized = dict(columns)
+    quantized['velocity'] = (step * 127 // levels).astype(np.int64)
+    return quantized
+
+
+def limit_rate(columns: Dict[str, np.ndarray], max_per_sec: int) -> Dict[str, np.ndarray]:
+    """1초 구간(time // 1000)마다 velocity 가 큰 순으로 최대 max_per_sec 개만 남김
+
+    같은 velocity 면 이른 이벤트가 우선이며, 결과는 다시 시간순입니다.
+    """
+    count = len(columns['time'])
+    if count == 0:
+        return columns
+    bucket = columns['time'] // 1000
+    order = np.lexsort((np.arange(count), -columns['velocity'], bucket))
+
+    # 구간 안에서의 순위 = 정렬 위치 - 구간 시작 위치
+    sorted_bucket = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    rank = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+
+    keep = np.sort(order[rank < max_per_sec])
+    return _take(columns, keep)
+
+
+def merge_repeats(columns: Dict[str, np.ndarray], jitter_ms: int,
+                  note_tolerance: int = MERGE_NOTE_TOLERANCE,
+                  velocity_tolerance: int = MERGE_VELOCITY_TOLERANCE,
+                  min_repeat: int = 2) -> Dict[str, np.ndarray]:
+    """간격이 일정한 연속 반복 이벤트를 첫 이벤트 하나(repeat, interval)로 병합
+
+    반복의 첫 간격을 기준으로, 이후 간격이 jitter_ms 이내로 같고 노트/velocity 차이가
+    허용 범위 안인 동안 같은 반복으로 봅니다. 이미 병합된 이벤트는 다시 합치지 않으며,
+    min_repeat 회보다 짧은 반복은 개별 이벤트로 둡니다.
+    .hpat 의 u16 repeat 열에 맞도록 반복 하나는 최대 65535 회이며, 더 긴 반복은 나눠 병합합니다.
+    """
+    count = len(columns['time'])
+    if count < 2:
+        return columns
+
+    # 이웃 이벤트와 '같은 이벤트' 여부 (i 와 i+1)
+    times = columns['time']
+    gaps = np.diff(times)
+    similar = ((np.abs(np.diff(columns['note'])) <= note_tolerance)
+               & (np.abs(np.diff(columns['velocity'])) <= velocity_tolerance)
+               & (columns['repeat'][:-1] == 1) & (columns['repeat'][1:] == 1)
+               & (gaps > 0) & (gaps <= _MAX_U16)).tolist()
+    gaps = gaps.tolist()
+
+    heads = []
+    repeats = []
+    intervals = []
+    i = 0
+    while i < count:
+        j = i
+        if i < count - 1 and similar[i]:
+            first_gap = gaps[i]
+            j = i + 1
+            while (j < count - 1 and similar[j] and abs(gaps[j] - first_gap) <= jitter_ms
+                   and j - i + 1 < _MAX_U16):
+                j += 1
+        if 0 < j - i + 1 < min_repeat:
+            j = i
+        heads.append(i)
+        if j > i:
+            repeats.append(j - i + 1)
+            intervals.append(round((times[j] - times[i]) / (j - i)))
+        else:
+            repeats.append(int(columns['repeat'][i]))
+            intervals.append(int(columns['interval'][i]))
+        i = j + 1
+
+    merged = _take(columns, np.asarray(heads, dtype=np.int64))
+    merged['repeat'] = np.asarray(repeats, dtype=np.int64)
+    merged['interval'] = np.asarray(intervals, dtype=np.int64)
+    return merged
+
+
+def compute_stats(events: List[Dict]) -> Dict:
+    """패턴 stats (generate_all_haptic_patterns.save_haptic_json 과 같은 항목)"""
+    velocities = [e['velocity'] for e in events]
+    notes = [e['note'] for e in events]
+    last = events[-1] if events else None
+    return {
+        'total_events': len(events),
+        'duration_ms': (last['time'] + (last.get('repeat', 1) - 1) * last.get('interval', 0)) if last else 0,
+        'avg_velocity': round(sum(velocities) / len(velocities)) if velocities else 0,
+        'note_range': f"{min(notes)}-{max(notes)}" if notes else "N/A",
+    }
+
+
+def pattern_sizes(data: Dict) -> Tuple[int, int]:
+    """(JSON indent=2 바이트, .hpat 바이트)"""
+    json_bytes = len(json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'))
+    return json_bytes, len(encode_haptic(data))
+
+
+def _with_columns(data: Dict, columns: Dict[str, np.ndarray]) -> Dict:
+    events = columns_to_events(columns)
+    result = dict(data)
+    result['events'] = events
+    if 'stats' in data:
+        result['stats'] = compute_stats(events)
+    return result
+
+
+def simplify_pattern(data: Dict, budget: Dict) -> Tuple[Dict, List[Dict]]:
+    """패턴 dict 에 단계별 단순화 적용 -> (단순화된 패턴, 단계별 리포트)"""
+    stages = [
+        ('quantize', budget.get('velocity_levels'),
+         lambda columns, value: quantize_velocity(columns, value)),
+        ('rate', budget.get('max_events_per_sec'),
+         lambda columns, value: limit_rate(columns, value)),
+        ('merge', budget.get('merge_jitter_ms'),
+         lambda columns, value: merge_repeats(columns, value, min_repeat=MERGE_MIN_REPEAT)),
+    ]
+
+    columns = events_to_columns(data['events'])
+    current = data
+    sizes = pattern_sizes(current)
+    report = []
+
+    for name, value, stage in stages:
+        if value is None:
+            continue
+        staged = stage(columns, value)
+        simplified = _with_columns(data, staged)
+        new_sizes = pattern_sizes(simplified)
+        skipped = name == 'merge' and new_sizes[1] > sizes[1]
+        if skipped:
+            # 반복 항목이 줄인 이벤트보다 커서 .hpat 가 늘어남 -> 병합하지 않음
+            simplified, new_sizes = current, sizes
+        else:
+            columns = staged
+        report.append({
+            'stage': name,
+            'setting': value,
+            'skipped': skipped,
+            'events_before': len(current['events']),
+            'events_after': len(simplified['events']),
+            'json_before': sizes[0],
+            'json_after': new_sizes[0],
+            'hpat_before': sizes[1],
+            'hpat_after': new_sizes[1],
+        })
+        current, sizes = simplified, new_sizes
+
+    return current, report
+
+
+def check_budget(data: Dict, budget: Dict) -> List[str]:
+    """예산 위반 항목 목록 (비어 있으면 통과)"""
+    json_bytes, hpat_bytes = pattern_sizes(data)
+    checks = [
+        ('max_events', len(data['events']), '이벤트 수'),
+        ('max_json_bytes', json_bytes, 'JSON 크기'),
+        ('max_hpat_bytes', hpat_bytes, '.hpat 크기'),
+    ]
+    violations = []
+    for key, actual, label in checks:
+        limit = budget.get(key)
+        if limit is not None and actual > limit:
+            violations.append(f"{label} {actual:,} > {limit:,}")
+    return violations
+
+
+def budget_for(data: Dict, pattern: Optional[str] = None) -> Tuple[str, Dict]:
+    """패턴 타입 결정 (인자 > JSON 의 pattern 키 > default) -> (타입, 예산)"""
+    pattern = pattern or data.get('pattern') or 'default'
+    if pattern not in PATTERN_BUDGETS:
+        raise ValueError(f"알 수 없는 패턴 타입: {pattern}")
+    return pattern, PATTERN_BUDGETS[pattern]
+
+
+def print_report(report: List[Dict], violations: List[str]):
+    """단계별 전후 이벤트 수 / 크기와 예산 결과 출력"""
+    for entry in report:
+        print(f"   - {entry['stage']:8s} ({entry['setting']}): "
+              f"이벤트 {entry['events_before']:>5,} -> {entry['events_after']:>5,} | "
+              f"JSON {entry['json_before']:>8,} -> {entry['json_after']:>8,} B | "
+              f".hpat {entry['hpat_before']:>6,} -> {entry['hpat_after']:>6,} B"
+              + (" (건너뜀: .hpat 가 커짐)" if entry['skipped'] else ""))
+    if violations:
+        for violation in violations:
+            print(f"   ❌ 예산 초과: {violation}")
+    else:
+        print(f"   ✅ 예산 통과")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='햅틱 패턴 단순화 / 예산 검사')
+    parser.add_argument('files', nargs='*', type=Path, help='패턴 JSON 파일')
+    parser.add_argument('--all', '-a', action='store_true', help='assets/haptic_patterns 의 모든 패턴')
+    parser.add_argument('--pattern', '-p', choices=sorted(PATTERN_BUDGETS),
+                        help='패턴 타입 (기본: JSON 의 pattern 키, 없으면 default)')
+    parser.add_argument('--output-dir', '-o', type=Path, help='단순화된 JSON/.hpat 저장 디렉토리')
+    parser.add_argument('--save', action='store_true', help=f'{SIMPLIFIED_DIR.name}/ 에 저장 (--output-dir 기본값)')
+    args = parser.parse_args()
+    if args.save and not args.output_dir:
+        args.output_dir = SIMPLIFIED_DIR
+
+    files = list(args.files)
+    if args.all:
+        files.extend(sorted(PATTERN_DIR.glob('*.json')))
+    if not files:
+        parser.error('패턴 파일 또는 --all 이 필요합니다')
+
+    if args.output_dir:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    failed = 0
+    totals = {'before': 0, 'after': 0}
+    for json_path in files:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        pattern, budget = budget_for(data, args.pattern)
+        simplified, report = simplify_pattern(data, budget)
+        violations = check_budget(simplified, budget)
+        print(f"📁 {json_path.name} ({pattern})")
+        print_report(report, violations)
+
+        failed += bool(violations)
+        totals['before'] += len(data['events'])
+        totals['after'] += len(simplified['events'])
+
+        if args.output_dir:
+            output_file = args.output_dir / json_path.name
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(simplified, f, ensure_ascii=False, indent=2)
+            write_haptic_binary(output_file, simplified)
+
+    print(f"{'='*60}")
+    print(f"📊 {len(files)}개 패턴: 이벤트 {totals['before']:,} -> {totals['after']:,}")
+    if failed:
+        print(f"❌ 예산 초과 {failed}개")
+        sys.exit(1)
+    print("✅ 모든 패턴 예산 통과")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+MIDI 단일 패스 분석 엔진 + 디스크 캐시
+
+각 MIDI 파일을 한 번만 순회하여 분석 스크립트들이 필요로 하는 모든 정보
+(템포 맵, 트랙/채널별 프로그램, 노트 수, 메시지 타입 통계)를
+추출하고, 파일 내용 해시 + mtime 기반 캐시에 저장합니다.
+카탈로그가 변경되지 않았다면 재실행 시 MIDI를 다시 파싱하지 않습니다.
+
+같은 순회에서 채널 메시지를 컬럼형 NumPy 구조 배열(EVENT_DTYPE)로도 만들어
+캐시 옆에 .npy 로 저장하므로, 노트/음역/악기 필터를 불리언 마스크로 처리할 수 있습니다.
+
+사용법:
+    python scripts/midi_analysis.py            # 전체 MIDI 캐시 예열
+    python scripts/midi_analysis.py --clear    # 캐시 삭제
+
+    from midi_analysis import analyze_midi, load_events
+    facets = analyze_midi(path)
+    events = load_events(path)
+    low = events[note_on_mask(events) & register_mask(events, 36, 60)]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from mido import MidiFile
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
+CACHE_DIR = PROJECT_ROOT / '.cache' / 'midi_analysis'
+
+# 분석 결과 구조가 바뀌면 올려서 기존 캐시를 무효화
+ANALYSIS_VERSION = 2
+
+# 햅틱용 저음역 범위 (C2=36 ~ C4=60)
+LOW_NOTE_RANGE = (36, 60)
+
+# 채널 메시지 타입 코드 (EVENT_DTYPE 'type' 컬럼)
+EVENT_TYPES = ('note_off', 'note_on', 'polytouch', 'control_change',
+               'program_change', 'aftertouch', 'pitchwheel')
+EVENT_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+TYPE_NOTE_OFF = EVENT_TYPE_CODES['note_off']
+TYPE_NOTE_ON = EVENT_TYPE_CODES['note_on']
+TYPE_PROGRAM_CHANGE = EVENT_TYPE_CODES['program_change']
+
+# 파일당 이벤트 배열 한 행 = 채널 메시지 하나 (트랙 순서 -> 트랙 내 순서)
+#   note/velocity: 원본 데이터 바이트 (control_change 는 control/value,
+#                  program_change 는 program/0, pitchwheel 은 LSB/MSB)
+#   program: 해당 시점 채널의 활성 프로그램 (-1 = program_change 이전)
+EVENT_DTYPE = np.dtype([
+    ('tick', '<i8'),
+    ('track', '<u2'),
+    ('channel', 'u1'),
+    ('type', 'u1'),
+    ('note', 'u1'),
+    ('velocity', 'u1'),
+    ('program', '<i2'),
+])
+
+
+def file_sha1(filepath: Path) -> str:
+    """파일 내용 SHA-1 해시"""
+    h = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stamp_path(filepath: Path) -> Path:
+    """소스 경로별 스탬프 파일 (mtime, 크기, 내용 해시)"""
+    key = hashlib.sha1(str(filepath.resolve()).encode('utf-8')).hexdigest()
+    return CACHE_DIR / 'stamps' / f"{key}.json"
+
+
+def _object_path(content_hash: str) -> Path:
+    """내용 해시별 분석 결과 파일"""
+    return CACHE_DIR / 'objects' / f"{content_hash}.json"
+
+
+def _events_path(content_hash: str) -> Path:
+    """내용 해시별 이벤트 배열 파일"""
+    return CACHE_DIR / 'objects' / f"{content_hash}.v{ANALYSIS_VERSION}.events.npy"
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: Dict):
+    """임시 파일에 쓴 뒤 교체 (병렬 실행 시에도 깨진 캐시가 남지 않도록)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def _write_npy(path: Path, array: np.ndarray):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _assign_channel_programs(events: np.ndarray):
+    """각 이벤트의 program 컬럼을 채널별 활성 프로그램으로 채움 (tick 기준)"""
+    is_pc = events['type'] == TYPE_PROGRAM_CHANGE
+    for channel in np.unique(events['channel'][is_pc]):
+        pc = events[is_pc & (events['channel'] == channel)]
+        order = np.argsort(pc['tick'], kind='stable')
+        pc_ticks = pc['tick'][order]
+        pc_programs = pc['note'][order].astype(np.int16)
+
+        on_channel = events['channel'] == channel
+        idx = np.searchsorted(pc_ticks, events['tick'][on_channel], side='right') - 1
+        events['program'][on_channel] = np.where(idx >= 0, pc_programs[np.maximum(idx, 0)], -1)
+
+
+def _analyze(filepath: Path) -> Tuple[Dict, np.ndarray]:
+    """MIDI 파일을 한 번 순회하여 분석 정보와 이벤트 배열을 함께 추출"""
+    midi = MidiFile(filepath)
+    type_codes = EVENT_TYPE_CODES
+
+    tempo_changes = []
+    tracks = []
+    rows = []       # EVENT_DTYPE 행
+
+    for i, track in enumerate(midi.tracks):
+        current_time = 0
+        msg_types: Dict[str, int] = {}
+        program_changes = []
+        track_names = []
+        instrument_names = []
+        note_count = 0
+
+        for msg in track:
+            current_time += msg.time
+            msg_type = msg.type
+            msg_types[msg_type] = msg_types.get(msg_type, 0) + 1
+
+            code = type_codes.get(msg_type)
+            if code is not None:
+                rows.append((current_time, i, msg.channel, code) + _data_bytes(msg) + (-1,))
+
+            if msg_type == 'note_on':
+                note_count += 1
+
+            elif msg_type == 'program_change':
+                program_changes.append({
+                    'tick': current_time,
+                    'time': msg.time,
+                    'channel': msg.channel,
+                    'program': msg.program,
+                })
+
+            elif msg_type == 'set_tempo':
+                tempo_changes.append({
+                    'track': i,
+                    'tick': current_time,
+                    'tempo': msg.tempo,
+                })
+
+            elif msg_type == 'track_name':
+                track_names.append(msg.name)
+
+            elif msg_type == 'instrument_name':
+                instrument_names.append(msg.name)
+
+        tracks.append({
+            'index': i,
+            'name': track.name,
+            'end_tick': current_time,
+            'msg_types': msg_types,
+            'note_count': note_count,
+            'program_changes': program_changes,
+            'programs': sorted({pc['program'] for pc in program_changes}),
+            'track_names': track_names,
+            'instrument_names': instrument_names,
+        })
+
+    facets = {
+        'version': ANALYSIS_VERSION,
+        'type': midi.type,
+        'ticks_per_beat': midi.ticks_per_beat,
+        'num_tracks': len(midi.tracks),
+        'length_ticks': max((t['end_tick'] for t in tracks), default=0),
+        'tempo_changes': tempo_changes,
+        'tracks': tracks,
+    }
+
+    events = np.array(rows, dtype=EVENT_DTYPE)
+    _assign_channel_programs(events)
+
+    return facets, events
+
+
+def _data_bytes(msg) -> Tuple[int, int]:
+    """채널 메시지의 원본 데이터 바이트 2개"""
+    msg_type = msg.type
+    if msg_type in ('note_on', 'note_off'):
+        return msg.note, msg.velocity
+    if msg_type == 'control_change':
+        return msg.control, msg.value
+    if msg_type == 'program_change':
+        return msg.program, 0
+    if msg_type == 'polytouch':
+        return msg.note, msg.value
+    if msg_type == 'aftertouch':
+        return msg.value, 0
+    # pitchwheel: -8192..8191 -> 14비트 LSB/MSB
+    pitch = msg.pitch + 8192
+    return pitch & 0x7F, pitch >> 7
+
+
+def compute_facets(filepath: Path) -> Dict:
+    """MIDI 파일을 한 번 순회하여 모든 분석 정보 추출 (캐시 미사용)"""
+    return _analyze(filepath)[0]
+
+
+def compute_events(filepath: Path) -> np.ndarray:
+    """MIDI 파일을 컬럼형 이벤트 배열로 변환 (캐시 미사용)"""
+    return _analyze(filepath)[1]
+
+
+def _resolve_hash(filepath: Path, verify: bool = False) -> str:
+    """스탬프로 내용 해시 조회
+
+    mtime/크기가 스탬프와 같으면 파일을 읽지 않고 저장된 해시를 쓰고,
+    다르거나 verify=True 이면 내용 해시를 다시 계산해 스탬프를 갱신합니다.
+    """
+    st = filepath.stat()
+    stamp_path = _stamp_path(filepath)
+    stamp = _read_json(stamp_path)
+
+    if (not verify and stamp and stamp.get('sha1')
+            and stamp.get('mtime_ns') == st.st_mtime_ns and stamp.get('size') == st.st_size):
+        return stamp['sha1']
+
+    content_hash = file_sha1(filepath)
+    if not stamp or stamp.get('sha1') != content_hash or stamp.get('mtime_ns') != st.st_mtime_ns:
+        _write_json(stamp_path, {
+            'path': str(filepath),
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha1': content_hash,
+        })
+    return content_hash
+
+
+def _build_cache(filepath: Path) -> Tuple[Dict, np.ndarray]:
+    """분석 후 분석 정보(JSON)와 이벤트 배열(.npy)을 함께 캐시에 저장"""
+    content_hash = _resolve_hash(filepath, verify=True)
+    facets, events = _analyze(filepath)
+    _write_npy(_events_path(content_hash), events)
+    _write_json(_object_path(content_hash), facets)
+    return facets, events
+
+
+def analyze_midi(filepath: Path, use_cache: bool = True) -> Dict:
+    """캐시를 거쳐 MIDI 분석 정보 반환
+
+    mtime/크기가 스탬프와 같으면 파일을 읽지 않고 캐시를 사용하고,
+    mtime만 바뀐 경우에는 내용 해시를 비교하여 실제 변경 여부를 판단합니다.
+    """
+    filepath = Path(filepath)
+    if not use_cache:
+        return compute_facets(filepath)
+
+    facets = _read_json(_object_path(_resolve_hash(filepath)))
+    if not facets or facets.get('version') != ANALYSIS_VERSION:
+        facets, _ = _build_cache(filepath)
+    return facets
+
+
+def load_events(filepath: Path, use_cache: bool = True, mmap: bool = False) -> np.ndarray:
+    """캐시를 거쳐 컬럼형 이벤트 배열(EVENT_DTYPE) 반환
+
+    mmap=True 이면 .npy 를 메모리 매핑으로 열어 읽기 전용 배열을 돌려줍니다.
+    """
+    filepath = Path(filepath)
+    if not use_cache:
+        return compute_events(filepath)
+
+    try:
+        return np.load(_events_path(_resolve_hash(filepath)), mmap_mode='r' if mmap else None)
+    except (OSError, ValueError):
+        return _build_cache(filepath)[1]
+
+
+# ---------------------------------------------------------------------------
+# 자주 쓰는 조회 헬퍼
+# ---------------------------------------------------------------------------
+
+def first_tempo(facets: Dict) -> Optional[int]:
+    """첫 번째 set_tempo 값 (microseconds per beat), 없으면 None"""
+    if facets['tempo_changes']:
+        return facets['tempo_changes'][0]['tempo']
+    return None
+
+
+def tempo_to_bpm(tempo_us: int, ndigits: int = 1) -> float:
+    """microseconds per beat -> BPM"""
+    return round(60_000_000 / tempo_us, ndigits)
+
+
+def iter_program_changes(facets: Dict):
+    """(트랙, program_change) 쌍을 파일 내 순서대로 순회"""
+    for track in facets['tracks']:
+        for pc in track['program_changes']:
+            yield track, pc
+
+
+def note_on_mask(events: np.ndarray) -> np.ndarray:
+    """velocity > 0 인 note_on 이벤트"""
+    return (events['type'] == TYPE_NOTE_ON) & (events['velocity'] > 0)
+
+
+def register_mask(events: np.ndarray, low: int = LOW_NOTE_RANGE[0],
+                  high: int = LOW_NOTE_RANGE[1]) -> np.ndarray:
+    """노트 번호가 low ~ high (양끝 포함) 범위인 이벤트 (노트 이벤트와 함께 사용)"""
+    return (events['note'] >= low) & (events['note'] <= high)
+
+
+def program_mask(events: np.ndarray, programs: Iterable[int]) -> np.ndarray:
+    """활성 프로그램이 programs 중 하나인 이벤트"""
+    return np.isin(events['program'], list(programs))
+
+
+def clear_cache():
+    """캐시 디렉토리 삭제"""
+    if CACHE_DIR.exists():
+        shutil.rmtree(CACHE_DIR)
+
+
+def main():
+    """메인 함수"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='MIDI 분석 캐시 관리 도구')
+    parser.add_argument('--clear', action='store_true', help='캐시 삭제')
+    parser.add_argument('--dir', type=str, default=str(SOUND_DIR), help='분석할 MIDI 루트 폴더')
+
+    args = parser.parse_args()
+
+    if args.clear:
+        clear_cache()
+        print(f"🗑️  캐시 삭제 완료: {CACHE_DIR}")
+        return
+
+    midi_files = sorted(Path(args.dir).rglob('*.mid'))
+    if not midi_files:
+        print(f"❌ {args.dir}에서 MIDI 파일을 찾을 수 없습니다.")
+        sys.exit(1)
+
+    print(f"🔍 {len(midi_files)}개 MIDI 파일 분석 캐시 예열 중...")
+    start = time.perf_counter()
+    errors = 0
+    for midi_file in midi_files:
+        try:
+            analyze_midi(midi_file)
+            load_events(midi_file)
+        except Exception as e:
+            errors += 1
+            print(f"❌ {midi_file.name}: {e}")
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ 완료 ({elapsed * 1000:.0f}ms, 오류 {errors}개)")
+    print(f"캐시 경로: {CACHE_DIR}")
+
+
+if __name__ == '__main__':
+    main()
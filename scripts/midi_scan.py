@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+헤더/메타 전용 고속 MIDI 스캐너
+
+템포나 악기(program_change)만 필요한 조회에서 mido 가 모든 노트 메시지를
+객체로 디코딩하지 않도록, SMF 의 MThd/MTrk 청크 구조를 mmap 위에서 직접 순회합니다.
+메타 이벤트, program_change, set_tempo 만 디코딩하고 나머지 이벤트는 길이만큼 건너뛰며,
+요청한 정보를 찾으면 즉시 중단합니다.
+복사 중이거나 잘린 파일은 IndexError 대신 ValueError('truncated ...')로 알립니다.
+
+iter_midi_events 는 파일을 고정 크기 블록으로 읽으며 모든 이벤트를 튜플로 하나씩
+내보내는 스트리밍 리더로, 파일 크기와 관계없이 일정한 메모리로 전체를 순회합니다.
+
+사용법:
+    python scripts/midi_scan.py assets/sound/1_1.mid
+    python scripts/midi_scan.py --bench          # mido 대비 속도 비교
+
+    from midi_scan import scan_midi_meta
+    meta = scan_midi_meta(path, first_tempo_only=True)
+"""
+
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SOUND_DIR = PROJECT_ROOT / 'assets' / 'sound'
+
+# 채널 메시지 상태 상위 니블 -> 데이터 바이트 수
+_CHANNEL_DATA_LEN = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+
+# 시스템 공통 메시지 데이터 바이트 수 (0xF0/0xF7 sysex, 0xFF 메타 제외)
+_SYSTEM_DATA_LEN = {0xF1: 1, 0xF2: 2, 0xF3: 1}
+
+META_TRACK_NAME = 0x03
+META_END_OF_TRACK = 0x2F
+META_SET_TEMPO = 0x51
+
+# 메시지 타입 이름 (mido 와 동일)
+CHANNEL_TYPE_NAMES = {
+    0x80: 'note_off', 0x90: 'note_on', 0xA0: 'polytouch', 0xB0: 'control_change',
+    0xC0: 'program_change', 0xD0: 'aftertouch', 0xE0: 'pitchwheel',
+}
+SYSTEM_TYPE_NAMES = {
+    0xF0: 'sysex', 0xF7: 'sysex', 0xF1: 'quarter_frame', 0xF2: 'songpos', 0xF3: 'song_select',
+    0xF6: 'tune_request', 0xF8: 'clock', 0xFA: 'start', 0xFB: 'continue', 0xFC: 'stop',
+    0xFE: 'active_sensing',
+}
+META_TYPE_NAMES = {
+    0x00: 'sequence_number', 0x01: 'text', 0x02: 'copyright', 0x03: 'track_name',
+    0x04: 'instrument_name', 0x05: 'lyrics', 0x06: 'marker', 0x07: 'cue_marker',
+    0x09: 'device_name', 0x20: 'channel_prefix', 0x21: 'midi_port', 0x2F: 'end_of_track',
+    0x51: 'set_tempo', 0x54: 'smpte_offset', 0x58: 'time_signature', 0x59: 'key_signature',
+    0x7F: 'sequencer_specific',
+}
+
+# 스트리밍 리더 블록 크기 / 보관할 메타 데이터 최대 길이
+STREAM_BLOCK_SIZE = 1 << 16
+STREAM_META_MAX = 1024
+
+
+def _read_varint(buf, pos: int):
+    """가변 길이 정수 읽기 -> (값, 다음 위치)"""
+    value = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        value = (value << 7) | (b & 0x7F)
+        if not b & 0x80:
+            return value, pos
+
+
+def scan_midi_meta(filepath: Path, want_tempo: bool = True, want_programs: bool = True,
+                   first_tempo_only: bool = False) -> Dict:
+    """MIDI 파일에서 헤더, 트랙 이름, 템포, program_change 만 추출
+
+    first_tempo_only=True 이면 첫 set_tempo 를 찾는 즉시 스캔을 멈춥니다
+    (want_programs 와 함께 쓰면 그때까지 찾은 program_change 만 포함됩니다).
+    결과의 tick 은 트랙 시작 기준 절대 tick 입니다.
+    """
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _scan(buf, want_tempo, want_programs, first_tempo_only)
+
+
+def _scan(buf, want_tempo: bool, want_programs: bool, first_tempo_only: bool) -> Dict:
+    try:
+        return _scan_chunks(buf, want_tempo, want_programs, first_tempo_only)
+    except (IndexError, struct.error) as e:
+        # 이벤트 중간에서 파일이 끝남
+        raise ValueError(f'truncated MIDI 파일 ({len(buf)} bytes)') from e
+
+
+def _scan_chunks(buf, want_tempo: bool, want_programs: bool, first_tempo_only: bool) -> Dict:
+    size = len(buf)
+    if size < 14 or buf[0:4] != b'MThd':
+        raise ValueError('MThd 헤더가 없습니다')
+
+    header_len = struct.unpack('>I', buf[4:8])[0]
+    midi_type, num_tracks, division = struct.unpack('>HHH', buf[8:14])
+
+    result = {
+        'type': midi_type,
+        'ticks_per_beat': division,
+        'num_tracks': num_tracks,
+        'track_names': [],
+        'tempo_changes': [],     # {'track', 'tick', 'tempo'}
+        'program_changes': [],   # {'track', 'tick', 'channel', 'program'}
+    }
+    tempo_changes = result['tempo_changes']
+    program_changes = result['program_changes']
+
+    pos = 8 + header_len
+    track_idx = 0
+    while track_idx < num_tracks and pos + 8 <= size:
+        chunk_type = buf[pos:pos + 4]
+        chunk_len = struct.unpack('>I', buf[pos + 4:pos + 8])[0]
+        pos += 8
+        end = min(pos + chunk_len, size)
+        truncated = pos + chunk_len > size
+
+        # 알 수 없는 청크는 건너뜀
+        if chunk_type != b'MTrk':
+            pos = end
+            continue
+
+        tick = 0
+        last_status = None
+        track_name = None
+
+        while pos < end:
+            # delta time (varint)
+            b = buf[pos]
+            pos += 1
+            delta = b & 0x7F
+            while b & 0x80:
+                b = buf[pos]
+                pos += 1
+                delta = (delta << 7) | (b & 0x7F)
+            tick += delta
+
+            status = buf[pos]
+            if status < 0x80:
+                # running status: 상태 바이트 생략
+                if last_status is None:
+                    raise ValueError('last_status 없이 running status 사용')
+                status = last_status
+            else:
+                pos += 1
+                if status != 0xFF:
+                    last_status = status
+
+            if status < 0xF0:
+                kind = status & 0xF0
+                if kind == 0xC0:
+                    if want_programs:
+                        program_changes.append({
+                            'track': track_idx,
+                            'tick': tick,
+                            'channel': status & 0x0F,
+                            'program': buf[pos],
+                        })
+                    pos += 1
+                else:
+                    pos += _CHANNEL_DATA_LEN[kind]
+
+            elif status == 0xFF:
+                meta_type = buf[pos]
+                length, pos = _read_varint(buf, pos + 1)
+                if meta_type == META_SET_TEMPO and want_tempo:
+                    tempo = (buf[pos] << 16) | (buf[pos + 1] << 8) | buf[pos + 2]
+                    tempo_changes.append({'track': track_idx, 'tick': tick, 'tempo': tempo})
+                    if first_tempo_only:
+                        return result
+                elif meta_type == META_TRACK_NAME and track_name is None:
+                    track_name = buf[pos:pos + length].decode('latin1')
+                pos += length
+                if meta_type == META_END_OF_TRACK:
+                    truncated = False
+                    break
+
+            elif status in (0xF0, 0xF7):
+                length, pos = _read_varint(buf, pos)
+                pos += length
+
+            else:
+                pos += _SYSTEM_DATA_LEN.get(status, 0)
+
+        if truncated or pos > end:
+            raise ValueError(f'truncated MIDI 파일 ({size} bytes, 트랙 {track_idx})')
+        result['track_names'].append(track_name or '')
+        pos = end
+        track_idx += 1
+
+    return result
+
+
+def read_midi_header(filepath: Path) -> Dict:
+    """MThd 헤더만 읽기"""
+    with open(filepath, 'rb') as f:
+        head = f.read(14)
+    if len(head) < 14 or head[0:4] != b'MThd':
+        raise ValueError('MThd 헤더가 없습니다')
+    midi_type, num_tracks, division = struct.unpack('>HHH', head[8:14])
+    return {'type': midi_type, 'num_tracks': num_tracks, 'ticks_per_beat': division}
+
+
+# (트랙, 절대 tick, 타입 이름, 채널, data1, data2, 메타 데이터)
+MidiEvent = Tuple[int, int, str, int, int, int, Optional[bytes]]
+
+
+def iter_midi_events(filepath: Path, block_size: int = STREAM_BLOCK_SIZE) -> Iterator[MidiEvent]:
+    """모든 이벤트를 파일 순서(트랙 순 -> 트랙 내 순)대로 하나씩 내보내는 스트리밍 리더
+
+    채널 메시지는 channel/data1/data2 를, 메타 이벤트는 data1 에 메타 타입 번호와
+    데이터 바이트(STREAM_META_MAX 이하일 때만)를 채웁니다. sysex 본문은 읽고 버립니다.
+    한 번에 block_size 만큼만 읽으므로 파일 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    with open(filepath, 'rb', buffering=0) as f:
+        head = f.read(8)
+        if len(head) < 8 or head[0:4] != b'MThd':
+            raise ValueError('MThd 헤더가 없습니다')
+        header_len = struct.unpack('>I', head[4:8])[0]
+        num_tracks = struct.unpack('>HHH', f.read(header_len)[:6])[1]
+
+        track_idx = 0
+        while track_idx < num_tracks:
+            chunk_head = f.read(8)
+            if len(chunk_head) < 8:
+                break
+            chunk_len = struct.unpack('>I', chunk_head[4:8])[0]
+            if chunk_head[0:4] != b'MTrk':
+                f.seek(chunk_len, 1)
+                continue
+            try:
+                yield from _iter_track_events(f, track_idx, chunk_len, block_size)
+            except IndexError as e:
+                raise ValueError(f'truncated MIDI 파일 (트랙 {track_idx})') from e
+            track_idx += 1
+
+
+def _iter_track_events(f, track_idx: int, remaining: int, block_size: int) -> Iterator[MidiEvent]:
+    """MTrk 청크 하나를 블록 단위로 읽으며 이벤트 생성"""
+    buf = b''
+    pos = 0
+    tick = 0
+    last_status = None
+
+    while True:
+        # 이벤트 헤더(delta + 상태 + 데이터 최대 10바이트)가 버퍼에 들어오도록 보충
+        if len(buf) - pos < 16 and remaining > 0:
+            take = min(block_size, remaining)
+            block = f.read(take)
+            if len(block) < take:
+                raise ValueError(f'truncated MIDI 파일 (트랙 {track_idx})')
+            buf = buf[pos:] + block
+            remaining -= take
+            pos = 0
+        if pos >= len(buf):
+            return
+
+        b = buf[pos]
+        pos += 1
+        delta = b & 0x7F
+        while b & 0x80:
+            b = buf[pos]
+            pos += 1
+            delta = (delta << 7) | (b & 0x7F)
+        tick += delta
+
+        status = buf[pos]
+        if status < 0x80:
+            if last_status is None:
+                raise ValueError('last_status 없이 running status 사용')
+            status = last_status
+        else:
+            pos += 1
+            if status != 0xFF:
+                last_status = status
+
+        if status < 0xF0:
+            kind = status & 0xF0
+            if _CHANNEL_DATA_LEN[kind] == 2:
+                data1, data2 = buf[pos], buf[pos + 1]
+                pos += 2
+            else:
+                data1, data2 = buf[pos], 0
+                pos += 1
+            yield track_idx, tick, CHANNEL_TYPE_NAMES[kind], status & 0x0F, data1, data2, None
+            continue
+
+        if status == 0xFF:
+            meta_type = buf[pos]
+            length, pos = _read_varint(buf, pos + 1)
+        elif status in (0xF0, 0xF7):
+            meta_type = 0
+            length, pos = _read_varint(buf, pos)
+        else:
+            meta_type = 0
+            length = _SYSTEM_DATA_LEN.get(status, 0)
+
+        # 데이터가 버퍼 밖으로 넘어가면 필요한 만큼 더 읽음 (큰 데이터는 버림)
+        available = len(buf) - pos
+        if length <= available:
+            data = buf[pos:pos + length]
+            pos += length
+        elif length <= STREAM_META_MAX:
+            extra = f.read(length - available)
+            remaining -= len(extra)
+            data = buf[pos:] + extra
+            buf, pos = b'', 0
+        else:
+            skip = length - available
+            f.seek(skip, 1)
+            remaining -= skip
+            data = None
+            buf, pos = b'', 0
+
+        if status == 0xFF:
+            name = META_TYPE_NAMES.get(meta_type, 'unknown_meta')
+            yield track_idx, tick, name, -1, meta_type, 0, data if length <= STREAM_META_MAX else None
+        else:
+            yield track_idx, tick, SYSTEM_TYPE_NAMES.get(status, 'unknown'), -1, 0, 0, None
+
+
+def first_tempo_fast(filepath: Path):
+    """첫 set_tempo 값 (microseconds per beat), 없으면 None"""
+    meta = scan_midi_meta(filepath, want_programs=False, first_tempo_only=True)
+    if meta['tempo_changes']:
+        return meta['tempo_changes'][0]['tempo']
+    return None
+
+
+def _benchmark(midi_files):
+    """mido 전체 파싱 대비 메타 스캔 속도 비교"""
+    import time
+    from mido import MidiFile
+
+    start = time.perf_counter()
+    for midi_file in midi_files:
+        midi = MidiFile(midi_file)
+        for track in midi.tracks:
+            for msg in track:
+                pass
+    mido_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for midi_file in midi_files:
+        scan_midi_meta(midi_file)
+    scan_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for midi_file in midi_files:
+        first_tempo_fast(midi_file)
+    tempo_elapsed = time.perf_counter() - start
+
+    print(f"📊 {len(midi_files)}개 파일")
+    print(f"   mido 전체 파싱     : {mido_elapsed * 1000:8.1f}ms")
+    print(f"   메타 스캔 (전체)   : {scan_elapsed * 1000:8.1f}ms  (x{mido_elapsed / scan_elapsed:.1f})")
+    print(f"   첫 템포만          : {tempo_elapsed * 1000:8.1f}ms  (x{mido_elapsed / tempo_elapsed:.1f})")
+
+
+def main():
+    """메인 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='헤더/메타 전용 고속 MIDI 스캐너')
+    parser.add_argument('files', nargs='*', help='스캔할 MIDI 파일 경로')
+    parser.add_argument('--bench', action='store_true', help='전체 카탈로그로 mido 대비 속도 측정')
+
+    args = parser.parse_args()
+
+    if args.bench:
+        _benchmark(sorted(SOUND_DIR.rglob('*.mid')))
+        return
+
+    if not args.files:
+        parser.print_help()
+        sys.exit(1)
+
+    for file_path in args.files:
+        meta = scan_midi_meta(Path(file_path))
+        print(f"📄 {Path(file_path).name}: type {meta['type']}, "
+              f"{meta['num_tracks']} tracks, {meta['ticks_per_beat']} ticks/beat")
+        for change in meta['tempo_changes']:
+            print(f"   🎵 Track {change['track']} tick {change['tick']}: "
+                  f"{round(60_000_000 / change['tempo'], 2)} BPM")
+        for pc in meta['program_changes']:
+            print(f"   🎹 Track {pc['track']} tick {pc['tick']}: "
+                  f"Ch{pc['channel']} Program {pc['program']}")
+
+
+if __name__ == '__main__':
+    main()
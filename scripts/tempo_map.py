@@ -0,0 +1,92 @@
+"""
+MIDI 템포 맵 인덱스 - tick -> 밀리초 벡터 변환
+
+템포 변경 지점마다 누적 시간 오프셋을 미리 계산해 두고, 변환할 tick 이 속한
+구간을 이진 탐색(np.searchsorted)으로 찾아 NumPy 배열 전체를 한 번에 변환합니다.
+첫 번째 set_tempo 만 쓰던 기존 변환과 달리 템포가 바뀌는 곡도 정확합니다.
+
+사용법:
+    from tempo_map import TempoMap
+    tempo_map = TempoMap.from_facets(analyze_midi(path))
+    times_ms = tempo_map.ticks_to_ms(ticks_array)
+"""
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+DEFAULT_TEMPO = 500000  # 120 BPM (SMF 기본값)
+
+
+class TempoMap:
+    """템포 변경 지점별 누적 시간 인덱스
+
+    누적 오프셋은 'microseconds x ticks_per_beat' 단위의 정수로 보관하여
+    변환 과정에서 부동소수점 오차가 쌓이지 않도록 합니다.
+    """
+
+    def __init__(self, ticks_per_beat: int, tempo_changes: Iterable[Tuple[int, int]]):
+        self.ticks_per_beat = int(ticks_per_beat)
+
+        # tick 순 정렬 (같은 tick 이면 나중 값 적용), 0 tick 이전은 기본 템포
+        ticks = []
+        tempos = []
+        for tick, tempo in sorted(tempo_changes, key=lambda change: change[0]):
+            if ticks and ticks[-1] == tick:
+                tempos[-1] = tempo
+                continue
+            if not ticks and tick > 0:
+                ticks.append(0)
+                tempos.append(DEFAULT_TEMPO)
+            ticks.append(tick)
+            tempos.append(tempo)
+        if not ticks:
+            ticks, tempos = [0], [DEFAULT_TEMPO]
+
+        self.ticks = np.asarray(ticks, dtype=np.int64)
+        self.tempos = np.asarray(tempos, dtype=np.int64)
+        self.offsets = np.zeros(len(ticks), dtype=np.int64)
+        np.cumsum(np.diff(self.ticks) * self.tempos[:-1], out=self.offsets[1:])
+
+    @classmethod
+    def from_facets(cls, facets: Dict) -> 'TempoMap':
+        """midi_analysis / midi_scan 결과에서 생성 (파일 내 모든 트랙의 템포 변경 사용)"""
+        changes = [(change['tick'], change['tempo']) for change in facets['tempo_changes']]
+        return cls(facets['ticks_per_beat'], changes)
+
+    @property
+    def initial_tempo(self) -> int:
+        """곡 시작 시점 템포 (microseconds per beat)"""
+        return int(self.tempos[0])
+
+    @property
+    def initial_bpm(self) -> float:
+        return round(60_000_000 / self.initial_tempo, 1)
+
+    def _scaled_us(self, ticks: np.ndarray) -> np.ndarray:
+        """tick -> microseconds x ticks_per_beat (정수)"""
+        idx = np.searchsorted(self.ticks, ticks, side='right') - 1
+        np.maximum(idx, 0, out=idx)
+        return self.offsets[idx] + (ticks - self.ticks[idx]) * self.tempos[idx]
+
+    def ticks_to_ms(self, ticks) -> np.ndarray:
+        """tick 배열 -> 밀리초 배열 (int64, 내림)"""
+        ticks = np.asarray(ticks, dtype=np.int64)
+        return self._scaled_us(ticks) // (self.ticks_per_beat * 1000)
+
+    def ticks_to_seconds(self, ticks) -> np.ndarray:
+        """tick 배열 -> 초 배열 (float64)"""
+        ticks = np.asarray(ticks, dtype=np.int64)
+        return self._scaled_us(ticks) / (self.ticks_per_beat * 1_000_000)
+
+    def tick_to_ms(self, tick: int) -> int:
+        """단일 tick -> 밀리초"""
+        return int(self.ticks_to_ms(np.array([tick]))[0])
+
+    def bpm_at(self, tick: int) -> float:
+        """해당 tick 시점의 BPM"""
+        idx = max(int(np.searchsorted(self.ticks, tick, side='right')) - 1, 0)
+        return round(60_000_000 / int(self.tempos[idx]), 2)
+
+    def __len__(self):
+        return len(self.ticks)
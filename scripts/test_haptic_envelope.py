@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+haptic_envelope note_on / note_off 짝짓기 테스트
+
+사용법:
+    cd scripts && python -m pytest -q test_haptic_envelope.py
+"""
+
+import numpy as np
+
+from haptic_envelope import pair_notes
+from midi_analysis import EVENT_DTYPE, TYPE_NOTE_OFF, TYPE_NOTE_ON
+
+
+def _events(rows):
+    """(tick, track, channel, type, note, velocity) 목록 -> EVENT_DTYPE 배열"""
+    return np.array([row + (-1,) for row in rows], dtype=EVENT_DTYPE)
+
+
+def test_overlapping_notes_pair_fifo():
+    events = _events([
+        (0, 0, 0, TYPE_NOTE_ON, 60, 100),
+        (10, 0, 0, TYPE_NOTE_ON, 60, 100),
+        (20, 0, 0, TYPE_NOTE_OFF, 60, 0),
+        (30, 0, 0, TYPE_NOTE_OFF, 60, 0),
+    ])
+
+    on_rows, end_ticks = pair_notes(events)
+
+    assert on_rows.tolist() == [0, 1]
+    assert end_ticks.tolist() == [20, 30]
+
+
+def test_orphan_note_off_is_ignored():
+    events = _events([
+        (0, 0, 0, TYPE_NOTE_OFF, 60, 0),      # 열린 노트 없음
+        (5, 0, 0, TYPE_NOTE_ON, 60, 90),
+        (7, 0, 0, TYPE_NOTE_ON, 60, 0),       # velocity 0 note_on = note_off
+        (8, 0, 0, TYPE_NOTE_OFF, 60, 0),      # 열린 노트 없음
+        (9, 0, 0, TYPE_NOTE_ON, 60, 90),      # 끝나지 않음
+        (6, 0, 1, TYPE_NOTE_ON, 60, 90),      # 다른 채널
+        (12, 0, 1, TYPE_NOTE_OFF, 60, 0),
+    ])
+
+    on_rows, end_ticks = pair_notes(events)
+
+    assert dict(zip(on_rows.tolist(), end_ticks.tolist())) == {1: 7, 4: -1, 5: 12}
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+haptic_simplify 반복 병합 테스트
+
+사용법:
+    cd scripts && python -m pytest -q test_haptic_simplify.py
+"""
+
+from haptic_codec import decode_haptic, encode_haptic
+from haptic_simplify import _MAX_U16, columns_to_events, events_to_columns, merge_repeats
+
+
+def _expand(events):
+    """repeat/interval 이벤트를 원래 이벤트 목록으로 펼치기"""
+    expanded = []
+    for event in events:
+        for k in range(event.get('repeat', 1)):
+            expanded.append({'time': event['time'] + k * event.get('interval', 0),
+                             'note': event['note'], 'velocity': event['velocity']})
+    return expanded
+
+
+def test_merge_repeats_splits_runs_longer_than_u16():
+    count = _MAX_U16 + 10
+    events = [{'time': i * 100, 'note': 36, 'velocity': 100} for i in range(count)]
+
+    merged = merge_repeats(events_to_columns(events), jitter_ms=0)
+
+    assert merged['repeat'].max() <= _MAX_U16
+    assert merged['repeat'].tolist() == [_MAX_U16, count - _MAX_U16]
+    assert merged['interval'].tolist() == [100, 100]
+
+    merged_events = columns_to_events(merged)
+    assert _expand(merged_events) == events
+
+    data = {'track_id': 'test', 'events': merged_events}
+    assert decode_haptic(encode_haptic(data)) == data
+
+
+def test_merge_repeats_keeps_irregular_events():
+    events = [{'time': t, 'note': 36, 'velocity': 100} for t in (0, 100, 350, 900)]
+
+    merged = columns_to_events(merge_repeats(events_to_columns(events), jitter_ms=10))
+
+    assert _expand(merged) == events
+
+
+def test_sparse_repeats_only_cost_repeated_events():
+    events = [{'time': i * 100, 'note': 36 + i % 5, 'velocity': 100} for i in range(200)]
+    plain = encode_haptic({'track_id': 'test', 'events': events})
+
+    events[10] = dict(events[10], repeat=4, interval=25)
+    data = {'track_id': 'test', 'events': events}
+    encoded = encode_haptic(data)
+
+    # 반복 이벤트 수(u32) + 반복 이벤트 하나(번호 u32, repeat u16, interval u16)
+    assert len(encoded) == len(plain) + 4 + 8
+    assert decode_haptic(encoded) == data
+
+
+def test_merge_repeats_min_repeat_keeps_short_runs():
+    events = [{'time': t, 'note': 36, 'velocity': 100} for t in (0, 100, 1000, 1100, 1200)]
+
+    merged = merge_repeats(events_to_columns(events), jitter_ms=0, min_repeat=3)
+
+    assert merged['repeat'].tolist() == [1, 1, 3]
+    assert _expand(columns_to_events(merged)) == events
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+midi_scan 잘린 파일 처리 테스트
+
+사용법:
+    cd scripts && python -m pytest -q test_midi_scan.py
+"""
+
+import pytest
+from mido import Message, MetaMessage, MidiFile, MidiTrack
+
+from midi_scan import iter_midi_events, scan_midi_meta
+
+
+def _write_midi(path):
+    midi = MidiFile(ticks_per_beat=480)
+    track = MidiTrack()
+    track.append(MetaMessage('track_name', name='Piano'))
+    track.append(MetaMessage('set_tempo', tempo=500000))
+    track.append(Message('program_change', program=0, time=0))
+    for i in range(8):
+        track.append(Message('note_on', note=60 + i, velocity=100, time=0))
+        track.append(Message('note_off', note=60 + i, velocity=0, time=240))
+    midi.tracks.append(track)
+    midi.save(path)
+    return path.read_bytes()
+
+
+def test_scan_complete_file(tmp_path):
+    path = tmp_path / 'full.mid'
+    _write_midi(path)
+
+    meta = scan_midi_meta(path)
+
+    assert meta['track_names'] == ['Piano']
+    assert meta['tempo_changes'] == [{'track': 0, 'tick': 0, 'tempo': 500000}]
+    assert len(list(iter_midi_events(path))) == 20
+
+
+@pytest.mark.parametrize('cut', [57, 40, 30])
+def test_truncated_file_raises_value_error(tmp_path, cut):
+    data = _write_midi(tmp_path / 'full.mid')
+    path = tmp_path / 'truncated.mid'
+    path.write_bytes(data[:cut])
+
+    with pytest.raises(ValueError, match='truncated'):
+        scan_midi_meta(path)
+    with pytest.raises(ValueError, match='truncated'):
+        list(iter_midi_events(path))
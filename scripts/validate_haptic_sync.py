@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+햅틱 패턴 / 오디오 / MIDI 길이 동기화 검사
+
+assets/haptic_patterns/<track_id>.json 이 트랙 MP3 와 여전히 맞는지 전체 카탈로그(80곡)를
+한 번에 검사합니다. MP3 길이는 mutagen 으로 헤더만 읽고(extract_duration.py 와 같은 방식),
+MIDI 길이는 캐시된 분석 정보(midi_analysis)의 템포 맵으로 구하므로 캐시가 데워져 있으면
+전체 검사가 1초 안에 끝납니다. 트랙별 검사는 스레드 풀에서 병렬로 실행합니다.
+
+검사 항목 (threshold 를 넘는 차이만 보고):
+    pattern>audio   패턴 길이(stats.duration_ms)가 MP3 보다 김
+    midi~audio      MIDI 템포 맵 길이와 MP3 길이가 다름
+    pattern>midi    패턴 길이가 MIDI 보다 김 (템포 수정 후 재생성 안 함)
+    bpm             패턴 bpm 과 MIDI 첫 템포가 다름 (템포 수정 후 재생성 안 함)
+    stats           stats.duration_ms 가 마지막 이벤트 시각과 다름
+    error           패턴 JSON / MIDI / MP3 를 읽지 못함 (해당 트랙만 실패로 보고)
+
+MP3 가 없는 트랙은 오디오 비교를 건너뛰므로 경고로 표시하며,
+--require-audio 를 주면 그런 트랙이 하나라도 있을 때 실패(종료 코드 1)로 처리합니다.
+
+사용법:
+    python scripts/validate_haptic_sync.py                  # 문제 있는 트랙만 출력
+    python scripts/validate_haptic_sync.py --threshold 1.5 --verbose
+    python scripts/validate_haptic_sync.py --require-audio  # MP3 없는 트랙도 실패로 처리
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from mutagen.mp3 import MP3
+except ImportError:
+    MP3 = None
+
+from catalog import HAPTIC_DIR, TRACK_MAPPING, is_cat_track, load_catalog_index
+from haptic_simplify import compute_stats
+from midi_analysis import analyze_midi
+from tempo_map import TempoMap
+
+DEFAULT_THRESHOLD_MS = 2000
+BPM_TOLERANCE = 0.5
+
+
+def audio_duration_ms(mp3_path: Path) -> int:
+    """MP3 헤더(Xing/VBRI 또는 첫 프레임 비트레이트)만 읽어 길이 계산"""
+    return int(round(MP3(mp3_path).info.length * 1000))
+
+
+def midi_timing(midi_path: Path) -> Dict:
+    """캐시된 분석 정보 -> MIDI 길이(ms) / 첫 BPM"""
+    facets = analyze_midi(midi_path)
+    tempo_map = TempoMap.from_facets(facets)
+    return {
+        'duration_ms': tempo_map.tick_to_ms(facets['length_ticks']),
+        'bpm': tempo_map.initial_bpm,
+    }
+
+
+def check_track(job: Dict) -> Dict:
+    """트랙 하나의 길이 / 템포 비교 -> {'track_id', 'pattern_ms', 'audio_ms', 'midi_ms', 'issues'}"""
+    result = {'track_id': job['track_id'], 'pattern_ms': None, 'audio_ms': None, 'midi_ms': None, 'issues': []}
+    try:
+        _compare(job, result)
+    except Exception as e:
+        # 손상된 MP3 / MIDI / JSON 하나가 전체 검사를 멈추지 않도록 트랙 문제로 기록
+        result['issues'].append(f"error: {type(e).__name__}: {e}")
+    return result
+
+
+def _compare(job: Dict, result: Dict):
+    threshold = job['threshold_ms']
+    issues: List[str] = result['issues']
+
+    with open(job['pattern'], 'r', encoding='utf-8') as f:
+        pattern = json.load(f)
+    pattern_ms = pattern.get('stats', {}).get('duration_ms')
+    actual_ms = compute_stats(pattern['events'])['duration_ms']
+    if pattern_ms is None or pattern_ms != actual_ms:
+        issues.append(f"stats: duration_ms {pattern_ms} != 마지막 이벤트 {actual_ms}")
+    pattern_ms = result['pattern_ms'] = actual_ms
+
+    if job['midi']:
+        timing = midi_timing(job['midi'])
+        midi_ms = result['midi_ms'] = timing['duration_ms']
+        if pattern_ms > midi_ms + threshold:
+            issues.append(f"pattern>midi: {_seconds(pattern_ms)} > {_seconds(midi_ms)}")
+        if pattern.get('bpm') is not None and abs(pattern['bpm'] - timing['bpm']) > BPM_TOLERANCE:
+            issues.append(f"bpm: 패턴 {pattern['bpm']} != MIDI {timing['bpm']}")
+
+    if job['audio']:
+        audio_ms = result['audio_ms'] = audio_duration_ms(job['audio'])
+        if pattern_ms > audio_ms + threshold:
+            issues.append(f"pattern>audio: {_seconds(pattern_ms)} > {_seconds(audio_ms)}")
+        if result['midi_ms'] is not None and abs(result['midi_ms'] - audio_ms) > threshold:
+            issues.append(f"midi~audio: {_seconds(result['midi_ms'])} vs {_seconds(audio_ms)}")
+
+
+def _seconds(ms: Optional[int]) -> str:
+    return '-' if ms is None else f"{ms / 1000:.1f}s"
+
+
+def collect_checks(index, threshold_ms: int) -> List[Dict]:
+    """카탈로그 매핑 순서대로 검사 작업 구성 (패턴 JSON 이 없는 트랙은 제외)"""
+    checks = []
+    for key, (track_id, _) in TRACK_MAPPING.items():
+        entry = index.get(key)
+        pattern = HAPTIC_DIR / f"{track_id}.json"
+        if not entry or not pattern.exists():
+            continue
+        # generate_all_haptic_patterns 와 같은 소스: 강아지는 평면 MIDI, 고양이는 Orchestrated
+        midi = entry['orchestrated'] if is_cat_track(key) else entry['midi']
+        checks.append({
+            'track_id': track_id,
+            'pattern': pattern,
+            'midi': midi,
+            'audio': entry['mp3'],
+            'threshold_ms': threshold_ms,
+        })
+    return checks
+
+
+def run_checks(checks: List[Dict], jobs: int = 0) -> List[Dict]:
+    """트랙별 검사를 스레드 풀에서 병렬 실행 (결과는 입력 순서)"""
+    with ThreadPoolExecutor(max_workers=jobs if jobs > 0 else None) as executor:
+        return list(executor.map(check_track, checks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='햅틱 패턴 / MP3 / MIDI 길이 동기화 검사')
+    parser.add_argument('--threshold', '-t', type=float, default=DEFAULT_THRESHOLD_MS / 1000,
+                        help='허용 차이 (초, 기본 2)')
+    parser.add_argument('--jobs', '-j', type=int, default=0, help='스레드 수 (0 = 자동)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='문제 없는 트랙도 출력')
+    parser.add_argument('--require-audio', action='store_true', help='MP3 가 없어 오디오 비교를 못 한 트랙도 실패로 처리')
+    args = parser.parse_args()
+
+    if MP3 is None:
+        print("❌ mutagen 라이브러리가 설치되지 않았습니다.")
+        print("다음 명령어로 설치하세요: pip install mutagen")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    checks = collect_checks(load_catalog_index(), int(args.threshold * 1000))
+    results = run_checks(checks, args.jobs)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔍 햅틱 패턴 동기화 검사 ({len(results)}곡, 허용 차이 {args.threshold:g}초)\n")
+    flagged = [r for r in results if r['issues']]
+    for result in results:
+        if not result['issues'] and not args.verbose:
+            continue
+        icon = '⚠️ ' if result['issues'] else '✅'
+        print(f"{icon} {result['track_id']}: 패턴 {_seconds(result['pattern_ms'])}, "
+              f"MIDI {_seconds(result['midi_ms'])}, MP3 {_seconds(result['audio_ms'])}")
+        for issue in result['issues']:
+            print(f"     - {issue}")
+
+    no_audio = [r for r in results if r['audio_ms'] is None and not r['issues']]
+    failed = flagged or (args.require_audio and no_audio)
+    icon = '❌' if failed else ('⚠️ ' if no_audio else '✅')
+    print(f"\n{'=' * 60}")
+    print(f"{icon} 문제 {len(flagged)}곡 / 전체 {len(results)}곡 ({elapsed * 1000:.0f} ms)")
+    if no_audio:
+        scope = '전체' if len(no_audio) == len(results) else f"{len(no_audio)}곡"
+        print(f"   ⚠️  MP3 없음 {scope}: 오디오와 비교하지 못했습니다 (패턴/MIDI 만 검사)")
+        if args.verbose:
+            print(f"      {', '.join(r['track_id'] for r in no_audio)}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()